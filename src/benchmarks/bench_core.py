@@ -0,0 +1,252 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core import sentinel_core_agent
+from core.agent_manager import AgentManager
+from core.directive_engine import DirectiveEngine
+from core.logging_config import configure_logging
+from core.sentinel_core_agent import SentinelCoreAgent, calculate_stake
+from utils.token_utils import create_token, verify_token
+
+# Microbenchmarks for the core engines: ops/sec and allocated bytes per op at several
+# registry sizes, gated against a stored baseline.
+#
+#   python benchmarks/bench_core.py                    # compare with baseline.json, exit 1 on regression
+#   python benchmarks/bench_core.py --save-baseline    # record a new baseline
+#
+# Ops/sec depends on the machine: record the baseline where the gate runs.
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+DEFAULT_MIN_TIME = 0.5     # Seconds each case is timed for
+DEFAULT_THRESHOLD = 0.25   # Fractional slowdown (or allocation growth) that fails the run
+ALLOC_SLACK = 64           # Bytes per op of allocation growth that is always tolerated
+MAX_ALLOC_OPS = 1000       # Ops traced with tracemalloc per case
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+STATUSES = ("acknowledged", "in-progress", "completed", "pending")  # One valid lifecycle, then requeue
+HIGH_STAKE = 10 ** 12  # Above calculate_stake() at any benchmarked registry size
+
+
+# ----------------------------
+# Cases
+# ----------------------------
+# setup(size) builds a registry holding `size` entries and returns the state passed
+# to op(state, i). Either may be a coroutine function.
+
+def setup_engine(size: int) -> dict:
+    engine = DirectiveEngine()
+    ids = engine.create_directives((f"agent-{i % 1000}", {"task": "optimize_cpu"}) for i in range(size))
+    return {"engine": engine, "ids": ids}
+
+
+def create_directive(state: dict, i: int):
+    state["engine"].create_directive(f"agent-{i % 1000}", {"task": "optimize_cpu"})
+
+
+def update_directive_status(state: dict, i: int):
+    ids = state["ids"]
+    # Each directive goes through the whole cycle, so every update is an allowed transition
+    state["engine"].update_directive_status(ids[(i // len(STATUSES)) % len(ids)], STATUSES[i % len(STATUSES)])
+
+
+def setup_manager(size: int) -> dict:
+    manager = AgentManager()
+    for i in range(size):
+        manager.register_agent({"agent_id": f"agent-{i}", "name": f"Agent {i}", "type": "sub-agent",
+                                "token_stake": 12000, "capabilities": ["monitor_cpu"]})
+    return {"manager": manager}
+
+
+def register_agent(state: dict, i: int):
+    state["manager"].register_agent({"agent_id": f"new-agent-{i}", "name": f"Agent {i}", "type": "sub-agent",
+                                     "token_stake": 12000, "capabilities": ["monitor_cpu"]})
+
+
+def list_agents(state: dict, i: int):
+    state["manager"].list_agents()
+
+
+async def setup_sentinel(size: int) -> dict:
+    sentinel_core_agent.AGENT_REGISTRY.clear()
+    sentinel_core_agent.directives_log.clear()
+    sentinel = SentinelCoreAgent()
+    for i in range(size):
+        await sentinel.register_agent(f"Agent {i}", "compute", HIGH_STAKE)
+    return {"sentinel": sentinel, "ids": list(sentinel_core_agent.AGENT_REGISTRY)}
+
+
+async def sentinel_register_agent(state: dict, i: int):
+    await state["sentinel"].register_agent(f"Agent {i}", "compute", HIGH_STAKE)
+
+
+async def sentinel_send_directive(state: dict, i: int):
+    ids = state["ids"]
+    await state["sentinel"].send_directive(ids[i % len(ids)], "Optimize GPU usage", {"priority": "high"})
+
+
+def setup_stake(size: int) -> dict:
+    return {"agent_count": size}
+
+
+def stake(state: dict, i: int):
+    calculate_stake(state["agent_count"] + i)
+
+
+def setup_tokens(size: int) -> dict:
+    return {"token": create_token("agent-001")}
+
+
+def token_create(state: dict, i: int):
+    create_token(f"agent-{i}")
+
+
+def token_verify(state: dict, i: int):
+    verify_token(state["token"])
+
+
+# name -> (setup, op, sized). Cases that are not sized run once, at the smallest size.
+BENCHMARKS: Dict[str, Tuple[Callable, Callable, bool]] = {
+    "DirectiveEngine.create_directive": (setup_engine, create_directive, True),
+    "DirectiveEngine.update_directive_status": (setup_engine, update_directive_status, True),
+    "AgentManager.register_agent": (setup_manager, register_agent, True),
+    "AgentManager.list_agents": (setup_manager, list_agents, True),
+    "SentinelCoreAgent.register_agent": (setup_sentinel, sentinel_register_agent, True),
+    "SentinelCoreAgent.send_directive": (setup_sentinel, sentinel_send_directive, True),
+    "calculate_stake": (setup_stake, stake, True),
+    "token_utils.create_token": (setup_tokens, token_create, False),
+    "token_utils.verify_token": (setup_tokens, token_verify, False),
+}
+
+
+# ----------------------------
+# Measurement
+# ----------------------------
+async def call(function: Callable, *args):
+    result = function(*args)
+    if asyncio.iscoroutine(result):
+        await result
+
+
+async def run_ops(op: Callable, state: dict, start: int, count: int):
+    for i in range(start, start + count):
+        await call(op, state, i)
+    # Let tasks scheduled by the ops (e.g. directive broadcasts) run inside the measurement
+    await asyncio.sleep(0)
+
+
+async def measure(setup: Callable, op: Callable, size: int, min_time: float) -> dict:
+    """
+    Time `op` against a registry of `size` entries, then trace its allocations.
+    """
+    state = setup(size)
+    if asyncio.iscoroutine(state):
+        state = await state
+    await run_ops(op, state, 0, 1)  # Warm up
+
+    ops, batch = 0, 1
+    started = time.perf_counter()
+    while True:
+        await run_ops(op, state, 1 + ops, batch)
+        ops += batch
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        # Grow batches towards the remaining time so the loop overhead stays small
+        batch = max(1, min(batch * 2, int(ops / elapsed * (min_time - elapsed)) + 1))
+
+    traced = max(1, min(ops, MAX_ALLOC_OPS))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    await run_ops(op, state, 1 + ops, traced)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "ops_per_sec": round(ops / elapsed, 3),
+        "alloc_bytes_per_op": round((peak - before) / traced, 1),     # Peak, including temporaries
+        "retained_bytes_per_op": round((after - before) / traced, 1)  # Still held after the ops
+    }
+
+
+async def run_benchmarks(sizes: List[int], min_time: float, only: Optional[str] = None) -> dict:
+    results: Dict[str, Dict[str, dict]] = {}
+    for name, (setup, op, sized) in BENCHMARKS.items():
+        if only and only not in name:
+            continue
+        results[name] = {}
+        for size in (sizes if sized else sizes[:1]):
+            # SentinelCoreAgent prints on every call; keep the report readable
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                result = await measure(setup, op, size, min_time)
+            results[name][str(size)] = result
+            print(f"  {name:<42}{size:>10,}{result['ops_per_sec']:>14,.1f}"
+                  f"{result['alloc_bytes_per_op']:>14,.0f}{result['retained_bytes_per_op']:>14,.0f}", flush=True)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    :return: One line per case and size that regressed past `threshold` against `baseline`.
+    """
+    regressions = []
+    for name, by_size in results.items():
+        for size, result in by_size.items():
+            expected = baseline.get(name, {}).get(size)
+            if expected is None:
+                continue
+            if result["ops_per_sec"] < expected["ops_per_sec"] * (1 - threshold):
+                regressions.append(f"{name} @ {size}: {result['ops_per_sec']:,.0f} ops/s "
+                                   f"(baseline {expected['ops_per_sec']:,.0f})")
+            if result["retained_bytes_per_op"] > expected["retained_bytes_per_op"] * (1 + threshold) + ALLOC_SLACK:
+                regressions.append(f"{name} @ {size}: {result['retained_bytes_per_op']:,.0f} B/op retained "
+                                   f"(baseline {expected['retained_bytes_per_op']:,.0f})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Core engine microbenchmarks with a regression gate.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma-separated registry sizes.")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="Seconds to time each case.")
+    parser.add_argument("--only", help="Run only cases whose name contains this text.")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    configure_logging(level="WARNING")  # Keep engine log records out of the timings
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+
+    print(f"⏱️ Core benchmarks ({args.min_time}s per case)")
+    print(f"  {'case':<42}{'size':>10}{'ops/s':>14}{'alloc B/op':>14}{'kept B/op':>14}")
+    results = asyncio.run(run_benchmarks(sizes, args.min_time, args.only))
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        for name, by_size in results.items():
+            baseline.setdefault(name, {}).update(by_size)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"💾 Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️ No baseline at {args.baseline}; run with --save-baseline first.")
+        sys.exit(0)
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"✅ No regressions beyond {args.threshold:.0%}.")
@@ -0,0 +1,81 @@
+import argparse
+import os
+import sys
+import tracemalloc
+import uuid
+from datetime import datetime
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.records import AgentRecord, DirectiveRecord
+
+# Memory benchmark: bytes per agent and per directive, dict layout vs slotted records
+DEFAULT_COUNT = 100_000
+STATUSES = ("pending", "acknowledged", "in-progress", "completed", "failed")
+
+
+def measure(build, count: int) -> float:
+    """
+    Bytes allocated per item while building `count` items (the container included).
+    """
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    items = build(count)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del items
+    return used / count
+
+
+def dict_directives(count: int) -> dict:
+    # Incoming requests produce a fresh string per field, as JSON decoding does
+    ids = [str(uuid.uuid4()) for _ in range(count)]
+    return {directive_id: {
+        "id": directive_id,
+        "agent_id": f"agent-{i % 1000}",
+        "task": "".join(("optimize", "_cpu")),
+        "status": "".join(STATUSES[i % len(STATUSES)])
+    } for i, directive_id in enumerate(ids)}
+
+
+def record_directives(count: int) -> dict:
+    ids = [str(uuid.uuid4()) for _ in range(count)]
+    directives = {}
+    for i, directive_id in enumerate(ids):
+        directive = DirectiveRecord(directive_id, f"agent-{i % 1000}", "".join(("optimize", "_cpu")))
+        directive.set_status(STATUSES[i % len(STATUSES)])
+        directives[directive_id] = directive
+    return directives
+
+
+def dict_agents(count: int) -> dict:
+    return {f"agent-{i}": {
+        "agent_id": f"agent-{i}",
+        "name": f"Agent {i}",
+        "type": "".join(("sub", "-agent")),
+        "capabilities": ["".join(("monitor", "_cpu")), "".join(("optimize", "_gpu"))],
+        "token_stake": 12000,
+        "registered_on": datetime.utcnow().isoformat(),
+        "status": "".join(("act", "ive"))
+    } for i in range(count)}
+
+
+def record_agents(count: int) -> dict:
+    return {f"agent-{i}": AgentRecord(
+        f"agent-{i}", 12000, name=f"Agent {i}", agent_type="".join(("sub", "-agent")),
+        capabilities=["".join(("monitor", "_cpu")), "".join(("optimize", "_gpu"))]
+    ) for i in range(count)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bytes per agent and directive record.")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT)
+    args = parser.parse_args()
+
+    print(f"📏 Memory per item over {args.count} items")
+    for label, build_dict, build_record in (("agent", dict_agents, record_agents),
+                                            ("directive", dict_directives, record_directives)):
+        as_dict = measure(build_dict, args.count)
+        as_record = measure(build_record, args.count)
+        print(f"  {label:<10} dict: {as_dict:7.0f} B   record: {as_record:7.0f} B   "
+              f"({(1 - as_record / as_dict) * 100:.0f}% smaller)")
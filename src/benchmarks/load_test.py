@@ -0,0 +1,330 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import websockets
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.codecs import JSON_WIRE, negotiate
+
+# Load test: simulated agents and a dashboard against a locally started server.
+# Each directive is timed through create (POST) -> send (agent receives it)
+# -> ack (agent reports completion) -> broadcast (dashboard sees the update).
+DEFAULT_AGENTS = 1000
+DEFAULT_RATE = 500.0         # Directives per second, open loop
+DEFAULT_DURATION = 10.0      # Seconds of directive traffic
+DEFAULT_DRAIN_TIMEOUT = 10.0  # Seconds to wait for outstanding broadcasts
+CONNECT_CONCURRENCY = 200    # Agent sockets opened at once
+HTTP_CONNECTIONS = 100
+STAKE_RANGE = (10000, 100000)  # Starts at the server's MINIMUM_STAKE
+PERCENTILES = (50, 99, 99.9)
+STAGES = ("create", "dispatch", "ack", "broadcast", "round_trip")
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of already sorted samples.
+    """
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, max(0, int(round(q / 100 * len(samples))) - 1))]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Count, percentiles and max of latencies in seconds, reported in milliseconds.
+    """
+    samples = sorted(samples)
+    summary = {"count": len(samples)}
+    for q in PERCENTILES:
+        summary[f"p{q:g}"] = round(percentile(samples, q) * 1000, 3)
+    summary["max"] = round(samples[-1] * 1000, 3) if samples else 0.0
+    return summary
+
+
+def unpack(message: dict) -> List[dict]:
+    """
+    Flatten {"action": "batch"} frames, which may be nested.
+    """
+    if message.get("action") == "batch":
+        return [entry for nested in message["messages"] for entry in unpack(nested)]
+    return [message]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LoadTest:
+    """
+    Drives one run and collects per-directive timestamps, keyed by directive_id.
+    """
+    def __init__(self, base_url: str, agents: int, rate: float, duration: float,
+                 drain_timeout: float = DEFAULT_DRAIN_TIMEOUT, auth: bool = False,
+                 encoding: Optional[dict] = None):
+        self.base_url = base_url.rstrip("/")
+        self.ws_url = "ws" + self.base_url[len("http"):]
+        self.agent_ids = [f"load-agent-{i}" for i in range(agents)]
+        self.rate = rate
+        self.duration = duration
+        self.drain_timeout = drain_timeout
+        self.auth = auth
+        self.encoding = encoding  # Asked for at register, e.g. {"codecs": ["msgpack"]}
+        self.wire = JSON_WIRE
+        self.requested: Dict[str, float] = {}  # directive_id -> time the POST was issued
+        self.created: Dict[str, float] = {}    # directive_id -> time the POST returned
+        self.sent: Dict[str, float] = {}       # directive_id -> time the agent received it
+        self.acked: Dict[str, float] = {}      # directive_id -> time the agent answered
+        self.broadcast: Dict[str, float] = {}  # directive_id -> time the dashboard saw it completed
+        self.errors: Dict[str, int] = {}
+        self.sockets: List = []
+        self._done = asyncio.Event()
+
+    def error(self, kind: str):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def token_query(self, agent_id: str) -> str:
+        if not self.auth:
+            return ""
+        from utils.token_utils import create_token
+        return f"?token={create_token(agent_id)}"
+
+    # ----------------------------
+    # Simulated clients
+    # ----------------------------
+    async def connect_agent(self, agent_id: str):
+        ws = await websockets.connect(f"{self.ws_url}/ws/agent/{agent_id}{self.token_query(agent_id)}",
+                                      max_size=None, ping_interval=None)
+        register = {"action": "register", "metadata": {
+            "name": agent_id,
+            "type": "load-agent",
+            "stake": random.randint(*STAKE_RANGE)
+        }}
+        if self.encoding:
+            register["encoding"] = self.encoding
+        await ws.send(json.dumps(register))
+        reply = json.loads(await ws.recv())
+        if reply.get("status") != "success":
+            raise RuntimeError(f"❌ Agent '{agent_id}' failed to register: {reply}")
+        if "encoding" in reply:
+            self.wire = negotiate({"codecs": [reply["encoding"]["codec"]],
+                                   "compress_min_bytes": reply["encoding"]["compress_min_bytes"]})
+        self.sockets.append(ws)
+        return ws
+
+    async def run_agent(self, ws):
+        try:
+            async for raw in ws:
+                for message in unpack(self.wire.decode(raw)):
+                    action = message.get("action")
+                    if action == "directive":
+                        directive_id = message["directive_id"]
+                        self.sent[directive_id] = time.perf_counter()
+                        await ws.send(self.wire.encode({"action": "directive_response",
+                                                        "directive_id": directive_id, "status": "completed"}))
+                        self.acked[directive_id] = time.perf_counter()
+                    elif action == "ping":
+                        await ws.send(self.wire.encode({"action": "pong"}))
+        except websockets.ConnectionClosed:
+            pass
+
+    async def run_dashboard(self, ws):
+        try:
+            async for raw in ws:
+                for message in unpack(json.loads(raw)):
+                    directive = message.get("directive")
+                    if message.get("type") == "directive_update" and directive and directive["status"] == "completed":
+                        self.broadcast[directive["id"]] = time.perf_counter()
+                        if self._done.is_set() and len(self.broadcast) >= len(self.requested):
+                            return
+        except websockets.ConnectionClosed:
+            pass
+
+    # ----------------------------
+    # Directive traffic
+    # ----------------------------
+    async def send_directive(self, client: httpx.AsyncClient, agent_id: str, index: int):
+        started = time.perf_counter()
+        try:
+            response = await client.post(f"/api/send_directive/{agent_id}", json={"task": "load_test", "seq": index})
+            body = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            self.error(type(e).__name__)
+            return
+        finished = time.perf_counter()
+        if response.status_code != 200 or body.get("status") != "success":
+            self.error(f"http_{response.status_code}")
+            return
+        # "📨 Directive '<id>' sent to ..." / "⏳ Directive '<id>' queued for ..."
+        directive_id = body["message"].split("'")[1]
+        self.requested[directive_id] = started
+        self.created[directive_id] = finished
+
+    async def drive(self, client: httpx.AsyncClient) -> float:
+        """
+        Issue directives at the target rate, open loop: a slow server does not slow the schedule.
+        """
+        total = int(self.rate * self.duration)
+        tasks = []
+        start = time.perf_counter()
+        for index in range(total):
+            delay = start + index / self.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            agent_id = self.agent_ids[index % len(self.agent_ids)]
+            tasks.append(asyncio.create_task(self.send_directive(client, agent_id, index)))
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - start
+
+    async def run(self) -> dict:
+        semaphore = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+        async def connect(agent_id: str):
+            async with semaphore:
+                return await self.connect_agent(agent_id)
+
+        connect_started = time.perf_counter()
+        agents = await asyncio.gather(*(connect(agent_id) for agent_id in self.agent_ids))
+        connect_time = time.perf_counter() - connect_started
+        dashboard = await websockets.connect(f"{self.ws_url}/ws/directives{self.token_query('load-dashboard')}",
+                                             max_size=None, ping_interval=None)
+        self.sockets.append(dashboard)
+        listeners = [asyncio.create_task(self.run_agent(ws)) for ws in agents]
+        watcher = asyncio.create_task(self.run_dashboard(dashboard))
+
+        headers = {}
+        if self.auth:
+            from utils.token_utils import create_token
+            headers["Authorization"] = f"Bearer {create_token('load-test')}"
+        limits = httpx.Limits(max_connections=HTTP_CONNECTIONS, max_keepalive_connections=HTTP_CONNECTIONS)
+        async with httpx.AsyncClient(base_url=self.base_url, headers=headers, limits=limits, timeout=30) as client:
+            elapsed = await self.drive(client)
+
+        self._done.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(watcher), self.drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+        total_elapsed = time.perf_counter() - connect_started - connect_time
+        for ws in self.sockets:
+            await ws.close()
+        for task in listeners + [watcher]:
+            task.cancel()
+        return self.report(connect_time, elapsed, total_elapsed)
+
+    def report(self, connect_time: float, send_elapsed: float, total_elapsed: float) -> dict:
+        ids = list(self.requested)
+        complete = [i for i in ids if i in self.sent and i in self.broadcast]
+        stages = {
+            "create": [self.created[i] - self.requested[i] for i in ids],
+            "dispatch": [self.sent[i] - self.requested[i] for i in ids if i in self.sent],
+            "ack": [self.acked[i] - self.sent[i] for i in ids if i in self.acked],
+            "broadcast": [self.broadcast[i] - self.acked[i] for i in ids if i in self.acked and i in self.broadcast],
+            "round_trip": [self.broadcast[i] - self.requested[i] for i in complete],
+        }
+        attempted = int(self.rate * self.duration)
+        missing = len(ids) - len(complete)
+        if missing:
+            self.errors["missing_broadcast"] = missing
+        return {
+            "agents": len(self.agent_ids),
+            "connect_seconds": round(connect_time, 3),
+            "target_rate": self.rate,
+            "attempted": attempted,
+            "created": len(ids),
+            "completed": len(complete),
+            "offered_rate": round(attempted / send_elapsed, 1) if send_elapsed else 0.0,
+            "throughput": round(len(complete) / total_elapsed, 1) if total_elapsed else 0.0,
+            "latency_ms": {stage: summarize(stages[stage]) for stage in STAGES},
+            "errors": self.errors,
+        }
+
+
+def start_server(port: int, workers: int = 1, log_level: str = "WARNING") -> subprocess.Popen:
+    """
+    Start the app with uvicorn in a child process, so the server does not share
+    an event loop (or GIL) with the simulated clients.
+    """
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    env = dict(os.environ, SENTINEL_LOG_LEVEL=log_level, PYTHONPATH=root)
+    if workers > 1:
+        env["SENTINEL_WORKER_DIR"] = tempfile.mkdtemp(prefix="sentinel-workers-")
+    command = [sys.executable, "-m", "uvicorn", "core.websocket_server:app", "--host", "127.0.0.1",
+               "--port", str(port), "--log-level", "warning", "--workers", str(workers)]
+    return subprocess.Popen(command, cwd=root, env=env)
+
+
+def wait_for_server(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/tests", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"❌ Server at {base_url} did not start within {timeout}s.")
+
+
+def print_report(report: dict):
+    print(f"🚀 {report['agents']} agents connected in {report['connect_seconds']}s")
+    print(f"📨 {report['created']}/{report['attempted']} directives created, {report['completed']} completed "
+          f"(target {report['target_rate']:g}/s, offered {report['offered_rate']}/s)")
+    print(f"📈 Throughput: {report['throughput']} round trips/s")
+    print(f"  {'stage':<11}{'count':>8}" + "".join(f"{f'p{q:g}':>10}" for q in PERCENTILES) + f"{'max':>10}   (ms)")
+    for stage, summary in report["latency_ms"].items():
+        print(f"  {stage:<11}{summary['count']:>8}"
+              + "".join(f"{summary[f'p{q:g}']:>10.2f}" for q in PERCENTILES) + f"{summary['max']:>10.2f}")
+    if report["errors"]:
+        print(f"⚠️ Errors: {report['errors']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WebSocket load test: agents, directive traffic and round-trip latency.")
+    parser.add_argument("--agents", type=int, default=DEFAULT_AGENTS)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Directives per second.")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="Seconds of directive traffic.")
+    parser.add_argument("--drain-timeout", type=float, default=DEFAULT_DRAIN_TIMEOUT)
+    parser.add_argument("--url", help="Test a running server instead of starting one, e.g. http://127.0.0.1:8000")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server.")
+    parser.add_argument("--auth", action="store_true",
+                        help="Send JWTs (server runs with SENTINEL_REQUIRE_AUTH=1 and the same SENTINEL_JWT_SECRET).")
+    parser.add_argument("--codec", default="json", help="Agent codec to negotiate: json, msgpack or cbor.")
+    parser.add_argument("--compress-min-bytes", type=int, help="Compress agent messages at least this large.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    server: Optional[subprocess.Popen] = None
+    base_url = args.url
+    if base_url is None:
+        base_url = f"http://127.0.0.1:{free_port()}"
+        server = start_server(int(base_url.rsplit(":", 1)[1]), args.workers)
+    try:
+        wait_for_server(base_url)
+        encoding = None
+        if args.codec != "json" or args.compress_min_bytes is not None:
+            encoding = {"codecs": [args.codec], "compress_min_bytes": args.compress_min_bytes}
+        report = asyncio.run(LoadTest(base_url, args.agents, args.rate, args.duration,
+                                      args.drain_timeout, args.auth, encoding).run())
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    sys.exit(1 if report["errors"] else 0)
@@ -1,15 +1,61 @@
 import uuid
-from datetime import datetime
+
+from core.logging_config import get_logger
+from core.records import AGENT_STATUSES, AgentRecord
+
+log = get_logger("agent_manager")
+
+
+def parse_stake(value) -> float:
+    """
+    Coerce an agent-supplied stake to a number.
+
+    :raises ValueError: If it is not a finite number (or numeric string).
+    """
+    if isinstance(value, bool):
+        raise ValueError("❌ Token stake must be a number.")
+    try:
+        stake = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("❌ Token stake must be a number.")
+    if stake != stake or stake in (float("inf"), float("-inf")):
+        raise ValueError("❌ Token stake must be a number.")
+    return int(stake) if stake.is_integer() else stake
+
+
+def validate_metadata(agent_metadata) -> dict:
+    """
+    Check the types of agent-supplied metadata before it reaches the registry,
+    coercing the stake to a number.
+
+    :raises ValueError: If a field has the wrong type.
+    """
+    if not isinstance(agent_metadata, dict):
+        raise ValueError("❌ Agent metadata must be an object.")
+    metadata = dict(agent_metadata)
+    if 'agent_id' in metadata and not isinstance(metadata['agent_id'], str):
+        raise ValueError("❌ Agent ID must be a string.")
+    for field in ('name', 'type'):
+        if metadata.get(field) is not None and not isinstance(metadata[field], str):
+            raise ValueError(f"❌ Agent {field} must be a string.")
+    capabilities = metadata.get('capabilities')
+    if capabilities is not None and (not isinstance(capabilities, (list, tuple))
+                                     or not all(isinstance(c, str) for c in capabilities)):
+        raise ValueError("❌ Agent capabilities must be a list of strings.")
+    metadata['token_stake'] = parse_stake(metadata.get('token_stake', 0))
+    return metadata
 
 class AgentManager:
-    def __init__(self):
-        self.agents = {}  # Store registered agents
+    def __init__(self, fleet=None):
+        self.agents = {}  # Store registered agents as compact AgentRecords
         self.min_stake = 10000  # Minimum token stake required for agent registration
+        self.fleet = fleet  # Optional FleetRegistry kept in sync for vectorized fleet stats
 
     def register_agent(self, agent_metadata):
         """
         Registers a new agent after validating metadata and stake.
         """
+        agent_metadata = validate_metadata(agent_metadata)
         agent_id = agent_metadata.get('agent_id', str(uuid.uuid4()))
         token_stake = agent_metadata.get('token_stake', 0)
 
@@ -21,27 +67,77 @@ class AgentManager:
         if agent_id in self.agents:
             raise ValueError(f"❌ Agent ID '{agent_id}' is already registered.")
 
-        # Add additional metadata
-        agent_metadata.update({
-            'agent_id': agent_id,
-            'registered_on': datetime.utcnow().isoformat(),
-            'status': 'active'
-        })
+        # Registration time and status are added by the record
+        agent = AgentRecord.from_metadata(agent_id, agent_metadata)
+        self.agents[agent_id] = agent
+        if self.fleet is not None:
+            self.fleet.upsert(agent_id, token_stake, agent.type, agent.status_name, agent.registered_on)
+        log.info("agent_registered", f"✅ Agent '{agent_id}' registered successfully.", agent_id=agent_id)
 
-        self.agents[agent_id] = agent_metadata
-        print(f"✅ Agent '{agent_id}' registered successfully.")
+    def upsert_agent(self, agent_metadata):
+        """
+        Registers an agent, or refreshes the stake and status of one that is
+        already registered (e.g. when it reconnects).
+
+        :raises ValueError: If the metadata is malformed or the stake is too low.
+        """
+        agent_metadata = validate_metadata(agent_metadata)
+        agent = self.agents.get(agent_metadata.get('agent_id'))
+        if agent is None:
+            self.register_agent(agent_metadata)
+            return
+        token_stake = agent_metadata.get('token_stake', 0)
+        if token_stake < self.min_stake:
+            raise ValueError(f"❌ Insufficient token stake! Minimum required: {self.min_stake}")
+        agent.token_stake = token_stake
+        agent.set_status('active')
+        if self.fleet is not None:
+            self.fleet.upsert(agent.agent_id, token_stake, agent.type, 'active')
+        log.info("agent_reregistered", f"🔄 Agent '{agent.agent_id}' re-registered with stake {token_stake}.",
+                 agent_id=agent.agent_id, stake=token_stake)
 
     def list_agents(self):
         """
         Returns a list of all registered agents.
         """
-        return list(self.agents.values())
+        return [agent.to_dict() for agent in self.agents.values()]
+
+    def export_agents(self, status=None, agent_type=None, min_stake=None, skipped=False):
+        """
+        Yields registered agents one at a time, optionally filtered, for streaming exports.
+
+        The export is a consistent snapshot taken when it starts: agents registered
+        later are left out, agents removed since are still included, and each agent
+        keeps the stake and status it had then. Those are the only fields of a record
+        that change, so they are copied alongside the records rather than the records themselves.
+
+        :param skipped: Also yield None for every agent the filters pass over, so a
+                        streaming consumer can yield to the event loop during long scans.
+        """
+        status_code = AGENT_STATUSES.codes.get(status) if status is not None else None
+        if status is not None and status_code is None:
+            return
+        snapshot = [(agent, agent.token_stake, agent.status) for agent in self.agents.values()]
+        for agent, token_stake, agent_status in snapshot:
+            if ((status_code is not None and agent_status != status_code)
+                    or (agent_type is not None and agent.type != agent_type)
+                    or (min_stake is not None and token_stake < min_stake)):
+                if skipped:
+                    yield None
+                continue
+            row = agent.to_dict()
+            row["token_stake"] = token_stake
+            row["status"] = AGENT_STATUSES.names[agent_status]
+            yield row
 
     def get_agent(self, agent_id):
         """
         Retrieves metadata of a specific agent by ID.
         """
-        return self.agents.get(agent_id, f"❌ Agent ID '{agent_id}' not found.")
+        agent = self.agents.get(agent_id)
+        if agent is None:
+            return f"❌ Agent ID '{agent_id}' not found."
+        return agent.to_dict()
 
     def update_agent_status(self, agent_id, status):
         """
@@ -49,8 +145,10 @@ class AgentManager:
         """
         if agent_id not in self.agents:
             raise ValueError(f"❌ Agent ID '{agent_id}' not found.")
-        self.agents[agent_id]['status'] = status
-        print(f"🔄 Agent '{agent_id}' status updated to '{status}'.")
+        self.agents[agent_id].set_status(status)
+        if self.fleet is not None:
+            self.fleet.update_status(agent_id, status)
+        log.info("agent_status", f"🔄 Agent '{agent_id}' status updated to '{status}'.", agent_id=agent_id, status=status)
 
     def remove_agent(self, agent_id):
         """
@@ -58,6 +156,8 @@ class AgentManager:
         """
         if agent_id in self.agents:
             del self.agents[agent_id]
-            print(f"🗑️ Agent '{agent_id}' removed successfully.")
+            if self.fleet is not None:
+                self.fleet.remove(agent_id)
+            log.info("agent_removed", f"🗑️ Agent '{agent_id}' removed successfully.", agent_id=agent_id)
         else:
-            print(f"❌ Agent ID '{agent_id}' not found.")
+            log.warning("agent_not_found", f"❌ Agent ID '{agent_id}' not found.", agent_id=agent_id)
@@ -0,0 +1,73 @@
+import os
+from typing import Optional
+
+from fastapi import Depends, HTTPException, WebSocket, WebSocketException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from prometheus_client import REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from utils.token_utils import MIN_SECRET_BYTES, SECRET_CONFIGURED, token_cache, verify_token_cached
+
+# Reject requests without a token. When off, a token is optional but must be valid if sent.
+# Tokens are issued by POST /api/token (guarded by SENTINEL_TOKEN_ISSUER_KEY, see core.routes)
+# and by wallet login (POST /api/solana_challenge, then /api/solana_auth); all are mounted on the server app.
+REQUIRE_AUTH = os.environ.get("SENTINEL_REQUIRE_AUTH", "0") == "1"
+if REQUIRE_AUTH and not SECRET_CONFIGURED:
+    # Refuse to start rather than enforce tokens anyone could forge
+    raise RuntimeError(f"❌ SENTINEL_REQUIRE_AUTH=1 needs SENTINEL_JWT_SECRET of at least {MIN_SECRET_BYTES} bytes.")
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def require_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> Optional[str]:
+    """
+    FastAPI dependency that verifies the bearer token and returns its agent_id.
+    """
+    if credentials is None:
+        if REQUIRE_AUTH:
+            raise HTTPException(status_code=401, detail="❌ Missing bearer token.",
+                                headers={"WWW-Authenticate": "Bearer"})
+        return None
+    try:
+        return verify_token_cached(credentials.credentials)
+    except ValueError as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+
+
+async def require_websocket_token(websocket: WebSocket) -> Optional[str]:
+    """
+    WebSocket dependency that verifies a token passed as `?token=` or an
+    `Authorization: Bearer` header and returns its agent_id.
+    """
+    token = websocket.query_params.get("token")
+    if token is None:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and credentials:
+            token = credentials
+    if token is None:
+        if REQUIRE_AUTH:
+            raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Missing token")
+        return None
+    try:
+        return verify_token_cached(token)
+    except ValueError as e:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=str(e))
+
+
+class TokenCacheCollector:
+    """
+    Exposes token cache statistics on /metrics. Values are read at scrape time,
+    so verification itself only bumps plain integer counters.
+    """
+    def collect(self):
+        yield CounterMetricFamily("sentinel_token_cache_hits", "Token verifications served from the cache.",
+                                  value=token_cache.hits)
+        yield CounterMetricFamily("sentinel_token_cache_misses", "Token verifications that required a full decode.",
+                                  value=token_cache.misses)
+        yield GaugeMetricFamily("sentinel_token_cache_hit_ratio", "Share of token verifications served from the cache.",
+                                value=token_cache.hit_rate)
+        yield GaugeMetricFamily("sentinel_token_cache_entries", "Verified tokens currently cached.",
+                                value=len(token_cache))
+
+
+REGISTRY.register(TokenCacheCollector())
@@ -0,0 +1,284 @@
+import asyncio
+import time
+from typing import Callable, Dict, Iterable, Iterator, Optional, Set, Tuple, Union
+
+from fastapi.websockets import WebSocket
+from core.frames import Frame, encode_batch, encode_frame
+from core.logging_config import get_logger
+from core.subscriptions import ALL_TOPICS, SubscriptionIndex
+
+log = get_logger("broadcast_hub")
+
+# ----------------------------
+# Slow-Consumer Policies
+# ----------------------------
+DROP_OLDEST = "drop_oldest"    # Discard the oldest queued frame to make room
+DROP_NEWEST = "drop_newest"    # Discard the frame being published
+DISCONNECT = "disconnect"      # Evict the slow client and close its socket
+SLOW_CONSUMER_POLICIES = (DROP_OLDEST, DROP_NEWEST, DISCONNECT)
+
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_SEND_TIMEOUT = 5.0  # Seconds a single send may stall before the client is evicted
+REPLACED_CLOSE_CODE = 4000  # Sent to a connection displaced by a newer one under the same key
+
+# Limits for client-requested micro-batching
+MAX_BATCH_WINDOW = 0.1  # Seconds
+MAX_BATCH_MESSAGES = 500
+
+
+class ClientChannel:
+    """
+    Bounded outbound queue plus a dedicated writer task for one WebSocket.
+
+    Publishers never await the socket: they enqueue and return, and the writer
+    drains the queue at whatever pace the client can sustain.
+    """
+    def __init__(self, hub: "BroadcastHub", key: str, websocket: WebSocket):
+        self.hub = hub
+        self.key = key
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=hub.max_queue)
+        self.dropped = 0
+        self.closed = False
+        self.implicit_wildcard = False  # Subscribed to everything until the client picks topics
+        self.batch_window = 0.0  # Micro-batching is off until the client opts in
+        self.batch_max = 1
+        self.wire = None  # Negotiated core.codecs.WireFormat; None sends JSON text
+        self._writer = asyncio.create_task(self._run())
+
+    def enqueue(self, message: Union[dict, Frame]) -> bool:
+        """
+        Queue a message for delivery, applying the hub's slow-consumer policy when full.
+
+        :return: True if the message was queued.
+        """
+        if self.closed:
+            return False
+        frame = encode_frame(message)
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        self.dropped += 1
+        self.hub.dropped += 1
+        if self.hub.policy == DROP_NEWEST:
+            return False
+        if self.hub.policy == DROP_OLDEST:
+            self.queue.get_nowait()
+            self.queue.put_nowait(frame)
+            return True
+
+        self.hub.evict(self.key, self, reason="outbound queue full")
+        return False
+
+    def configure_batching(self, window: float, max_messages: int):
+        """
+        Coalesce frames queued within `window` seconds, up to `max_messages`, into one
+        {"action": "batch", "messages": [...]} frame. Values are clamped to the hub limits.
+        """
+        self.batch_window = min(max(window, 0.0), MAX_BATCH_WINDOW)
+        self.batch_max = min(max(int(max_messages), 1), MAX_BATCH_MESSAGES)
+
+    async def _run(self):
+        try:
+            while not self.closed:
+                frame = await self.queue.get()
+                count = 1
+                if self.batch_max > 1:
+                    frame, count = await self._collect_batch(frame)
+                started = time.perf_counter()
+                if self.wire is not None and self.wire.binary:
+                    send = self.websocket.send_bytes(self.wire.encode_frame(frame))
+                else:
+                    send = self.websocket.send_text(frame.text)
+                await asyncio.wait_for(send, self.hub.send_timeout)
+                if self.hub.on_send is not None:
+                    self.hub.on_send(count, time.perf_counter() - started)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning("client_send_failed", f"❌ Failed to send to '{self.key}': {e}", client=self.key)
+            self.hub.evict(self.key, self, reason=str(e) or type(e).__name__)
+
+    async def _collect_batch(self, first: Frame) -> Tuple[Frame, int]:
+        # Give a burst a short window to accumulate unless the batch is already full
+        if self.batch_window and self.queue.qsize() < self.batch_max - 1:
+            await asyncio.sleep(self.batch_window)
+        frames = [first]
+        while len(frames) < self.batch_max and not self.queue.empty():
+            frames.append(self.queue.get_nowait())
+        return (frames[0] if len(frames) == 1 else encode_batch(frames)), len(frames)
+
+    def close(self):
+        """
+        Stop the writer task. Queued frames are discarded.
+        """
+        self.closed = True
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+
+class BroadcastHub:
+    """
+    Fans messages out to many WebSocket clients without letting one slow client stall the rest.
+    """
+    def __init__(self, max_queue: int = DEFAULT_QUEUE_SIZE, policy: str = DROP_OLDEST,
+                 send_timeout: float = DEFAULT_SEND_TIMEOUT):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"❌ Unknown slow-consumer policy '{policy}'. Expected one of {SLOW_CONSUMER_POLICIES}")
+        self.max_queue = max_queue
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.channels: Dict[str, ClientChannel] = {}
+        self.subscriptions = SubscriptionIndex()
+        self.dropped = 0  # Frames dropped by the slow-consumer policy, across all connections
+        # Optional hook called with (frame, topics) for every local publish, e.g. to
+        # forward it to other worker processes
+        self.relay: Optional[Callable[[Frame, Optional[Tuple[str, ...]]], None]] = None
+        # Optional hook called with (message, topics) for messages relayed in from other
+        # workers, in place of publishing them as they are
+        self.ingest: Optional[Callable[[dict, Optional[Tuple[str, ...]]], None]] = None
+        # Optional metric hooks: on_send(messages, seconds) after each socket write and
+        # on_publish(seconds) after each fan-out
+        self.on_send: Optional[Callable[[int, float], None]] = None
+        self.on_publish: Optional[Callable[[float], None]] = None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.channels
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.channels)
+
+    def get(self, key: str) -> Optional[ClientChannel]:
+        return self.channels.get(key)
+
+    def register(self, key: str, websocket: WebSocket, topics: Optional[Iterable[str]] = None) -> ClientChannel:
+        """
+        Attach a connection to the hub, replacing any previous connection under the same key.
+        The displaced socket is closed in the background, so its handler stops too.
+
+        :param topics: Fixed topics for the connection. When omitted the connection receives
+                       every topic until it sends its first explicit subscription.
+        """
+        previous = self.channels.pop(key, None)
+        if previous:
+            previous.close()
+            if previous.websocket is not websocket:
+                asyncio.create_task(self._close_socket(previous.websocket, REPLACED_CLOSE_CODE))
+        self.subscriptions.unsubscribe(key)
+        channel = ClientChannel(self, key, websocket)
+        self.channels[key] = channel
+        if topics is None:
+            channel.implicit_wildcard = True
+            topics = (ALL_TOPICS,)
+        self.subscriptions.subscribe(key, topics)
+        return channel
+
+    def subscribe(self, key: str, topics: Iterable[str]) -> Set[str]:
+        """
+        Add topics for a connection. The first explicit subscription replaces the implicit wildcard.
+
+        :return: The connection's topics after the change.
+        """
+        channel = self.channels.get(key)
+        if channel is None:
+            raise ValueError(f"❌ Connection '{key}' is not registered.")
+        if channel.implicit_wildcard:
+            channel.implicit_wildcard = False
+            self.subscriptions.unsubscribe(key, (ALL_TOPICS,))
+        self.subscriptions.subscribe(key, topics)
+        return self.subscriptions.topics_for(key)
+
+    def unsubscribe(self, key: str, topics: Iterable[str]) -> Set[str]:
+        """
+        Remove topics for a connection. Any unsubscribe also ends the implicit wildcard,
+        leaving only the topics the client explicitly asked for.
+
+        :return: The connection's topics after the change.
+        """
+        channel = self.channels.get(key)
+        if channel is not None and channel.implicit_wildcard:
+            channel.implicit_wildcard = False
+            self.subscriptions.unsubscribe(key, (ALL_TOPICS,))
+        self.subscriptions.unsubscribe(key, topics)
+        return self.subscriptions.topics_for(key)
+
+    def unregister(self, key: str, websocket: Optional[WebSocket] = None):
+        """
+        Detach a connection. When `websocket` is given, only that exact socket is removed,
+        so a stale disconnect cannot drop a newer connection that reused the key.
+        """
+        channel = self.channels.get(key)
+        if channel is None or (websocket is not None and channel.websocket is not websocket):
+            return
+        del self.channels[key]
+        self.subscriptions.unsubscribe(key)
+        channel.close()
+
+    def evict(self, key: str, channel: ClientChannel, reason: str = ""):
+        """
+        Remove a failed or slow client and close its socket in the background.
+        """
+        if self.channels.get(key) is channel:
+            del self.channels[key]
+            self.subscriptions.unsubscribe(key)
+        channel.close()
+        log.warning("client_evicted", f"🧹 Evicted client '{key}' from broadcast hub: {reason}", client=key, reason=reason)
+        asyncio.create_task(self._close_socket(channel.websocket))
+
+    @staticmethod
+    async def _close_socket(websocket: WebSocket, code: int = 1008):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    def publish(self, message: Union[dict, Frame], topics: Optional[Iterable[str]] = None,
+                relay: bool = True) -> int:
+        """
+        Queue a message without waiting for delivery. The message is encoded once and the
+        same frame is shared by all recipients.
+
+        :param topics: Only connections subscribed to one of these topics (or to '*') receive
+                       the message. When omitted every connection receives it.
+        :param relay: Pass the message to the `relay` hook as well; False for messages
+                      that were themselves relayed in.
+        :return: Number of local clients the message was queued for.
+        """
+        started = time.perf_counter()
+        if topics is not None:
+            topics = tuple(topics)
+        if relay and self.relay is not None:
+            frame = encode_frame(message)
+            self.relay(frame, topics)
+            message = frame
+
+        if topics is None:
+            recipients = list(self.channels.values())
+        else:
+            recipients = [self.channels[key] for key in self.subscriptions.match(topics) if key in self.channels]
+        if not recipients:
+            return 0
+
+        frame = encode_frame(message)
+        delivered = 0
+        for channel in recipients:
+            if channel.enqueue(frame):
+                delivered += 1
+        if self.on_publish is not None:
+            self.on_publish(time.perf_counter() - started)
+        return delivered
+
+    def clear(self):
+        """
+        Detach every connection.
+        """
+        for channel in self.channels.values():
+            channel.close()
+        self.channels.clear()
+        self.subscriptions.clear()
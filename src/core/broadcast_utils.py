@@ -1,23 +1,32 @@
-import asyncio
+import os
+from core.broadcast_hub import BroadcastHub, DEFAULT_QUEUE_SIZE, DROP_OLDEST
+from core.frames import encode_frame
+from core.logging_config import get_logger
+from core.subscriptions import agent_topic, status_topic
 
-# Store active connections globally
-active_connections = {}
+# Broadcast Hub Configuration
+BROADCAST_QUEUE_SIZE = int(os.environ.get("SENTINEL_BROADCAST_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+SLOW_CONSUMER_POLICY = os.environ.get("SENTINEL_SLOW_CONSUMER_POLICY", DROP_OLDEST)
+
+log = get_logger("broadcast")
+
+# Dashboards watching directive updates
+directive_hub = BroadcastHub(max_queue=BROADCAST_QUEUE_SIZE, policy=SLOW_CONSUMER_POLICY)
+
+# Agent sockets, keyed by agent_id; each is subscribed to its own agent topic only
+agent_hub = BroadcastHub(max_queue=BROADCAST_QUEUE_SIZE, policy=SLOW_CONSUMER_POLICY)
 
 async def broadcast_directive_update(directive):
     """
-    Broadcast directive updates to all connected clients.
+    Broadcast a directive update to dashboards subscribed to its agent or status,
+    and to the agent the directive belongs to.
     """
-    print(f"📡 Broadcasting Directive Update: {directive['id']}, Status: {directive['status']}")
-    disconnected_clients = []
-    for agent_id, connection in active_connections.items():
-        try:
-            await connection.send_json({
-                "type": "directive_update",
-                "directive": directive
-            })
-            print(f"✅ Sent directive_update to {agent_id}")
-        except Exception as e:
-            print(f"❌ Failed to send directive to {agent_id}: {e}")
-            disconnected_clients.append(agent_id)
-
-
+    log.debug("directive_broadcast", "📡 Broadcasting Directive Update.",
+              directive_id=directive["id"], status=directive["status"])
+    frame = encode_frame({
+        "type": "directive_update",
+        "directive": directive
+    })
+    topic = agent_topic(directive["agent_id"])
+    directive_hub.publish(frame, topics=(topic, status_topic(directive["status"])))
+    agent_hub.publish(frame, topics=(topic,))
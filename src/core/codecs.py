@@ -0,0 +1,168 @@
+import zlib
+from typing import Any, Callable, Dict, Optional, Union
+
+from core.frames import Frame, dumps, loads
+
+# Optional binary codecs; JSON is always available
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover - depends on the environment
+    cbor2 = None
+
+# ----------------------------
+# Encoding Configuration
+# ----------------------------
+DEFAULT_CODEC = "json"
+MIN_COMPRESS_BYTES = 256              # Smallest threshold a client may ask for
+COMPRESSION_LEVEL = 6
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024   # Largest decompressed message accepted
+
+# First byte of every binary frame on a connection that negotiated compression
+FLAG_RAW = 0
+FLAG_ZLIB = 1
+
+
+class Codec:
+    """
+    Message serialization for one wire format. Binary codecs are sent as binary
+    WebSocket frames; JSON is sent as text unless compression is on.
+    """
+    __slots__ = ("name", "binary", "encode", "decode")
+
+    def __init__(self, name: str, binary: bool, encode: Callable[[Any], bytes], decode: Callable[[bytes], Any]):
+        self.name = name
+        self.binary = binary
+        self.encode = encode
+        self.decode = decode
+
+    def __repr__(self) -> str:
+        return f"Codec({self.name!r})"
+
+
+CODECS: Dict[str, Codec] = {"json": Codec("json", False, dumps, loads)}
+if msgpack is not None:
+    CODECS["msgpack"] = Codec("msgpack", True, lambda message: msgpack.packb(message, use_bin_type=True),
+                              lambda data: msgpack.unpackb(data, raw=False))
+if cbor2 is not None:
+    CODECS["cbor"] = Codec("cbor", True, cbor2.dumps, cbor2.loads)
+
+
+class WireFormat:
+    """
+    A connection's negotiated codec and compression.
+
+    Text frames are always JSON, in both directions, so messages sent before
+    negotiation (or by code that doesn't know the connection's format) stay readable.
+    Binary frames carry the negotiated codec. When compression is on, every binary
+    frame starts with a flag byte: FLAG_ZLIB if the rest is zlib-compressed, FLAG_RAW
+    if not. Payloads smaller than `compress_min_bytes` are sent raw.
+    """
+    __slots__ = ("codec", "compress_min_bytes", "binary", "key")
+
+    def __init__(self, codec: Codec, compress_min_bytes: Optional[int] = None):
+        self.codec = codec
+        self.compress_min_bytes = compress_min_bytes
+        self.binary = codec.binary or compress_min_bytes is not None
+        self.key = (codec.name, compress_min_bytes)
+
+    def describe(self) -> dict:
+        return {"codec": self.codec.name, "compress_min_bytes": self.compress_min_bytes}
+
+    def encode_frame(self, frame: Frame) -> Union[str, bytes]:
+        """
+        The frame in this format. Cached on the frame, so a broadcast costs one
+        encode per format rather than one per recipient. Binary codecs encode the
+        frame's source message; the JSON bytes are only decoded for frames without one.
+        """
+        if not self.binary:
+            return frame.text
+        if frame.encodings is None:
+            frame.encodings = {}
+        data = frame.encodings.get(self.key)
+        if data is None:
+            if self.codec.name == "json":
+                payload = frame.data
+            else:
+                payload = self.codec.encode(frame.message if frame.message is not None else loads(frame.data))
+            data = frame.encodings[self.key] = self._pack(payload)
+        return data
+
+    def encode(self, message: Any) -> Union[str, bytes]:
+        if not self.binary:
+            return dumps(message).decode("utf-8")
+        return self._pack(self.codec.encode(message))
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        """
+        :raises ValueError: If the message can't be decoded.
+        """
+        try:
+            if isinstance(data, str):
+                return loads(data)
+            if self.compress_min_bytes is not None:
+                data = self._unpack(data)
+            return self.codec.decode(data)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"❌ Invalid {self.codec.name} message: {e}")
+
+    def _pack(self, payload: bytes) -> bytes:
+        if self.compress_min_bytes is None:
+            return payload
+        if len(payload) >= self.compress_min_bytes:
+            return bytes((FLAG_ZLIB,)) + zlib.compress(payload, COMPRESSION_LEVEL)
+        return bytes((FLAG_RAW,)) + payload
+
+    @staticmethod
+    def _unpack(data: bytes) -> bytes:
+        if not data:
+            raise ValueError("❌ Empty binary message.")
+        if data[0] == FLAG_RAW:
+            return data[1:]
+        if data[0] != FLAG_ZLIB:
+            raise ValueError(f"❌ Unknown compression flag {data[0]}.")
+        inflater = zlib.decompressobj()
+        payload = inflater.decompress(data[1:], MAX_MESSAGE_SIZE)
+        if inflater.unconsumed_tail:
+            raise ValueError(f"❌ Decompressed message exceeds {MAX_MESSAGE_SIZE} bytes.")
+        return payload
+
+
+JSON_WIRE = WireFormat(CODECS[DEFAULT_CODEC])
+
+
+def negotiate(options: Optional[dict]) -> WireFormat:
+    """
+    Pick a wire format from a client's {"codecs": [...], "compress_min_bytes": N} request.
+
+    The first codec in the client's preference order that the server supports wins;
+    JSON is used when none match or nothing was asked for.
+
+    :raises ValueError: If the options are malformed.
+    """
+    if not options:
+        return JSON_WIRE
+    if not isinstance(options, dict):
+        raise ValueError("❌ Invalid encoding options.")
+    codecs = options.get("codecs", [DEFAULT_CODEC])
+    if isinstance(codecs, str):
+        codecs = [codecs]
+    if not isinstance(codecs, list) or not all(isinstance(name, str) for name in codecs):
+        raise ValueError("❌ Invalid encoding options.")
+    codec = next((CODECS[name] for name in codecs if name in CODECS), CODECS[DEFAULT_CODEC])
+
+    compress_min_bytes = options.get("compress_min_bytes")
+    if compress_min_bytes is not None:
+        try:
+            compress_min_bytes = max(MIN_COMPRESS_BYTES, int(compress_min_bytes))
+        except (TypeError, ValueError):
+            raise ValueError("❌ Invalid encoding options.")
+    if codec is CODECS[DEFAULT_CODEC] and compress_min_bytes is None:
+        return JSON_WIRE
+    return WireFormat(codec, compress_min_bytes)
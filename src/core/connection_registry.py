@@ -0,0 +1,133 @@
+import uuid
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+from fastapi.websockets import WebSocket
+from core.broadcast_hub import BroadcastHub, ClientChannel
+from core.frames import Frame
+
+# ----------------------------
+# Connection Roles
+# ----------------------------
+AGENT = "agent"            # /ws/agent/{agent_id}; keyed by agent_id
+DASHBOARD = "dashboard"    # /ws/directives; one generated id per browser tab
+LOG_VIEWER = "log_viewer"  # /ws/logs; one generated id per viewer
+ROLES = (AGENT, DASHBOARD, LOG_VIEWER)
+
+
+class ConnectionRegistry:
+    """
+    Every live WebSocket connection, indexed by id and by role.
+
+    Each role has its own BroadcastHub, so a broadcast meant for dashboards is only
+    matched against dashboard connections and never queued for agents. `roles`
+    maps connection id -> role, which makes lookups by id O(1) without the caller
+    knowing which hub holds the connection.
+
+    Agents are registered under their agent_id; dashboards and log viewers get a
+    generated id, so any number of them can be connected at once.
+    """
+    def __init__(self, hubs: Dict[str, BroadcastHub]):
+        """
+        :param hubs: Role -> hub holding that role's connections.
+        """
+        for role in hubs:
+            if role not in ROLES:
+                raise ValueError(f"❌ Unknown connection role '{role}'. Expected one of {ROLES}")
+        self.hubs = hubs
+        self.roles: Dict[str, str] = {}  # connection id -> role
+
+    def __contains__(self, conn_id: str) -> bool:
+        return self.get(conn_id) is not None
+
+    def __len__(self) -> int:
+        return sum(len(hub) for hub in self.hubs.values())
+
+    def hub(self, role: str) -> BroadcastHub:
+        hub = self.hubs.get(role)
+        if hub is None:
+            raise ValueError(f"❌ No hub registered for connection role '{role}'.")
+        return hub
+
+    @staticmethod
+    def new_id(role: str) -> str:
+        return f"{role}-{uuid.uuid4().hex[:12]}"
+
+    def register(self, role: str, websocket: WebSocket, conn_id: Optional[str] = None,
+                 topics: Optional[Iterable[str]] = None) -> ClientChannel:
+        """
+        Attach a connection under `conn_id` (a new unique id when omitted). A connection
+        already registered under the same id and role is replaced, e.g. a reconnecting agent.
+
+        :param topics: Fixed topics, as for BroadcastHub.register.
+        :raises ValueError: If the id is held by a connection with a different role.
+        """
+        hub = self.hub(role)
+        conn_id = conn_id or self.new_id(role)
+        current = self.roles.get(conn_id)
+        if current is not None and current != role and conn_id in self.hubs[current]:
+            raise ValueError(f"❌ Connection ID '{conn_id}' is already in use by a {current} connection.")
+        channel = hub.register(conn_id, websocket, topics)
+        self.roles[conn_id] = role
+        return channel
+
+    def unregister(self, conn_id: str, websocket: Optional[WebSocket] = None):
+        """
+        Detach a connection. With `websocket`, only that exact socket is removed, so a
+        stale disconnect cannot drop a newer connection that reused the id.
+        """
+        role = self.roles.get(conn_id)
+        if role is None:
+            return
+        hub = self.hubs[role]
+        hub.unregister(conn_id, websocket)
+        if conn_id not in hub:  # Also covers connections the hub already evicted
+            del self.roles[conn_id]
+
+    def evict(self, conn_id: str, reason: str = ""):
+        """
+        Drop a connection and close its socket.
+        """
+        role = self.roles.pop(conn_id, None)
+        if role is None:
+            return
+        channel = self.hubs[role].get(conn_id)
+        if channel is not None:
+            self.hubs[role].evict(conn_id, channel, reason)
+
+    def get(self, conn_id: str, role: Optional[str] = None) -> Optional[ClientChannel]:
+        """
+        The connection's channel, or None if it is not connected (or has another role).
+        """
+        current = self.roles.get(conn_id)
+        if current is None or (role is not None and current != role):
+            return None
+        return self.hubs[current].get(conn_id)
+
+    def role_of(self, conn_id: str) -> Optional[str]:
+        return self.roles.get(conn_id) if conn_id in self else None
+
+    def ids(self, role: str) -> Iterator[str]:
+        return iter(self.hub(role))
+
+    def channels(self, role: str) -> Iterator[ClientChannel]:
+        return iter(list(self.hub(role).channels.values()))
+
+    def count(self, role: str) -> int:
+        return len(self.hub(role))
+
+    def counts(self) -> Dict[str, int]:
+        return {role: len(hub) for role, hub in self.hubs.items()}
+
+    def publish(self, role: str, message: Union[dict, Frame], topics: Optional[Iterable[str]] = None) -> int:
+        """
+        Broadcast to connections of one role only; see BroadcastHub.publish.
+        """
+        return self.hub(role).publish(message, topics)
+
+    def clear(self, role: Optional[str] = None):
+        """
+        Detach every connection of `role`, or every connection when omitted.
+        """
+        for name in [role] if role is not None else list(self.hubs):
+            self.hub(name).clear()
+        self.roles = {conn_id: name for conn_id, name in self.roles.items() if conn_id in self.hubs[name]}
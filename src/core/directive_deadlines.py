@@ -0,0 +1,125 @@
+import asyncio
+import time
+from typing import Callable, Dict, Optional
+
+from core.frames import Frame
+from core.logging_config import get_logger
+from core.timing_wheel import TimingWheel
+
+# ----------------------------
+# Deadline Configuration
+# ----------------------------
+DEFAULT_ACK_TIMEOUT = 10.0          # Seconds for an agent to acknowledge a directive
+DEFAULT_COMPLETION_TIMEOUT = 300.0  # Seconds from acknowledgement to a final status
+DEFAULT_MAX_RETRIES = 2             # Resends before an unacknowledged directive expires
+DEFAULT_TICK = 0.1
+
+# Directive statuses reported by agents
+ACK_STATUSES = ("acknowledged", "in-progress")
+TERMINAL_STATUSES = ("completed", "failed", "expired")  # Each frees the directive's in-flight slot
+
+log = get_logger("directive_deadlines")
+
+AWAITING_ACK = 0
+AWAITING_COMPLETION = 1
+
+
+class PendingDirective:
+    __slots__ = ("agent_id", "frame", "stage", "attempts")
+
+    def __init__(self, agent_id: str, frame: Frame):
+        self.agent_id = agent_id
+        self.frame = frame
+        self.stage = AWAITING_ACK
+        self.attempts = 1
+
+
+class DirectiveDeadlines:
+    """
+    Tracks acknowledgement and completion deadlines for dispatched directives.
+
+    All timers live in one TimingWheel driven by a single scheduler task, so the cost
+    per tick does not depend on how many directives are outstanding. A directive that
+    misses its ack deadline is resent up to `max_retries` times and then expired; one
+    that is acknowledged but never reaches a final status expires at its completion
+    deadline.
+    """
+    def __init__(self, resend: Callable[[str, Frame], bool], expire: Callable[[str, str], None],
+                 ack_timeout: float = DEFAULT_ACK_TIMEOUT,
+                 completion_timeout: float = DEFAULT_COMPLETION_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES, tick: float = DEFAULT_TICK,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param resend: Called with (agent_id, frame) to redeliver a directive; returns False if it could not be queued.
+        :param expire: Called with (directive_id, reason) when a directive gives up.
+        """
+        self.resend = resend
+        self.expire = expire
+        self.ack_timeout = ack_timeout
+        self.completion_timeout = completion_timeout
+        self.max_retries = max_retries
+        self.clock = clock
+        self.wheel = TimingWheel(tick=tick, start=clock())
+        self.pending: Dict[str, PendingDirective] = {}
+        self.retried = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def track(self, directive_id: str, agent_id: str, frame: Frame):
+        """
+        Start the ack deadline for a directive that was just dispatched.
+        """
+        self.pending[directive_id] = PendingDirective(agent_id, frame)
+        self.wheel.schedule(directive_id, self.clock() + self.ack_timeout)
+
+    def on_status(self, directive_id: str, status: str):
+        """
+        Advance a directive's deadlines based on the status an agent reported.
+        """
+        entry = self.pending.get(directive_id)
+        if entry is None:
+            return
+        if status in TERMINAL_STATUSES:
+            self.forget(directive_id)
+        elif status in ACK_STATUSES and entry.stage == AWAITING_ACK:
+            entry.stage = AWAITING_COMPLETION
+            entry.frame = None  # No more resends; release the payload
+            self.wheel.schedule(directive_id, self.clock() + self.completion_timeout)
+
+    def forget(self, directive_id: str):
+        self.pending.pop(directive_id, None)
+        self.wheel.cancel(directive_id)
+
+    def tick(self, now: Optional[float] = None):
+        """
+        Process every deadline that has passed.
+        """
+        for directive_id in self.wheel.advance(self.clock() if now is None else now):
+            entry = self.pending.get(directive_id)
+            if entry is None:
+                continue
+            if entry.stage == AWAITING_ACK and entry.attempts <= self.max_retries:
+                entry.attempts += 1
+                self.retried += 1
+                self.resend(entry.agent_id, entry.frame)
+                self.wheel.schedule(directive_id, self.clock() + self.ack_timeout)
+                continue
+
+            del self.pending[directive_id]
+            self.expired += 1
+            reason = "ack timeout" if entry.stage == AWAITING_ACK else "completion timeout"
+            try:
+                self.expire(directive_id, reason)
+            except Exception as e:
+                log.error("directive_expire_failed", f"❌ Failed to expire directive '{directive_id}': {e}",
+                          directive_id=directive_id)
+
+    async def run(self):
+        """
+        Scheduler loop; start once with asyncio.create_task().
+        """
+        while True:
+            await asyncio.sleep(self.wheel.tick)
+            self.tick()
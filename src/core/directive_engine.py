@@ -1,61 +1,333 @@
+import time
 import uuid
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from core.logger import broadcast_log
 import asyncio
 from core.broadcast_utils import broadcast_directive_update
+from core.directive_history import DirectiveHistory
+from core.directive_store import DirectiveStore
+from core.logging_config import get_logger
+from core.metrics import DIRECTIVE_DISPATCHED, record_directive_transition
+from core.records import DIRECTIVE_STATUSES, DirectiveRecord, DirectiveStatus
+from core.seq_index import SeqIndex
+
+log = get_logger("directive_engine")
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+DEFAULT_STATS_WINDOW = 10000  # Most recent matching directives included in stage statistics
+
+
+def _seqs_after(seqs, after: int) -> Iterator[int]:
+    """
+    Entries of a sorted seq list or SeqIndex greater than `after`, without copying.
+    """
+    if isinstance(seqs, SeqIndex):
+        return seqs.after(after)
+    return map(seqs.__getitem__, range(bisect_right(seqs, after), len(seqs)))
+
+
+def _byte_positions(data: bytes, value: int) -> Iterator[int]:
+    """
+    Offsets of every occurrence of a byte value, found with bytes.find rather than a Python loop.
+    """
+    needle = bytes((value,))
+    position = data.find(needle)
+    while position != -1:
+        yield position
+        position = data.find(needle, position + 1)
+
 
 class DirectiveEngine:
     """
     Manages creation, tracking, and updates of directives sent to agents.
     """
-    def __init__(self):
-        # Store directives with their unique IDs
-        self.directives = {}
+    def __init__(self, store: Optional[DirectiveStore] = None):
+        # Store directives with their unique IDs as compact records; dicts are built only for callers
+        self.directives: Dict[str, DirectiveRecord] = {}
+
+        # Secondary indexes. Every directive gets a monotonically increasing sequence
+        # number; the indexes hold sorted sequence numbers so filtered listings can
+        # resume from a cursor with a binary search instead of a full scan.
+        self._order: List[str] = []                # seq -> directive_id
+        self._seq: Dict[str, int] = {}             # directive_id -> seq
+        self._by_agent: Dict[str, List[int]] = {}  # agent_id -> sorted seqs
+        self._by_status: Dict[int, SeqIndex] = {}  # status code -> sorted seqs
+        self._by_task: Dict[str, List[int]] = {}   # task -> sorted seqs
+        self._statuses = array("B")                # seq -> status code, copied by exports
+
+        # Status events of every directive, indexed by seq
+        self.history = DirectiveHistory()
+
+        # Persistence backend; the default keeps directives in memory only
+        self.store = store or DirectiveStore()
+        for state in self.store.load():
+            directive = DirectiveRecord.from_dict(state)
+            self.directives[directive.id] = directive
+            self._index(directive, loaded=True)
+        # Only the record list is copied on the event loop; the store serializes it in its snapshot thread
+        self.store.set_snapshot_source(lambda: list(self.directives.values()), DirectiveRecord.to_state)
 
     def create_directive(self, agent_id: str, directive_data: dict) -> str:
         """
         Create a new directive for an agent.
         """
         directive_id = str(uuid.uuid4())
-        directive = {
-            "id": directive_id,
-            "agent_id": agent_id,
-            "task": directive_data.get("task", "No task specified"),
-            "status": "pending"
-        }
+        directive = DirectiveRecord(directive_id, agent_id, directive_data.get("task", "No task specified"))
         self.directives[directive_id] = directive
-        print(f"✅ Directive '{directive_id}' created for Agent '{agent_id}' with task '{directive['task']}'.")
+        self._index(directive)
+        self.store.record_create(directive.to_state())
+        log.info("directive_created", "✅ Directive created.", directive_id=directive_id, agent_id=agent_id, task=directive.task)
         return directive_id
 
-    def update_directive_status(self, directive_id: str, status: str):
+    def create_directives(self, requests: Iterable[Tuple[str, dict]]) -> List[str]:
+        """
+        Create many directives in one pass.
+
+        :param requests: (agent_id, directive_data) pairs.
+        :return: The new directive IDs, in request order.
+        """
+        directive_ids = []
+        for agent_id, directive_data in requests:
+            directive = DirectiveRecord(str(uuid.uuid4()), agent_id, directive_data.get("task", "No task specified"))
+            self.directives[directive.id] = directive
+            self._index(directive)
+            self.store.record_create(directive.to_state())
+            directive_ids.append(directive.id)
+        log.info("directives_created", f"✅ Created {len(directive_ids)} directives in bulk.", count=len(directive_ids))
+        return directive_ids
+
+    def mark_dispatched(self, directive_id: str):
+        """
+        Record that a directive went out to its agent. The directive's status is not
+        changed; the send is kept as a history event.
+        """
+        directive = self.directives.get(directive_id)
+        if directive is not None and self.history.transition(self._seq[directive_id], DirectiveStatus.SENT):
+            DIRECTIVE_DISPATCHED.observe(time.time() - directive.created_at)
+
+    def update_directive_status(self, directive_id: str, status: str) -> bool:
         """
         Update the status of an existing directive and broadcast updates.
+
+        :return: False if the directive is unknown or the transition is not allowed
+                 (e.g. a late 'in-progress' after 'completed', or an unknown status).
         """
         if directive_id in self.directives:
-            self.directives[directive_id]['status'] = status
-            print(f"🔄 Directive '{directive_id}' updated to '{status}'.")
-            asyncio.create_task(broadcast_directive_update(self.directives[directive_id]))
+            directive = self.directives[directive_id]
+            old_status = directive.status
+            code = DIRECTIVE_STATUSES.codes.get(status)
+            if code is None or code == DirectiveStatus.SENT or not self.history.transition(self._seq[directive_id], code):
+                log.warning("directive_transition_rejected", f"❌ Directive cannot move to '{status}'.",
+                            directive_id=directive_id, status=status,
+                            current=DIRECTIVE_STATUSES.names[self.history.current(self._seq[directive_id])])
+                return False
+            directive.set_status(status)
+            record_directive_transition(old_status, directive.status, directive.updated_at - directive.created_at)
+            self._reindex_status(directive_id, old_status, directive.status)
+            self.store.record_status(directive_id, status, directive.updated_at)
+            log.info("directive_status", "🔄 Directive status updated.", directive_id=directive_id, status=status)
+            asyncio.create_task(broadcast_directive_update(directive.to_dict()))
+            return True
         else:
-            print(f"❌ Directive ID '{directive_id}' not found.")
+            log.warning("directive_not_found", "❌ Directive ID not found.", directive_id=directive_id)
+            return False
 
     def get_directive(self, directive_id: str) -> dict:
         """
         Retrieve a specific directive by its ID.
-        
+
         :param directive_id: The unique ID of the directive.
         :return: Dictionary containing directive details.
         """
         if directive_id in self.directives:
-            print(f"🔍 Retrieved Directive '{directive_id}'.")
-            return self.directives[directive_id]
+            log.debug("directive_retrieved", "🔍 Retrieved Directive.", directive_id=directive_id)
+            return self.directives[directive_id].to_dict()
         else:
-            print(f"❌ Directive ID '{directive_id}' not found.")
+            log.warning("directive_not_found", "❌ Directive ID not found.", directive_id=directive_id)
             return {}
 
     def list_directives(self) -> dict:
         """
         List all current directives.
-        
+
         :return: A dictionary of all directives.
         """
-        print(f"📋 Listing all directives ({len(self.directives)} total).")
-        return self.directives
+        log.debug("directives_listed", f"📋 Listing all directives ({len(self.directives)} total).")
+        return {directive_id: directive.to_dict() for directive_id, directive in self.directives.items()}
+
+    def export_directives(self, agent_id: Optional[str] = None, status: Optional[str] = None,
+                          task: Optional[str] = None, skipped: bool = False) -> Iterator[Optional[dict]]:
+        """
+        Yield directives oldest first, optionally filtered, as a consistent snapshot for streaming exports.
+
+        The export covers the directives that existed when it started, in the status
+        each had then; later creations and status changes are left out. A status is
+        the only field of a directive that changes, so the snapshot is a copy of the
+        status column (one byte per directive) rather than of the directives.
+        Only the smallest of the matching agent, task and status sets is walked.
+
+        :param skipped: Also yield None for every directive the filters pass over,
+                        so a streaming consumer can yield to the event loop during long scans.
+        """
+        status_code = DIRECTIVE_STATUSES.codes.get(status) if status is not None else None
+        if status is not None and status_code is None:
+            return
+        end = len(self._order)
+        statuses = self._statuses[:end].tobytes()
+        candidates = []
+        if agent_id is not None:
+            candidates.append(self._by_agent.get(agent_id, []))
+        if task is not None:
+            candidates.append(self._by_task.get(task, []))
+        seqs = min(candidates, key=len) if candidates else None
+
+        if status_code is not None and (seqs is None or len(self._by_status.get(status_code, ())) < len(seqs)):
+            scan = _byte_positions(statuses, status_code)
+        elif seqs is not None:
+            # The agent and task indexes only grow, so they are walked in place
+            scan = map(seqs.__getitem__, range(bisect_left(seqs, end)))
+        else:
+            scan = range(end)
+        names = DIRECTIVE_STATUSES.names
+        for seq in scan:
+            directive = self.directives[self._order[seq]]
+            if ((agent_id is not None and directive.agent_id != agent_id)
+                    or (task is not None and directive.task != task)
+                    or (status_code is not None and statuses[seq] != status_code)):
+                if skipped:
+                    yield None
+                continue
+            row = directive.to_dict()
+            row["status"] = names[statuses[seq]]
+            yield row
+
+    def query_directives(self, agent_id: Optional[str] = None, status: Optional[str] = None,
+                         cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> dict:
+        """
+        List directives filtered by agent and/or status, oldest first, one page at a time.
+
+        :param agent_id: Only return directives for this agent.
+        :param status: Only return directives currently in this status.
+        :param cursor: Opaque cursor from a previous page's `next_cursor`.
+        :param limit: Maximum number of directives to return (capped at MAX_PAGE_SIZE).
+        :return: {"directives": [...], "next_cursor": str or None}
+        :raises ValueError: If the cursor is malformed.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        after = self._decode_cursor(cursor)
+
+        if agent_id is not None and status is not None:
+            # Walk the smaller index and check the other attribute on the record
+            status_code = DIRECTIVE_STATUSES.codes.get(status)
+            agent_seqs = self._by_agent.get(agent_id, [])
+            status_seqs = self._by_status.get(status_code, ())
+            if len(agent_seqs) <= len(status_seqs):
+                seqs, field, value = agent_seqs, "status", status_code
+            else:
+                seqs, field, value = status_seqs, "agent_id", agent_id
+            page = []
+            for seq in _seqs_after(seqs, after):
+                directive = self.directives[self._order[seq]]
+                if getattr(directive, field) == value:
+                    page.append(seq)
+                    if len(page) > limit:
+                        break
+        elif agent_id is not None or status is not None:
+            if agent_id is not None:
+                seqs = self._by_agent.get(agent_id, [])
+            else:
+                seqs = self._by_status.get(DIRECTIVE_STATUSES.codes.get(status), ())
+            page = list(islice(_seqs_after(seqs, after), limit + 1))
+        else:
+            page = list(range(after + 1, min(after + 2 + limit, len(self._order))))
+
+        has_more = len(page) > limit
+        page = page[:limit]
+        return {
+            "directives": [self.directives[self._order[seq]].to_dict() for seq in page],
+            "next_cursor": str(page[-1]) if has_more else None
+        }
+
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]) -> int:
+        if cursor is None or cursor == "":
+            return -1
+        try:
+            after = int(cursor)
+        except (TypeError, ValueError):
+            raise ValueError(f"❌ Invalid cursor '{cursor}'.")
+        if after < -1:
+            raise ValueError(f"❌ Invalid cursor '{cursor}'.")
+        return after
+
+    def directive_timeline(self, directive_id: str) -> Optional[dict]:
+        """
+        A directive's status events and the time it spent in each stage.
+
+        :return: None if the directive is unknown.
+        """
+        directive = self.directives.get(directive_id)
+        if directive is None:
+            return None
+        seq = self._seq[directive_id]
+        events = self.history.events(seq)
+        started = events[0][1]
+        timeline = directive.to_dict()
+        timeline["events"] = [{"status": DIRECTIVE_STATUSES.names[code], "at": at - started} for code, at in events]
+        timeline["stages"] = self.history.stages(seq)
+        timeline["time_in_status"] = self.history.time_in_status(seq)
+        return timeline
+
+    def stage_stats(self, agent_id: Optional[str] = None, task: Optional[str] = None,
+                    limit: int = DEFAULT_STATS_WINDOW) -> dict:
+        """
+        Stage latency distributions (queued, ack, run, total) over the most recent
+        `limit` directives, optionally for one agent and/or task.
+        """
+        if agent_id is not None and task is not None:
+            seqs = [seq for seq in self._by_agent.get(agent_id, []) if self.directives[self._order[seq]].task == task]
+        elif agent_id is not None:
+            seqs = self._by_agent.get(agent_id, [])
+        elif task is not None:
+            seqs = self._by_task.get(task, [])
+        else:
+            seqs = range(len(self._order))
+        seqs = seqs[-max(1, limit):]
+        return {
+            "agent_id": agent_id,
+            "task": task,
+            "directives": len(seqs),
+            "stages": self.history.stage_distribution(seqs)
+        }
+
+    def _index(self, directive: DirectiveRecord, loaded: bool = False):
+        seq = len(self._order)
+        self._order.append(directive.id)
+        self._seq[directive.id] = seq
+        # New sequence numbers are always the largest, so appending keeps the lists sorted
+        self._by_agent.setdefault(directive.agent_id, []).append(seq)
+        self._by_status.setdefault(directive.status, SeqIndex()).add(seq)
+        self._by_task.setdefault(directive.task, []).append(seq)
+        self._statuses.append(directive.status)
+        if not loaded:
+            self.history.start(seq)
+        else:
+            # Reloaded from the store: only creation and the current status are known
+            self.history.start(seq, at=self.history.wall_to_clock(directive.created_at))
+            self.history.transition(seq, directive.status, self.history.wall_to_clock(directive.updated_at))
+
+    def _reindex_status(self, directive_id: str, old_status: int, new_status: int):
+        if old_status == new_status:
+            return
+        seq = self._seq[directive_id]
+        self._statuses[seq] = new_status
+        old = self._by_status.get(old_status)
+        if old is not None:
+            old.discard(seq)
+            if not old:
+                del self._by_status[old_status]
+        self._by_status.setdefault(new_status, SeqIndex()).add(seq)
@@ -0,0 +1,184 @@
+import time
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from core.records import DIRECTIVE_STATUSES, DirectiveStatus
+
+# ----------------------------
+# History Configuration
+# ----------------------------
+STAGES = ("queued", "ack", "run", "total")
+STAGE_PERCENTILES = (50, 90, 99)
+END = -1  # End of a directive's event chain
+
+PENDING = DirectiveStatus.PENDING
+SENT = DirectiveStatus.SENT
+ACKNOWLEDGING = frozenset((DirectiveStatus.ACKNOWLEDGED, DirectiveStatus.IN_PROGRESS,
+                           DirectiveStatus.COMPLETED, DirectiveStatus.FAILED))
+FINISHING = frozenset((DirectiveStatus.COMPLETED, DirectiveStatus.FAILED, DirectiveStatus.EXPIRED))
+
+# Allowed moves between status codes. Repeating the current status is always accepted
+# (and not recorded); a finished directive may only be put back to pending.
+TRANSITIONS: Dict[int, frozenset] = {
+    PENDING: frozenset((SENT,)) | ACKNOWLEDGING | FINISHING,
+    SENT: ACKNOWLEDGING | FINISHING,
+    DirectiveStatus.ACKNOWLEDGED: frozenset((DirectiveStatus.IN_PROGRESS,)) | FINISHING,
+    DirectiveStatus.IN_PROGRESS: FINISHING,
+    DirectiveStatus.COMPLETED: frozenset((PENDING,)),
+    DirectiveStatus.FAILED: frozenset((PENDING,)),
+    DirectiveStatus.EXPIRED: frozenset((PENDING,)),
+}
+
+
+def can_transition(current: int, new: int) -> bool:
+    return new == current or new in TRANSITIONS.get(current, ())
+
+
+class DirectiveHistory:
+    """
+    Append-only status events for every directive, stored as flat typed arrays.
+
+    An event is (directive seq, status code, monotonic time), about 17 bytes.
+    Events of one directive are chained through `next`, and `first`/`last` give
+    each directive's chain ends, indexed by the directive's sequence number in
+    DirectiveEngine. New events are validated against TRANSITIONS, using the
+    directive's last event as its current state.
+    """
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.seq = array("i")    # event -> directive seq
+        self.code = array("B")   # event -> status code
+        self.at = array("d")     # event -> monotonic timestamp
+        self.next = array("i")   # event -> next event of the same directive, or END
+        self.first = array("i")  # directive seq -> first event
+        self.last = array("i")   # directive seq -> last event
+
+    def __len__(self) -> int:
+        return len(self.code)
+
+    def wall_to_clock(self, timestamp: float) -> float:
+        """
+        Map an epoch timestamp (e.g. from a reloaded directive) onto the history clock.
+        """
+        return self.clock() - (time.time() - timestamp)
+
+    def start(self, seq: int, code: int = PENDING, at: Optional[float] = None):
+        """
+        Open the history of a new directive. Sequence numbers must arrive in order.
+        """
+        if seq != len(self.first):
+            raise ValueError(f"❌ Directive seq {seq} out of order; expected {len(self.first)}.")
+        event = self._append(seq, code, at)
+        self.first.append(event)
+        self.last.append(event)
+
+    def current(self, seq: int) -> int:
+        return self.code[self.last[seq]]
+
+    def transition(self, seq: int, code: int, at: Optional[float] = None) -> bool:
+        """
+        Record a move to `code` if it is allowed from the directive's current state.
+
+        :return: False if the transition was rejected.
+        """
+        current = self.current(seq)
+        if not can_transition(current, code):
+            return False
+        if code != current:
+            event = self._append(seq, code, at)
+            self.next[self.last[seq]] = event
+            self.last[seq] = event
+        return True
+
+    def _append(self, seq: int, code: int, at: Optional[float]) -> int:
+        event = len(self.code)
+        self.seq.append(seq)
+        self.code.append(code)
+        self.at.append(self.clock() if at is None else at)
+        self.next.append(END)
+        return event
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def events(self, seq: int) -> List[Tuple[int, float]]:
+        """
+        (status code, timestamp) of every event of a directive, oldest first.
+        """
+        events = []
+        event = self.first[seq]
+        while event != END:
+            events.append((self.code[event], self.at[event]))
+            event = self.next[event]
+        return events
+
+    def milestones(self, seq: int) -> Tuple[float, Optional[float], Optional[float], Optional[float]]:
+        """
+        When the directive's latest attempt was created (or requeued), sent,
+        first acknowledged and finished. Missing milestones are None.
+        """
+        created = sent = acked = finished = None
+        event = self.first[seq]
+        while event != END:
+            code, at = self.code[event], self.at[event]
+            if code == PENDING:
+                created, sent, acked, finished = at, None, None, None
+            elif code == SENT:
+                sent = at
+            else:
+                if acked is None and code in ACKNOWLEDGING:
+                    acked = at
+                if finished is None and code in FINISHING:
+                    finished = at
+            event = self.next[event]
+        return created, sent, acked, finished
+
+    def stages(self, seq: int) -> Dict[str, Optional[float]]:
+        """
+        Seconds spent queued (created -> sent), waiting for the agent to act
+        (sent -> first acknowledgement), running (acknowledged -> finished) and in total.
+        """
+        created, sent, acked, finished = self.milestones(seq)
+        return {
+            "queued": sent - created if sent is not None else None,
+            "ack": acked - (sent if sent is not None else created) if acked is not None else None,
+            "run": finished - acked if finished is not None and acked is not None else None,
+            "total": finished - created if finished is not None else None
+        }
+
+    def time_in_status(self, seq: int) -> Dict[str, float]:
+        """
+        Seconds spent in each status, summed over repeats; the current status counts up to now.
+        """
+        spent: Dict[str, float] = {}
+        events = self.events(seq)
+        ends = [at for _, at in events[1:]] + [self.clock()]
+        for (code, at), end in zip(events, ends):
+            name = DIRECTIVE_STATUSES.names[code]
+            spent[name] = spent.get(name, 0.0) + (end - at)
+        return spent
+
+    def stage_distribution(self, seqs: Iterable[int],
+                           percentiles: Iterable[float] = STAGE_PERCENTILES) -> Dict[str, dict]:
+        """
+        Count, percentiles and max of each stage's latency over the given directives.
+        Directives that haven't reached a stage yet don't count towards it.
+        """
+        percentiles = list(percentiles)
+        samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        for seq in seqs:
+            for stage, seconds in self.stages(seq).items():
+                if seconds is not None:
+                    samples[stage].append(seconds)
+
+        distribution = {}
+        for stage, values in samples.items():
+            summary = {"count": len(values)}
+            if values:
+                points = np.percentile(np.asarray(values), percentiles)
+                summary.update({f"p{p:g}": float(v) for p, v in zip(percentiles, points)})
+                summary["max"] = max(values)
+            distribution[stage] = summary
+        return distribution
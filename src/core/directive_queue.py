@@ -0,0 +1,164 @@
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from core.frames import Frame
+
+# ----------------------------
+# Scheduling Configuration
+# ----------------------------
+PRIORITIES = ("high", "normal", "low")
+DEFAULT_PRIORITY = "normal"
+DEFAULT_WEIGHTS = {"high": 4, "normal": 2, "low": 1}  # Share of dispatch slots per class under contention
+DEFAULT_MAX_IN_FLIGHT = 32   # Unfinished directives an agent may hold at once
+DEFAULT_MAX_QUEUED = 1000    # Directives waiting per agent before callers are pushed back
+
+
+class QueueFullError(Exception):
+    """
+    Raised when an agent's directive queue cannot accept more work.
+    """
+    def __init__(self, agent_id: str, queued: int):
+        super().__init__(f"❌ Directive queue for Agent '{agent_id}' is full ({queued} waiting).")
+        self.agent_id = agent_id
+        self.queued = queued
+
+
+def directive_priority(directive: dict) -> str:
+    """
+    Read a directive's priority from `priority` or `payload.priority`, defaulting to normal.
+    """
+    priority = directive.get("priority")
+    if priority is None and isinstance(directive.get("payload"), dict):
+        priority = directive["payload"].get("priority")
+    return priority if priority in PRIORITIES else DEFAULT_PRIORITY
+
+
+class AgentDirectiveQueue:
+    """
+    Per-agent priority classes served by smooth weighted round-robin, so high-priority
+    directives get most dispatch slots without starving the lower classes.
+    """
+    def __init__(self, weights: Dict[str, int]):
+        self.weights = weights
+        self.classes: Dict[str, Deque[Tuple[str, Frame]]] = {priority: deque() for priority in PRIORITIES}
+        self.credit: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+        self.in_flight: Set[str] = set()
+        self.queued = 0
+
+    def push(self, priority: str, directive_id: str, frame: Frame):
+        self.classes[priority].append((directive_id, frame))
+        self.queued += 1
+
+    def push_front(self, priority: str, directive_id: str, frame: Frame):
+        """
+        Put back a directive that could not be sent, ahead of the rest of its class.
+        """
+        self.classes[priority].appendleft((directive_id, frame))
+        self.queued += 1
+
+    def pop(self) -> Optional[Tuple[str, str, Frame]]:
+        """
+        :return: (priority, directive_id, frame) of the next directive to send, or None.
+        """
+        ready = [priority for priority in PRIORITIES if self.classes[priority]]
+        if not ready:
+            return None
+        total = 0
+        chosen = ready[0]
+        for priority in ready:
+            self.credit[priority] += self.weights[priority]
+            total += self.weights[priority]
+            if self.credit[priority] > self.credit[chosen]:
+                chosen = priority
+        self.credit[chosen] -= total
+        if len(ready) == 1:
+            # No contention: don't let credit accumulate for later bursts
+            self.credit[chosen] = 0
+        self.queued -= 1
+        directive_id, frame = self.classes[chosen].popleft()
+        return chosen, directive_id, frame
+
+
+class DirectiveScheduler:
+    """
+    Holds directives in per-agent priority queues and releases them to the agent's
+    connection while it has fewer than `max_in_flight` unfinished directives.
+    """
+    def __init__(self, send: Callable[[str, str, Frame], bool],
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, max_queued: int = DEFAULT_MAX_QUEUED,
+                 weights: Optional[Dict[str, int]] = None):
+        """
+        :param send: Called with (agent_id, directive_id, frame) to put a directive on the wire;
+                     returns False if it could not be queued on the connection.
+        """
+        self.send = send
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.queues: Dict[str, AgentDirectiveQueue] = {}
+        self.in_flight: Dict[str, str] = {}  # directive_id -> agent_id
+
+    def can_accept(self, agent_id: str, count: int = 1) -> bool:
+        queue = self.queues.get(agent_id)
+        return queue is None or queue.queued + count <= self.max_queued
+
+    def submit(self, agent_id: str, directive_id: str, frame: Frame, priority: str = DEFAULT_PRIORITY) -> bool:
+        """
+        Queue a directive and dispatch it if the agent has a free in-flight slot.
+
+        :return: True if it was sent immediately, False if it is waiting in the queue.
+        :raises QueueFullError: If the agent already has `max_queued` directives waiting.
+        """
+        queue = self.queues.get(agent_id)
+        if queue is None:
+            queue = self.queues[agent_id] = AgentDirectiveQueue(self.weights)
+        if queue.queued >= self.max_queued:
+            raise QueueFullError(agent_id, queue.queued)
+        queue.push(priority, directive_id, frame)
+        return directive_id in self._pump(agent_id, queue)
+
+    def release(self, directive_id: str):
+        """
+        Free the in-flight slot held by a finished or expired directive and dispatch the next one.
+        """
+        agent_id = self.in_flight.pop(directive_id, None)
+        if agent_id is None:
+            return
+        queue = self.queues.get(agent_id)
+        if queue is None:
+            return
+        queue.in_flight.discard(directive_id)
+        self._pump(agent_id, queue)
+        if not queue.in_flight and not queue.queued:
+            del self.queues[agent_id]
+
+    def drop_agent(self, agent_id: str) -> List[str]:
+        """
+        Forget an agent's queue, e.g. when it disconnects. In-flight directives stay with
+        their ack/completion deadlines; the caller must settle the waiting ones.
+
+        :return: IDs of directives that were still waiting.
+        """
+        queue = self.queues.pop(agent_id, None)
+        if queue is None:
+            return []
+        for directive_id in queue.in_flight:
+            del self.in_flight[directive_id]
+        return [directive_id for items in queue.classes.values() for directive_id, _ in items]
+
+    def _pump(self, agent_id: str, queue: AgentDirectiveQueue) -> List[str]:
+        sent = []
+        while len(queue.in_flight) < self.max_in_flight:
+            item = queue.pop()
+            if item is None:
+                break
+            priority, directive_id, frame = item
+            if not self.send(agent_id, directive_id, frame):
+                # The agent's connection is gone: keep the directive waiting instead of
+                # losing it. drop_agent() hands it back when the agent is cleaned up.
+                queue.push_front(priority, directive_id, frame)
+                break
+            queue.in_flight.add(directive_id)
+            self.in_flight[directive_id] = agent_id
+            sent.append(directive_id)
+        return sent
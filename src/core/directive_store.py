@@ -0,0 +1,419 @@
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.frames import dumps
+from core.logging_config import get_logger
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - depends on the environment
+    loads = json.loads
+
+log = get_logger("directive_store")
+
+# ----------------------------
+# Store Configuration
+# ----------------------------
+DEFAULT_COMMIT_INTERVAL = 0.002   # Seconds the writer lingers to grow a commit batch
+DEFAULT_SNAPSHOT_EVERY = 500_000  # WAL records between compacted snapshots
+READ_CHUNK_SIZE = 1 << 20
+
+SEGMENT_PATTERN = re.compile(r"^wal-(\d{8})\.log$")
+SNAPSHOT_PATTERN = re.compile(r"^snapshot-(\d{8})\.jsonl$")
+LOCK_FILE = "LOCK"  # Held with flock() by the process that has the directory open
+
+
+class StoreLockedError(RuntimeError):
+    """
+    Raised when another process already has a store directory open.
+    """
+
+
+class DirectiveStore:
+    """
+    Persistence backend interface for DirectiveEngine. The base class keeps nothing,
+    which is the in-memory behaviour the engine has always had.
+    """
+    def load(self) -> List[dict]:
+        """
+        Return recovered directives in creation order.
+        """
+        return []
+
+    def set_snapshot_source(self, source: Callable[[], List[Any]],
+                            serialize: Optional[Callable[[Any], dict]] = None):
+        """
+        Register the current directives for compaction.
+
+        :param source: Returns the current directives. Called in the writer's thread,
+                       so it should be a cheap copy (e.g. a list of records).
+        :param serialize: Turns one item from `source` into its stored dict. Called
+                          off the event loop while the snapshot is written.
+        """
+
+    def record_create(self, directive: dict):
+        pass
+
+    def record_status(self, directive_id: str, status: str, updated_at: Optional[float] = None):
+        pass
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every record written so far is durable.
+        """
+        return True
+
+    def close(self):
+        pass
+
+
+class WALDirectiveStore(DirectiveStore):
+    """
+    Append-only write-ahead log with group-commit fsync and periodic compacted snapshots.
+
+    Writers only serialize the record and hand it to a background thread, which writes
+    everything that accumulated since its last commit in one write() and one fsync().
+    Every `snapshot_every` records the log rolls over to a new segment and the current
+    state is written to a snapshot in another thread; once the snapshot is durable the
+    segments it covers are deleted. Recovery loads the newest snapshot and replays the
+    segments written after it.
+
+    Only one process may have a directory open at a time (see open_worker_store()
+    for several workers sharing one root).
+
+    Directory layout:
+        LOCK                 flock()ed while the store is open
+        snapshot-<N>.jsonl   header line, then one directive per line; covers segments < N
+        wal-<N>.log          one record per line: {"op": "c", "d": {...}} or {"op": "s", "id": ..., "s": ..., "t": ...}
+
+    :raises StoreLockedError: If another process has the directory open.
+    """
+    def __init__(self, directory: str, commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+                 snapshot_every: int = DEFAULT_SNAPSHOT_EVERY):
+        self.directory = directory
+        self.commit_interval = commit_interval
+        self.snapshot_every = snapshot_every
+        os.makedirs(directory, exist_ok=True)
+        # Snapshots delete the segments they cover, so a second writer would destroy our records
+        self._lock = self._acquire_lock()
+
+        self._cond = threading.Condition()
+        self._pending: List[object] = []  # Encoded lines, or an int segment number to roll over to
+        self._appended = 0
+        self._durable = 0
+        self._closing = False
+        self._error: Optional[BaseException] = None
+
+        self._segment = 0
+        self._open_segment = 0  # Segment the writer thread is currently appending to
+        self._records_in_segment = 0
+        self._snapshot_source: Optional[Callable[[], List[Any]]] = None
+        self._snapshot_serialize: Optional[Callable[[Any], dict]] = None
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._writer: Optional[threading.Thread] = None
+        self._file = None
+
+    # ----------------------------
+    # Recovery
+    # ----------------------------
+
+    def load(self) -> List[dict]:
+        """
+        Rebuild state from the newest snapshot plus the log tail, then start the writer.
+        """
+        snapshots, segments = self._scan()
+        directives: Dict[str, dict] = {}
+        base = 0
+        for number in sorted(snapshots, reverse=True):
+            try:
+                directives = self._read_snapshot(number)
+                base = number
+                break
+            except (OSError, ValueError) as e:
+                log.error("snapshot_unreadable", f"❌ Skipping unreadable snapshot {number}: {e}", snapshot=number)
+
+        replayed = 0
+        for number in sorted(n for n in segments if n >= base):
+            replayed += self._replay_segment(number, directives)
+
+        # Never append to a segment that may end in a torn write
+        self._segment = max([base] + segments) + 1
+        self._open_segment = self._segment
+        self._file = open(self._segment_path(self._segment), "ab")
+        self._writer = threading.Thread(target=self._run_writer, name="directive-wal-writer", daemon=True)
+        self._writer.start()
+        log.info("store_recovered", f"💾 Recovered {len(directives)} directives (snapshot {base}, {replayed} log records replayed).",
+                 directives=len(directives), snapshot=base, replayed=replayed)
+        return list(directives.values())
+
+    def _scan(self) -> Tuple[List[int], List[int]]:
+        snapshots, segments = [], []
+        for name in os.listdir(self.directory):
+            match = SNAPSHOT_PATTERN.match(name)
+            if match:
+                snapshots.append(int(match.group(1)))
+                continue
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                segments.append(int(match.group(1)))
+        return snapshots, segments
+
+    def _read_snapshot(self, number: int) -> Dict[str, dict]:
+        directives: Dict[str, dict] = {}
+        with open(self._snapshot_path(number), "rb") as f:
+            header = loads(f.readline())
+            for line in f:
+                directive = loads(line)
+                directives[directive["id"]] = directive
+        if len(directives) != header.get("count"):
+            raise ValueError(f"expected {header.get('count')} directives, found {len(directives)}")
+        return directives
+
+    def _replay_segment(self, number: int, directives: Dict[str, dict]) -> int:
+        replayed = 0
+        remainder = b""
+        with open(self._segment_path(number), "rb") as f:
+            while True:
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                lines = (remainder + chunk).split(b"\n")
+                remainder = lines.pop()
+                for line in lines:
+                    if line:
+                        self._apply(loads(line), directives)
+                        replayed += 1
+        if remainder:
+            # A trailing line without a newline is a write torn by a crash
+            try:
+                self._apply(loads(remainder), directives)
+                replayed += 1
+            except ValueError:
+                log.warning("wal_torn_record", f"⚠️ Ignoring torn record at the end of WAL segment {number}.", segment=number)
+        return replayed
+
+    @staticmethod
+    def _apply(record: dict, directives: Dict[str, dict]):
+        if record["op"] == "c":
+            directive = record["d"]
+            directives[directive["id"]] = directive
+        elif record["op"] == "s":
+            directive = directives.get(record["id"])
+            if directive is not None:
+                directive["status"] = record["s"]
+                if "t" in record:
+                    directive["updated_at"] = record["t"]
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+
+    def set_snapshot_source(self, source: Callable[[], List[Any]],
+                            serialize: Optional[Callable[[Any], dict]] = None):
+        self._snapshot_source = source
+        self._snapshot_serialize = serialize
+
+    def record_create(self, directive: dict):
+        self._append(dumps({"op": "c", "d": directive}) + b"\n")
+
+    def record_status(self, directive_id: str, status: str, updated_at: Optional[float] = None):
+        record = {"op": "s", "id": directive_id, "s": status}
+        if updated_at is not None:
+            record["t"] = updated_at
+        self._append(dumps(record) + b"\n")
+
+    def _append(self, line: bytes):
+        if self._writer is None:
+            raise RuntimeError("❌ WALDirectiveStore.load() must be called before writing.")
+        if self._error is not None:
+            raise RuntimeError(f"❌ Directive WAL writer failed: {self._error}")
+        with self._cond:
+            self._pending.append(line)
+            self._appended += 1
+            self._cond.notify()
+        self._records_in_segment += 1
+        if self._records_in_segment >= self.snapshot_every:
+            self._start_snapshot()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            target = self._appended
+            return self._cond.wait_for(lambda: self._durable >= target or self._error is not None, timeout)
+
+    def _run_writer(self):
+        try:
+            while True:
+                with self._cond:
+                    while not self._pending and not self._closing:
+                        self._cond.wait()
+                    if not self._pending and self._closing:
+                        break
+                if self.commit_interval:
+                    time.sleep(self.commit_interval)
+                with self._cond:
+                    batch, self._pending = self._pending, []
+                    target = self._durable + sum(1 for item in batch if isinstance(item, bytes))
+
+                self._commit(batch)
+                with self._cond:
+                    self._durable = target
+                    self._cond.notify_all()
+        except BaseException as e:
+            log.error("wal_writer_stopped", f"❌ Directive WAL writer stopped: {e}")
+            with self._cond:
+                self._error = e
+                self._cond.notify_all()
+        finally:
+            self._file.close()
+
+    def _commit(self, batch: List[object]):
+        lines: List[bytes] = []
+        for item in batch:
+            if isinstance(item, bytes):
+                lines.append(item)
+                continue
+            # Segment rollover marker: finish the current segment first
+            self._write_and_sync(lines)
+            lines = []
+            self._file.close()
+            self._file = open(self._segment_path(item), "ab")
+            with self._cond:
+                self._open_segment = item
+                self._cond.notify_all()
+        self._write_and_sync(lines)
+
+    def _write_and_sync(self, lines: List[bytes]):
+        if not lines:
+            return
+        self._file.write(b"".join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    # ----------------------------
+    # Compaction
+    # ----------------------------
+
+    def _start_snapshot(self):
+        if self._snapshot_source is None:
+            return
+        if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+            return
+
+        # Capture the set of directives and roll the log in the caller's thread, so the
+        # snapshot holds every directive created in earlier segments. Only a list of
+        # references is taken here; serialization happens in the snapshot thread. A
+        # status that changes meanwhile may already show in the snapshot, which is
+        # harmless: status records hold absolute values, so replaying them is idempotent.
+        directives = self._snapshot_source()
+        self._segment += 1
+        self._records_in_segment = 0
+        with self._cond:
+            self._pending.append(self._segment)
+            self._cond.notify()
+        self._snapshot_thread = threading.Thread(
+            target=self._write_snapshot, args=(self._segment, directives),
+            name="directive-snapshot", daemon=True
+        )
+        self._snapshot_thread.start()
+
+    def snapshot(self):
+        """
+        Force a compacted snapshot now and wait for it to finish.
+        """
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        self._start_snapshot()
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+
+    def _write_snapshot(self, number: int, directives: List[Any]):
+        path = self._snapshot_path(number)
+        tmp_path = path + ".tmp"
+        serialize = self._snapshot_serialize
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(dumps({"segment": number, "count": len(directives)}) + b"\n")
+                for start in range(0, len(directives), 10_000):
+                    chunk = directives[start:start + 10_000]
+                    if serialize is not None:
+                        chunk = map(serialize, chunk)
+                    f.write(b"".join(dumps(d) + b"\n" for d in chunk))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            self._fsync_directory()
+        except OSError as e:
+            log.error("snapshot_failed", f"❌ Directive snapshot {number} failed: {e}", snapshot=number)
+            return
+
+        # The snapshot is durable; older segments and snapshots are now redundant once
+        # the writer has moved on to the segment this snapshot starts from
+        with self._cond:
+            self._cond.wait_for(lambda: self._open_segment >= number or self._writer is None or self._error is not None)
+        snapshots, segments = self._scan()
+        for old in segments:
+            if old < number:
+                os.remove(self._segment_path(old))
+        for old in snapshots:
+            if old < number:
+                os.remove(self._snapshot_path(old))
+        log.info("snapshot_written", f"💾 Directive snapshot {number} written ({len(directives)} directives).",
+                 snapshot=number, directives=len(directives))
+
+    def _fsync_directory(self):
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def close(self):
+        """
+        Flush outstanding records, stop background threads and release the directory.
+        """
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        if self._writer is not None:
+            with self._cond:
+                self._closing = True
+                self._cond.notify_all()
+            self._writer.join()
+            self._writer = None
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    def _acquire_lock(self):
+        lock = open(os.path.join(self.directory, LOCK_FILE), "a")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            raise StoreLockedError(f"❌ Directive store '{self.directory}' is already open in another process.")
+        return lock
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"wal-{number:08d}.log")
+
+    def _snapshot_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"snapshot-{number:08d}.jsonl")
+
+
+def open_worker_store(root: str, **kwargs) -> WALDirectiveStore:
+    """
+    Open a store for one of several workers sharing `root`. Each worker takes the
+    first free `worker-<n>` directory, so every log has a single writer and a
+    restarted worker picks up a free slot and recovers its directives.
+    """
+    slot = 0
+    while True:
+        try:
+            return WALDirectiveStore(os.path.join(root, f"worker-{slot}"), **kwargs)
+        except StoreLockedError:
+            slot += 1
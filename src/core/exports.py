@@ -0,0 +1,59 @@
+import asyncio
+from typing import AsyncIterator, Iterable, Optional
+
+from fastapi.responses import StreamingResponse
+
+from core.frames import dumps
+
+# ----------------------------
+# Export Configuration
+# ----------------------------
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+EXPORT_CHUNK_BYTES = 64 * 1024  # Rows are written out in chunks of about this size
+FIRST_CHUNK_BYTES = 4 * 1024    # Smaller first chunk, so clients see data right away
+EXPORT_SCAN_ROWS = 1000         # Rows scanned between yields to the event loop
+
+
+async def ndjson_chunks(rows: Iterable[Optional[dict]], chunk_bytes: int = EXPORT_CHUNK_BYTES,
+                        first_chunk_bytes: int = FIRST_CHUNK_BYTES,
+                        scan_rows: int = EXPORT_SCAN_ROWS) -> AsyncIterator[bytes]:
+    """
+    Encode rows as newline-delimited JSON, yielding chunks of about `chunk_bytes`.
+
+    Only one chunk is held at a time, and control returns to the event loop
+    between chunks and at least every `scan_rows` rows, so a large export neither
+    grows memory nor starves other clients.
+
+    :param rows: Rows to write. None entries stand for rows a filter passed over:
+                 they are not written, but count towards `scan_rows`, so a selective
+                 filter over many rows still gives way to other tasks.
+    """
+    buffer = bytearray()
+    limit = first_chunk_bytes
+    scanned = 0
+    for row in rows:
+        scanned += 1
+        if row is not None:
+            buffer += dumps(row)
+            buffer += b"\n"
+            if len(buffer) >= limit:
+                yield bytes(buffer)
+                buffer.clear()
+                limit = chunk_bytes
+                scanned = scan_rows
+        if scanned >= scan_rows:
+            scanned = 0
+            await asyncio.sleep(0)
+    if buffer:
+        yield bytes(buffer)
+
+
+def ndjson_response(rows: Iterable[dict], filename: str) -> StreamingResponse:
+    """
+    Stream rows to the client as an NDJSON download.
+
+    :param rows: A lazy iterable, e.g. one of the registries' export generators
+                 called with `skipped=True`.
+    """
+    return StreamingResponse(ndjson_chunks(rows), media_type=NDJSON_MEDIA_TYPE,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
@@ -0,0 +1,169 @@
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from core.records import CodeTable
+
+# ----------------------------
+# Registry Configuration
+# ----------------------------
+DEFAULT_CAPACITY = 1024
+STAKE_PERCENTILES = (50, 90, 99)
+FREE = -1  # Status code of an unused row
+# Agents report their own type and status strings; past these many distinct values,
+# new ones are counted under OTHER so the int16 code columns can't overflow
+MAX_TYPES = 1024
+MAX_STATUSES = 256
+OTHER = "other"
+
+
+class FleetRegistry:
+    """
+    Columnar agent registry: stake, status, type and registration time are kept
+    in parallel NumPy arrays indexed by row, so fleet aggregates are vectorized
+    instead of scanning a dict per agent.
+
+    Removed agents' rows go on a free-list and are reused by the next registration;
+    `rows` maps agent_id -> row and `ids` maps back.
+    """
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.stake = np.zeros(capacity, dtype=np.float64)
+        self.status = np.full(capacity, FREE, dtype=np.int16)
+        self.type = np.zeros(capacity, dtype=np.int16)
+        self.registered_at = np.zeros(capacity, dtype=np.float64)
+        self.ids: List[Optional[str]] = [None] * capacity
+        self.rows: Dict[str, int] = {}
+        self.statuses = CodeTable(("active", OTHER))
+        self.types = CodeTable(("unknown", OTHER))
+        self._free: List[int] = []
+        self._used = 0  # Rows handed out at least once; everything above is untouched
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self.rows
+
+    def upsert(self, agent_id: str, stake: float, agent_type: Optional[str] = None,
+               status: str = "active", registered_at: Optional[float] = None) -> int:
+        """
+        Register an agent, or update it in place if it is already present.
+
+        :return: The agent's row.
+        """
+        row = self.rows.get(agent_id)
+        if row is None:
+            row = self._allocate()
+            self.rows[agent_id] = row
+            self.ids[row] = agent_id
+            self.registered_at[row] = time.time() if registered_at is None else registered_at
+            self.type[row] = self._code(self.types, agent_type or "unknown", MAX_TYPES)
+        elif agent_type is not None:
+            self.type[row] = self._code(self.types, agent_type, MAX_TYPES)
+        self.stake[row] = stake
+        self.status[row] = self._code(self.statuses, status, MAX_STATUSES)
+        return row
+
+    def update_status(self, agent_id: str, status: str):
+        row = self.rows.get(agent_id)
+        if row is None:
+            raise ValueError(f"❌ Agent ID '{agent_id}' not found.")
+        self.status[row] = self._code(self.statuses, status, MAX_STATUSES)
+
+    def update_stake(self, agent_id: str, stake: float):
+        row = self.rows.get(agent_id)
+        if row is None:
+            raise ValueError(f"❌ Agent ID '{agent_id}' not found.")
+        self.stake[row] = stake
+
+    def remove(self, agent_id: str) -> bool:
+        row = self.rows.pop(agent_id, None)
+        if row is None:
+            return False
+        self.ids[row] = None
+        self.status[row] = FREE
+        self.stake[row] = 0.0
+        self._free.append(row)
+        return True
+
+    def get(self, agent_id: str) -> Optional[dict]:
+        row = self.rows.get(agent_id)
+        if row is None:
+            return None
+        return {
+            "agent_id": agent_id,
+            "stake": float(self.stake[row]),
+            "type": self.types.names[self.type[row]],
+            "status": self.statuses.names[self.status[row]],
+            "registered_at": float(self.registered_at[row])
+        }
+
+    # ----------------------------
+    # Vectorized aggregates
+    # ----------------------------
+    def _live(self) -> np.ndarray:
+        return self.status[:self._used] != FREE
+
+    def total_stake(self) -> float:
+        return float(self.stake[:self._used].sum())  # Free rows hold zero stake
+
+    def count_by_status(self) -> Dict[str, int]:
+        live = self._live()
+        return self._counts(self.status[:self._used][live], self.statuses)
+
+    def count_by_type(self) -> Dict[str, int]:
+        live = self._live()
+        return self._counts(self.type[:self._used][live], self.types)
+
+    def stake_percentiles(self, percentiles: Iterable[float] = STAKE_PERCENTILES) -> Dict[str, float]:
+        percentiles = list(percentiles)
+        stakes = self.stake[:self._used][self._live()]
+        if not stakes.size:
+            return {f"p{p:g}": 0.0 for p in percentiles}
+        values = np.percentile(stakes, percentiles)
+        return {f"p{p:g}": float(v) for p, v in zip(percentiles, values)}
+
+    def stats(self) -> dict:
+        """
+        Fleet summary served by /api/fleet/stats.
+        """
+        return {
+            "agents": len(self.rows),
+            "total_stake": self.total_stake(),
+            "by_status": self.count_by_status(),
+            "by_type": self.count_by_type(),
+            "stake_percentiles": self.stake_percentiles()
+        }
+
+    @staticmethod
+    def _code(table: CodeTable, name: str, limit: int) -> int:
+        """
+        Code for `name`, interning it only while the table has fewer than `limit` entries.
+        """
+        code = table.codes.get(name)
+        if code is None:
+            code = table.code(name) if len(table) < limit else table.codes[OTHER]
+        return code
+
+    @staticmethod
+    def _counts(codes: np.ndarray, table: CodeTable) -> Dict[str, int]:
+        counts = np.bincount(codes, minlength=len(table))
+        return {table.names[code]: int(count) for code, count in enumerate(counts) if count}
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if self._used == len(self.ids):
+            self._grow(max(DEFAULT_CAPACITY, len(self.ids) * 2))
+        row = self._used
+        self._used += 1
+        return row
+
+    def _grow(self, capacity: int):
+        extra = capacity - len(self.ids)
+        self.stake = np.concatenate((self.stake, np.zeros(extra, dtype=np.float64)))
+        self.status = np.concatenate((self.status, np.full(extra, FREE, dtype=np.int16)))
+        self.type = np.concatenate((self.type, np.zeros(extra, dtype=np.int16)))
+        self.registered_at = np.concatenate((self.registered_at, np.zeros(extra, dtype=np.float64)))
+        self.ids.extend([None] * extra)
@@ -0,0 +1,78 @@
+import json
+from typing import Any, Dict, List, Optional, Union
+
+# Optional fast JSON encoder
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def dumps(message: Any) -> bytes:
+    """
+    Encode a message to UTF-8 JSON bytes, using orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(message)
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decode JSON, using orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class Frame:
+    """
+    A message encoded once and shared by every recipient of a broadcast.
+
+    The bytes form is produced eagerly; the text form needed by `send_text`
+    is decoded on first use and cached, so N recipients cost one encode.
+    Other wire encodings (see core.codecs) are cached in `encodings` the same way,
+    built from `message`, the object the frame was encoded from, when it is known.
+    The message must not be modified once it has been encoded.
+    """
+    __slots__ = ("data", "message", "_text", "encodings")
+
+    def __init__(self, data: bytes, message: Any = None):
+        self.data = data
+        self.message = message
+        self._text: Optional[str] = None
+        self.encodings: Optional[Dict[Any, bytes]] = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.data.decode("utf-8")
+        return self._text
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"Frame({self.text!r})"
+
+
+def encode_frame(message: Union[dict, Frame]) -> Frame:
+    """
+    Build a prebuilt frame for a message. Frames are passed through unchanged.
+    """
+    if isinstance(message, Frame):
+        return message
+    return Frame(dumps(message), message)
+
+
+def encode_batch(frames: List[Frame]) -> Frame:
+    """
+    Combine already-encoded frames into one {"action": "batch", "messages": [...]} frame
+    by splicing their bytes, without decoding or re-encoding the messages.
+    """
+    data = b'{"action":"batch","messages":[' + b",".join(frame.data for frame in frames) + b"]}"
+    messages = [frame.message for frame in frames]
+    if any(message is None for message in messages):
+        return Frame(data)
+    return Frame(data, {"action": "batch", "messages": messages})
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from typing import Callable, Dict, Optional, Set
+
+from core.logging_config import get_logger
+from core.timing_wheel import TimingWheel
+
+# ----------------------------
+# Heartbeat Configuration
+# ----------------------------
+DEFAULT_HEARTBEAT_TIMEOUT = 30.0  # Seconds of silence before an agent is pinged
+DEFAULT_PING_GRACE = 10.0         # Seconds to answer a ping before the agent is marked stale
+DEFAULT_TICK = 1.0
+
+log = get_logger("heartbeat")
+
+
+class HeartbeatMonitor:
+    """
+    Tracks per-agent last-seen times and detects agents that have gone silent.
+
+    Any message from an agent counts as a heartbeat and only updates `last_seen`;
+    the agent's timer in the TimingWheel is left alone. When a timer fires, the
+    monitor compares it with `last_seen` and, if the agent was heard from since,
+    reschedules it for its real deadline. Each tick therefore only touches agents
+    whose deadline has come up, and a busy agent costs one dict write per message.
+
+    A silent agent is pinged once; if it still says nothing within `ping_grace`
+    it is reported through `on_stale` and dropped from tracking.
+    """
+    def __init__(self, ping: Callable[[str], None], on_stale: Callable[[str], None],
+                 timeout: float = DEFAULT_HEARTBEAT_TIMEOUT, ping_grace: float = DEFAULT_PING_GRACE,
+                 tick: float = DEFAULT_TICK, clock: Callable[[], float] = time.monotonic):
+        """
+        :param ping: Called with an agent_id to ask a silent agent for a heartbeat.
+        :param on_stale: Called with an agent_id once it has missed its ping.
+        """
+        self.ping = ping
+        self.on_stale = on_stale
+        self.timeout = timeout
+        self.ping_grace = ping_grace
+        self.clock = clock
+        self.wheel = TimingWheel(tick=tick, start=clock())
+        self.last_seen: Dict[str, float] = {}
+        self.pinged: Set[str] = set()
+        self.stale = 0
+
+    def __len__(self) -> int:
+        return len(self.last_seen)
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self.last_seen
+
+    def track(self, agent_id: str):
+        """
+        Start watching an agent, e.g. when its socket connects.
+        """
+        now = self.clock()
+        self.last_seen[agent_id] = now
+        self.pinged.discard(agent_id)
+        self.wheel.schedule(agent_id, now + self.timeout)
+
+    def touch(self, agent_id: str):
+        """
+        Record a heartbeat (or any other message) from an agent.
+        """
+        if agent_id in self.last_seen:
+            self.last_seen[agent_id] = self.clock()
+            self.pinged.discard(agent_id)
+
+    def forget(self, agent_id: str):
+        self.last_seen.pop(agent_id, None)
+        self.pinged.discard(agent_id)
+        self.wheel.cancel(agent_id)
+
+    def tick(self, now: Optional[float] = None):
+        """
+        Ping or expire every agent whose deadline has passed.
+        """
+        now = self.clock() if now is None else now
+        for agent_id in self.wheel.advance(now):
+            last_seen = self.last_seen.get(agent_id)
+            if last_seen is None:
+                continue
+            deadline = last_seen + self.timeout
+            if deadline > now:
+                # Heard from since the timer was set; sleep until the real deadline
+                self.wheel.schedule(agent_id, deadline)
+            elif agent_id not in self.pinged:
+                self.pinged.add(agent_id)
+                self.wheel.schedule(agent_id, now + self.ping_grace)
+                try:
+                    self.ping(agent_id)
+                except Exception as e:
+                    log.error("agent_ping_failed", f"❌ Failed to ping Agent '{agent_id}': {e}", agent_id=agent_id)
+            else:
+                self.forget(agent_id)
+                self.stale += 1
+                try:
+                    self.on_stale(agent_id)
+                except Exception as e:
+                    log.error("agent_stale_failed", f"❌ Failed to mark Agent '{agent_id}' stale: {e}", agent_id=agent_id)
+
+    async def run(self):
+        """
+        Monitor loop; start once with asyncio.create_task().
+        """
+        while True:
+            await asyncio.sleep(self.wheel.tick)
+            self.tick()
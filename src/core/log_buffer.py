@@ -0,0 +1,134 @@
+import time
+from array import array
+from typing import Any, Iterator, List, Optional, Tuple
+
+
+class LogRingBuffer:
+    """
+    Fixed-capacity ring buffer of timestamped log entries.
+
+    Memory is allocated once up front: timestamps live in a packed float array and
+    entries in a preallocated list, so appends never grow the process. Every entry
+    gets a monotonically increasing offset; once the buffer wraps (or an entry
+    outlives `retention_seconds`) the oldest offsets simply stop being readable.
+    Time-range queries binary-search the timestamps instead of scanning.
+    """
+    def __init__(self, capacity: int = 10_000, retention_seconds: Optional[float] = None):
+        if capacity <= 0:
+            raise ValueError("❌ Ring buffer capacity must be positive.")
+        self.capacity = capacity
+        self.retention_seconds = retention_seconds
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._entries: List[Any] = [None] * capacity
+        self.next_offset = 0   # Offset the next appended entry will receive
+        self._first = 0        # Oldest offset still readable
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+
+    def append(self, entry: Any, timestamp: Optional[float] = None) -> int:
+        """
+        Add an entry, overwriting the oldest one when full.
+
+        :return: The entry's offset.
+        """
+        offset = self.next_offset
+        slot = offset % self.capacity
+        self._timestamps[slot] = time.time() if timestamp is None else timestamp
+        self._entries[slot] = entry
+        self.next_offset = offset + 1
+        if self.next_offset - self._first > self.capacity:
+            self._first = self.next_offset - self.capacity
+        return offset
+
+    def clear(self):
+        for slot in range(self.capacity):
+            self._entries[slot] = None
+        self._first = self.next_offset
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+
+    @property
+    def first_offset(self) -> int:
+        """
+        Oldest offset that is still readable, after applying retention.
+        """
+        self._expire()
+        return self._first
+
+    def __len__(self) -> int:
+        return self.next_offset - self.first_offset
+
+    def __iter__(self) -> Iterator[Any]:
+        for _, _, entry in self.since(self.first_offset):
+            yield entry
+
+    def tail(self, count: int) -> List[Any]:
+        """
+        Return the newest `count` entries, oldest first.
+        """
+        start = max(self.first_offset, self.next_offset - max(count, 0))
+        return [self._entries[offset % self.capacity] for offset in range(start, self.next_offset)]
+
+    def since(self, offset: int, limit: Optional[int] = None) -> List[Tuple[int, float, Any]]:
+        """
+        Return (offset, timestamp, entry) tuples starting at `offset`.
+        Offsets that have already been overwritten or expired are skipped.
+        """
+        start = max(offset, self.first_offset)
+        end = self.next_offset if limit is None else min(self.next_offset, start + limit)
+        return [
+            (position, self._timestamps[position % self.capacity], self._entries[position % self.capacity])
+            for position in range(start, end)
+        ]
+
+    def range(self, start_time: Optional[float] = None, end_time: Optional[float] = None,
+              limit: Optional[int] = None, newest: bool = False) -> List[Tuple[float, Any]]:
+        """
+        Return (timestamp, entry) tuples with start_time <= timestamp < end_time, oldest first.
+
+        :param limit: Return at most this many entries; only the bounds are bisected,
+                      so nothing outside the returned entries is copied.
+        :param newest: With `limit`, keep the newest entries of the range instead of the oldest.
+        """
+        first = self.first_offset
+        low = first if start_time is None else self._bisect(start_time, first)
+        high = self.next_offset if end_time is None else self._bisect(end_time, low)
+        if limit is not None:
+            limit = max(limit, 0)
+            if newest:
+                low = max(low, high - limit)
+            else:
+                high = min(high, low + limit)
+        return [
+            (self._timestamps[position % self.capacity], self._entries[position % self.capacity])
+            for position in range(low, high)
+        ]
+
+    def _bisect(self, timestamp: float, low: int) -> int:
+        """
+        First offset in [low, next_offset) whose timestamp is >= `timestamp`.
+        Assumes timestamps are appended in non-decreasing order.
+        """
+        high = self.next_offset
+        while low < high:
+            middle = (low + high) // 2
+            if self._timestamps[middle % self.capacity] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _expire(self):
+        if self.retention_seconds is None or self._first == self.next_offset:
+            return
+        cutoff = time.time() - self.retention_seconds
+        if self._timestamps[self._first % self.capacity] >= cutoff:
+            return
+        expired_until = self._bisect(cutoff, self._first)
+        for position in range(self._first, expired_until):
+            self._entries[position % self.capacity] = None
+        self._first = expired_until
@@ -1,21 +1,98 @@
-from typing import Dict
-from fastapi.websockets import WebSocket
+import os
+import time
+import uuid
+from typing import Iterable, List, Optional
 
-# Store active WebSocket connections for broadcasting logs
-active_connections: Dict[str, WebSocket] = {}
+from core.broadcast_hub import DEFAULT_QUEUE_SIZE, BroadcastHub
+from core.frames import Frame, encode_batch, encode_frame
+from core.log_buffer import LogRingBuffer
+from core.subscriptions import ALL_TOPICS, level_topic
 
-async def broadcast_log(message: str):
+LOG_LEVELS = ("debug", "info", "warning", "error")
+
+# Log Bus Configuration
+LOG_BUFFER_SIZE = int(os.environ.get("SENTINEL_LOG_BUFFER_SIZE", 10000))  # Entries kept for replay
+LOG_BATCH_WINDOW = 0.05  # Seconds live log frames are coalesced for each viewer
+LOG_BATCH_MAX = 200
+REPLAY_BATCH_SIZE = 500  # Entries per replay frame
+
+# Store active WebSocket connections for broadcasting logs; queues leave room for a full replay
+log_hub = BroadcastHub(max_queue=DEFAULT_QUEUE_SIZE + LOG_BUFFER_SIZE // REPLAY_BATCH_SIZE + 1)
+
+# Offsets restart from 0 with every process, so viewers only resume from an offset
+# issued under the same epoch
+LOG_EPOCH = uuid.uuid4().hex[:12]
+
+# Every broadcast log entry as (level, prebuilt frame), addressed by a monotonically
+# increasing offset. Live delivery and replay share these frames; nothing is copied per client.
+log_buffer = LogRingBuffer(capacity=LOG_BUFFER_SIZE)
+
+
+async def broadcast_log(message: str, level: str = "info"):
+    """
+    Append a log message to the log bus and send it to WebSocket clients subscribed to its level.
+    """
+    append_log(message, level, time.time())
+
+
+def append_log(message: str, level: str, timestamp: float, relay: bool = True):
+    """
+    Buffer a log entry under the next local offset and publish it.
+
+    :param timestamp: When the entry was logged, as shown to viewers.
+    :param relay: False for entries relayed in from another worker.
+    """
+    # Encode once; every client and every later replay reuses the same frame
+    frame = encode_frame({
+        "type": "log",
+        "offset": log_buffer.next_offset,
+        "ts": timestamp,
+        "level": level,
+        "message": message
+    })
+    # Buffered by arrival time, which stays ordered even when relayed entries are older
+    log_buffer.append((level, frame), time.time())
+    log_hub.publish(frame, topics=(level_topic(level),), relay=relay)
+
+
+def ingest_relayed_log(entry: dict, topics: Optional[Iterable[str]] = None):
+    """
+    Take in an entry logged by another worker. It is renumbered with a local offset
+    and buffered, so viewers of this worker see one offset sequence and can replay it.
+    """
+    append_log(entry.get("message"), entry.get("level", "info"), entry.get("ts", time.time()), relay=False)
+
+
+log_hub.ingest = ingest_relayed_log
+
+
+def cursor_message(since: Optional[int] = None) -> dict:
+    """
+    Tells a viewer which offsets are still available, and how many it missed if
+    it asked to resume from an offset that has already been overwritten.
+
+    The cursor carries the `epoch`; a viewer that sees it change must forget its
+    last offset, since offsets from another process or worker do not line up.
+    """
+    first = log_buffer.first_offset
+    message = {"type": "log_cursor", "epoch": LOG_EPOCH, "first_offset": first,
+               "next_offset": log_buffer.next_offset}
+    if since is not None:
+        message["missed"] = max(0, first - since)
+    return message
+
+
+def replay_frames(since: int, topics: Optional[Iterable[str]] = None) -> List[Frame]:
     """
-    Broadcast a log message to all connected WebSocket clients.
+    Batch frames holding every buffered entry from offset `since` onwards,
+    filtered to the given topics ('*' or None means all levels).
     """
-    disconnected_clients = []
-    for agent_id, websocket in active_connections.items():
-        try:
-            await websocket.send_json({"type": "log", "message": message})
-        except Exception as e:
-            print(f"❌ Failed to send log to Agent '{agent_id}': {e}")
-            disconnected_clients.append(agent_id)
+    levels = None
+    if topics is not None:
+        topics = set(topics)
+        if ALL_TOPICS not in topics:
+            levels = {level for level in LOG_LEVELS if level_topic(level) in topics}
 
-    # Remove disconnected clients
-    for agent_id in disconnected_clients:
-        active_connections.pop(agent_id, None)
+    frames = [frame for _, _, (level, frame) in log_buffer.since(since) if levels is None or level in levels]
+    return [encode_batch(frames[start:start + REPLAY_BATCH_SIZE])
+            for start in range(0, len(frames), REPLAY_BATCH_SIZE)]
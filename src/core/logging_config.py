@@ -0,0 +1,196 @@
+import atexit
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from core.frames import dumps
+
+# ----------------------------
+# Logging Configuration
+# ----------------------------
+LOG_LEVEL = os.environ.get("SENTINEL_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("SENTINEL_LOG_FORMAT", "json")  # "json" or "text"
+LOG_QUEUE_SIZE = 10000  # Records buffered for the writer thread before new ones are dropped
+ROOT_LOGGER = "sentinel"
+
+# Keep 1 in N records of high-frequency events; override with
+# SENTINEL_LOG_SAMPLING="directive_sent=10,client_evicted=1"
+DEFAULT_SAMPLING = {
+    "directive_created": 100,
+    "directive_sent": 100,
+    "directive_status": 100,
+    "directive_retrieved": 1000,
+    "directive_broadcast": 100,
+    "directive_update_received": 100,
+}
+
+
+def _parse_sampling(spec: str) -> Dict[str, int]:
+    sampling = dict(DEFAULT_SAMPLING)
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        event, _, every = item.partition("=")
+        try:
+            sampling[event.strip()] = max(1, int(every))
+        except ValueError:
+            raise ValueError(f"❌ Invalid log sampling entry '{item}'. Expected event=N.")
+    return sampling
+
+
+SAMPLING = _parse_sampling(os.environ.get("SENTINEL_LOG_SAMPLING", ""))
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: timestamp, level, logger, event, message and any fields.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": getattr(record, "event", None),
+            "message": record.getMessage()
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return dumps(entry).decode("utf-8")
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        fields = getattr(record, "fields", None)
+        if fields:
+            message += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            message += "\n" + self.formatException(record.exc_info)
+        return message
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread without ever blocking the caller.
+
+    Formatting is left to the writer thread, and a full queue drops the record
+    (counted in `dropped`) instead of stalling the event loop.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredLogger:
+    """
+    Thin wrapper over a stdlib logger that logs named events with structured fields.
+
+        log.info("directive_created", "✅ Directive created.", directive_id=..., agent_id=...)
+
+    Events listed in SAMPLING are only emitted for 1 in N calls; the emitted record
+    carries `sampled: N` so counts can be scaled back up.
+    """
+    __slots__ = ("logger", "_counts")
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self._counts: Dict[str, int] = {}
+
+    def _log(self, level: int, event: str, message: str, fields: dict):
+        if not self.logger.isEnabledFor(level):
+            return
+        every = SAMPLING.get(event, 1)
+        if every > 1:
+            count = self._counts.get(event, 0)
+            self._counts[event] = count + 1
+            if count % every:
+                return
+            fields["sampled"] = every
+        exc_info = fields.pop("exc_info", None)
+        self.logger.log(level, message, exc_info=exc_info, extra={"event": event, "fields": fields})
+
+    def debug(self, event: str, message: str, **fields):
+        self._log(logging.DEBUG, event, message, fields)
+
+    def info(self, event: str, message: str, **fields):
+        self._log(logging.INFO, event, message, fields)
+
+    def warning(self, event: str, message: str, **fields):
+        self._log(logging.WARNING, event, message, fields)
+
+    def error(self, event: str, message: str, **fields):
+        self._log(logging.ERROR, event, message, fields)
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, stream=None):
+    """
+    Route the "sentinel" loggers through a queue to a background writer thread.
+    Safe to call more than once; later calls replace the previous setup.
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    _listener = QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    root.propagate = False
+
+
+def shutdown_logging():
+    """
+    Stop the writer thread after it has written everything already queued.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def flush_logging():
+    """
+    Block until the writer thread has written every record queued so far.
+    """
+    if _listener is not None:
+        _listener.queue.join()
+
+
+def dropped_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """
+    Structured logger under the "sentinel" namespace, e.g. get_logger("directive_engine").
+    """
+    if _listener is None:
+        configure_logging()
+    return StructuredLogger(logging.getLogger(f"{ROOT_LOGGER}.{name}"))
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,108 @@
+from prometheus_client import REGISTRY, Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+
+from core.broadcast_hub import BroadcastHub
+from core.connection_registry import AGENT, DASHBOARD, LOG_VIEWER, ConnectionRegistry
+from core.directive_history import ACKNOWLEDGING, FINISHING, PENDING, SENT
+
+# ----------------------------
+# Metrics Configuration
+# ----------------------------
+# WebSocket endpoint label for each connection role
+ENDPOINTS = {AGENT: "/ws/agent", DASHBOARD: "/ws/directives", LOG_VIEWER: "/ws/logs"}
+
+SEND_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+FANOUT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+LIFECYCLE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+QUEUE_DEPTH_BUCKETS = (0, 1, 4, 16, 64, 256, 1024)
+
+ws_messages_received = Counter("sentinel_ws_messages_received", "WebSocket messages received, by endpoint.",
+                               ["endpoint"])
+ws_messages_sent = Counter("sentinel_ws_messages_sent", "WebSocket messages sent, by endpoint. "
+                           "A batch frame counts each message it carries.", ["endpoint"])
+ws_send_seconds = Histogram("sentinel_ws_send_seconds", "Time to write one frame to a WebSocket.",
+                            ["endpoint"], buckets=SEND_BUCKETS)
+broadcast_fanout_seconds = Histogram("sentinel_broadcast_fanout_seconds",
+                                     "Time to queue one broadcast for every matching connection.",
+                                     ["endpoint"], buckets=FANOUT_BUCKETS)
+directive_latency_seconds = Histogram("sentinel_directive_latency_seconds",
+                                      "Time from directive creation to each lifecycle stage.",
+                                      ["stage"], buckets=LIFECYCLE_BUCKETS)
+
+# Label children are bound once here; the hot paths only call inc()/observe()
+AGENT_MESSAGES_RECEIVED = ws_messages_received.labels(ENDPOINTS[AGENT])
+DASHBOARD_MESSAGES_RECEIVED = ws_messages_received.labels(ENDPOINTS[DASHBOARD])
+LOG_VIEWER_MESSAGES_RECEIVED = ws_messages_received.labels(ENDPOINTS[LOG_VIEWER])
+DIRECTIVE_DISPATCHED = directive_latency_seconds.labels("dispatched")
+DIRECTIVE_ACKNOWLEDGED = directive_latency_seconds.labels("acknowledged")
+DIRECTIVE_FINISHED = directive_latency_seconds.labels("finished")
+
+
+def instrument_hub(hub: BroadcastHub, endpoint: str):
+    """
+    Count and time every frame the hub's connections send and every fan-out it performs.
+    """
+    sent = ws_messages_sent.labels(endpoint)
+    send_seconds = ws_send_seconds.labels(endpoint)
+
+    def on_send(messages: int, seconds: float):
+        sent.inc(messages)
+        send_seconds.observe(seconds)
+
+    hub.on_send = on_send
+    hub.on_publish = broadcast_fanout_seconds.labels(endpoint).observe
+
+
+def record_directive_transition(old_status: int, new_status: int, elapsed: float):
+    """
+    Observe lifecycle latency when a directive is first acknowledged and when it finishes,
+    using the same status sets as the directive history's stage statistics.
+
+    :param elapsed: Seconds since the directive was created.
+    """
+    if old_status in (PENDING, SENT) and new_status in ACKNOWLEDGING:
+        DIRECTIVE_ACKNOWLEDGED.observe(elapsed)
+    if new_status in FINISHING and old_status not in FINISHING:
+        DIRECTIVE_FINISHED.observe(elapsed)
+
+
+class ConnectionCollector:
+    """
+    Connection counts and outbound queue depths, read from the registry at scrape time.
+
+    Queue depth is reported as a histogram over connections rather than one series
+    per connection, so thousands of agents don't turn into thousands of series.
+    """
+    def __init__(self, connections: ConnectionRegistry):
+        self.connections = connections
+
+    def collect(self):
+        counts = GaugeMetricFamily("sentinel_ws_connections", "Open WebSocket connections, by role.", labels=["role"])
+        depths = HistogramMetricFamily("sentinel_ws_outbound_queue_depth",
+                                       "Frames waiting in each connection's outbound queue.", labels=["endpoint"])
+        deepest = GaugeMetricFamily("sentinel_ws_outbound_queue_depth_max",
+                                    "Deepest outbound queue of any connection.", labels=["endpoint"])
+        dropped = CounterMetricFamily("sentinel_ws_frames_dropped",
+                                      "Frames dropped by the slow-consumer policy.", labels=["endpoint"])
+        for role, hub in self.connections.hubs.items():
+            endpoint = ENDPOINTS[role]
+            sizes = [channel.queue.qsize() for channel in list(hub.channels.values())]
+            counts.add_metric([role], len(sizes))
+            buckets = [(str(bound), sum(1 for size in sizes if size <= bound)) for bound in QUEUE_DEPTH_BUCKETS]
+            buckets.append(("+Inf", len(sizes)))
+            depths.add_metric([endpoint], buckets, sum(sizes))
+            deepest.add_metric([endpoint], max(sizes, default=0))
+            dropped.add_metric([endpoint], hub.dropped)
+        yield counts
+        yield depths
+        yield deepest
+        yield dropped
+
+
+def register_connection_metrics(connections: ConnectionRegistry):
+    """
+    Instrument every hub in the registry and expose its connections on /metrics.
+    """
+    for role, hub in connections.hubs.items():
+        instrument_hub(hub, ENDPOINTS[role])
+    REGISTRY.register(ConnectionCollector(connections))
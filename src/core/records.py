@@ -0,0 +1,151 @@
+import sys
+import time
+from datetime import datetime
+from enum import IntEnum
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class CodeTable:
+    """
+    Interns repeated strings (statuses, agent types) as small integer codes.
+    """
+    def __init__(self, names: Iterable[str] = ()):
+        self.codes: Dict[str, int] = {}
+        self.names: List[str] = []
+        for name in names:
+            self.code(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def code(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return code
+
+
+# ----------------------------
+# Status Codes
+# ----------------------------
+class AgentStatus(IntEnum):
+    ACTIVE = 0
+    INACTIVE = 1
+    STALE = 2
+
+
+class DirectiveStatus(IntEnum):
+    PENDING = 0
+    ACKNOWLEDGED = 1
+    IN_PROGRESS = 2
+    COMPLETED = 3
+    FAILED = 4
+    EXPIRED = 5
+    SENT = 6  # Directive history event only; a directive's own status stays pending while sent
+
+
+def _status_name(status: IntEnum) -> str:
+    return status.name.lower().replace("_", "-")
+
+
+# Known statuses keep their enum values; anything else an agent reports is interned after them
+AGENT_STATUSES = CodeTable(_status_name(status) for status in AgentStatus)
+DIRECTIVE_STATUSES = CodeTable(_status_name(status) for status in DirectiveStatus)
+
+
+class AgentRecord:
+    """
+    Compact in-memory form of a registered agent. Metadata keys beyond the
+    well-known ones are kept in `extra`; to_dict() rebuilds the original shape.
+    """
+    __slots__ = ("agent_id", "name", "type", "token_stake", "status", "registered_on", "capabilities", "extra")
+
+    KNOWN_FIELDS = ("agent_id", "name", "type", "token_stake", "capabilities", "registered_on", "status")
+
+    def __init__(self, agent_id: str, token_stake: float, name: Optional[str] = None,
+                 agent_type: Optional[str] = None, capabilities: Iterable[str] = (),
+                 status: int = AgentStatus.ACTIVE, registered_on: Optional[float] = None,
+                 extra: Optional[dict] = None):
+        self.agent_id = agent_id
+        self.name = name
+        self.type = sys.intern(agent_type) if agent_type else None
+        self.token_stake = token_stake
+        self.status = status
+        self.registered_on = time.time() if registered_on is None else registered_on
+        self.capabilities: Tuple[str, ...] = tuple(sys.intern(c) for c in capabilities)
+        self.extra = extra or None
+
+    @classmethod
+    def from_metadata(cls, agent_id: str, metadata: dict) -> "AgentRecord":
+        extra = {key: value for key, value in metadata.items() if key not in cls.KNOWN_FIELDS}
+        return cls(agent_id, metadata.get("token_stake", 0), name=metadata.get("name"),
+                   agent_type=metadata.get("type"), capabilities=metadata.get("capabilities") or (),
+                   extra=extra)
+
+    @property
+    def status_name(self) -> str:
+        return AGENT_STATUSES.names[self.status]
+
+    def set_status(self, status: str):
+        self.status = AGENT_STATUSES.code(status)
+
+    def to_dict(self) -> dict:
+        agent = dict(self.extra) if self.extra else {}
+        if self.name is not None:
+            agent["name"] = self.name
+        if self.type is not None:
+            agent["type"] = self.type
+        if self.capabilities:
+            agent["capabilities"] = list(self.capabilities)
+        agent.update({
+            "token_stake": self.token_stake,
+            "agent_id": self.agent_id,
+            "registered_on": datetime.utcfromtimestamp(self.registered_on).isoformat(),
+            "status": self.status_name
+        })
+        return agent
+
+
+class DirectiveRecord:
+    """
+    Compact in-memory form of a directive. Timestamps are epoch floats and the
+    status is an interned code; to_dict() produces the JSON shape clients see.
+    """
+    __slots__ = ("id", "agent_id", "task", "status", "created_at", "updated_at")
+
+    def __init__(self, directive_id: str, agent_id: str, task: str,
+                 status: int = DirectiveStatus.PENDING, created_at: Optional[float] = None,
+                 updated_at: Optional[float] = None):
+        self.id = directive_id
+        self.agent_id = sys.intern(agent_id)
+        self.task = sys.intern(task)
+        self.status = status
+        self.created_at = time.time() if created_at is None else created_at
+        self.updated_at = self.created_at if updated_at is None else updated_at
+
+    @classmethod
+    def from_dict(cls, directive: dict) -> "DirectiveRecord":
+        return cls(directive["id"], directive["agent_id"], directive["task"],
+                   DIRECTIVE_STATUSES.code(directive["status"]),
+                   directive.get("created_at"), directive.get("updated_at"))
+
+    @property
+    def status_name(self) -> str:
+        return DIRECTIVE_STATUSES.names[self.status]
+
+    def set_status(self, status: str, timestamp: Optional[float] = None):
+        self.status = DIRECTIVE_STATUSES.code(status)
+        self.updated_at = time.time() if timestamp is None else timestamp
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "agent_id": self.agent_id, "task": self.task, "status": self.status_name}
+
+    def to_state(self) -> dict:
+        """
+        to_dict() plus the timestamps, for persistence.
+        """
+        state = self.to_dict()
+        state["created_at"] = self.created_at
+        state["updated_at"] = self.updated_at
+        return state
@@ -1,22 +1,132 @@
-from fastapi import APIRouter, HTTPException
-from utils.token_utils import create_token
+import hashlib
+import hmac
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from prometheus_client import REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from core import auth
+from utils.token_utils import SECRET_KEY, create_token
 from utils.blockchain_auth import verify_solana_signature
+from utils.signature_verifier import BatchSignatureVerifier
 import uuid
 
 router = APIRouter()
 
+# Shared secret for POST /api/token. When set, callers must present it as `X-Issuer-Key`.
+# With SENTINEL_REQUIRE_AUTH=1 and no issuer key, the endpoint issues no tokens at all.
+TOKEN_ISSUER_KEY = os.environ.get("SENTINEL_TOKEN_ISSUER_KEY")
+
+# Wallet login: POST /api/solana_challenge issues a challenge for the wallet to sign, then
+# POST /api/solana_auth exchanges the signed challenge for a token
+CHALLENGE_PREFIX = "Sentinel Agent Authentication Challenge: "
+CHALLENGE_TTL = 300  # Seconds a challenge can be signed and redeemed
+
+# Challenges already redeemed on this process, with their expiry, so each one logs in once
+used_challenges: "OrderedDict[str, int]" = OrderedDict()
+
+# Ed25519 checks run off the event loop, batched across concurrent logins
+signature_verifier = BatchSignatureVerifier(
+    verify_solana_signature,
+    workers=int(os.environ.get("SENTINEL_SIGNATURE_WORKERS", "0")) or None,
+    use_processes=os.environ.get("SENTINEL_SIGNATURE_PROCESSES", "0") == "1"
+)
+
+
+class SignatureVerifierCollector:
+    """
+    Exposes wallet signature verification counts and latency percentiles on /metrics.
+    """
+    def collect(self):
+        results = CounterMetricFamily("sentinel_signature_verifications", "Wallet signatures verified, by result.",
+                                      labels=["result"])
+        results.add_metric(["valid"], signature_verifier.verified)
+        results.add_metric(["invalid"], signature_verifier.rejected)
+        yield results
+        yield CounterMetricFamily("sentinel_signature_batches", "Verification batches handed to the worker pool.",
+                                  value=signature_verifier.batches)
+        latency = GaugeMetricFamily("sentinel_signature_latency_seconds",
+                                    "Wallet auth verification latency over recent requests.", labels=["quantile"])
+        for q in (50, 99):
+            latency.add_metric([str(q / 100)], signature_verifier.percentile(q))
+        yield latency
+
+
+REGISTRY.register(SignatureVerifierCollector())
+
+
 @router.post("/api/token")
-async def generate_token(agent_id: str):
+async def generate_token(agent_id: str, x_issuer_key: Optional[str] = Header(None)):
+    """
+    Issue a bearer token for an agent. This is the token source for deployments running
+    with SENTINEL_REQUIRE_AUTH=1; wallets can also authenticate via /api/solana_auth.
+    """
+    if not TOKEN_ISSUER_KEY:
+        if auth.REQUIRE_AUTH:
+            raise HTTPException(status_code=503,
+                                detail="❌ Token issuance is disabled: SENTINEL_TOKEN_ISSUER_KEY is not set.")
+    elif not hmac.compare_digest(x_issuer_key or "", TOKEN_ISSUER_KEY):
+        raise HTTPException(status_code=403, detail="❌ Invalid or missing issuer key.")
     if not agent_id:
         raise HTTPException(status_code=400, detail="❌ Agent ID is required.")
     token = create_token(agent_id)
     return {"token": token, "message": "✅ Token generated successfully."}
 
+def _challenge_mac(wallet_address: str, expires: int, nonce: str) -> str:
+    return hmac.new(SECRET_KEY.encode("utf-8"), f"{wallet_address}:{expires}:{nonce}".encode("utf-8"),
+                    hashlib.sha256).hexdigest()
+
+
+def _valid_challenge(challenge: str, wallet_address: str) -> bool:
+    """
+    Whether a challenge was issued by this server for this wallet and has neither
+    expired nor been redeemed. Challenges are signed, so any worker can check them.
+    """
+    now = int(time.time())
+    while used_challenges and next(iter(used_challenges.values())) < now:
+        used_challenges.popitem(last=False)
+    if not challenge.startswith(CHALLENGE_PREFIX) or challenge in used_challenges:
+        return False
+    try:
+        wallet, expires, nonce, mac = challenge[len(CHALLENGE_PREFIX):].rsplit(":", 3)
+        expires = int(expires)
+    except ValueError:
+        return False
+    if wallet != wallet_address or expires < now:
+        return False
+    return hmac.compare_digest(mac, _challenge_mac(wallet, expires, nonce))
+
+
+@router.post("/api/solana_challenge")
+async def solana_challenge(wallet_address: str):
+    """
+    Issue a login challenge for a wallet to sign and send to /api/solana_auth.
+    """
+    if not wallet_address:
+        raise HTTPException(status_code=400, detail="❌ Wallet address is required.")
+    expires = int(time.time()) + CHALLENGE_TTL
+    nonce = uuid.uuid4().hex
+    mac = _challenge_mac(wallet_address, expires, nonce)
+    challenge = f"{CHALLENGE_PREFIX}{wallet_address}:{expires}:{nonce}:{mac}"
+    return {"challenge": challenge, "expires_at": expires}
+
+
 @router.post("/api/solana_auth")
-async def solana_auth(wallet_address: str, signature: str):
-    challenge = "Sentinel Agent Authentication Challenge: " + str(uuid.uuid4())
-    is_valid = verify_solana_signature(challenge, signature, wallet_address)
+async def solana_auth(wallet_address: str, signature: str, challenge: str):
+    """
+    Exchange a challenge from /api/solana_challenge, signed by the wallet, for a token.
+    """
+    # Checked before the signature, so a failed signature doesn't use up the challenge
+    if not _valid_challenge(challenge, wallet_address):
+        raise HTTPException(status_code=400, detail="❌ Invalid, expired or already used challenge.")
+    is_valid = await signature_verifier.verify(challenge, signature, wallet_address)
     if not is_valid:
         raise HTTPException(status_code=400, detail="❌ Invalid signature or wallet address.")
+    if challenge in used_challenges:  # Redeemed by a concurrent request meanwhile
+        raise HTTPException(status_code=400, detail="❌ Invalid, expired or already used challenge.")
+    used_challenges[challenge] = int(challenge.rsplit(":", 3)[-3])
     token = create_token(wallet_address)
     return {"token": token, "message": "✅ Wallet authenticated successfully."}
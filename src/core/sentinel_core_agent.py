@@ -1,15 +1,24 @@
 import asyncio
 import uuid
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime
+try:
+    from core.log_buffer import LogRingBuffer
+except ImportError:  # Imported or run as a script from inside core/
+    from log_buffer import LogRingBuffer
 
 # Sentinel Core Agent - Manages Global Agent Registry, Directives, and Health Monitoring
 
 # ----------------------------
 # Global Variables
 # ----------------------------
+# Configurable Log Retention Parameters
+LOG_CAPACITY = 10000  # Entries kept per log before the oldest are overwritten
+LOG_RETENTION_SECONDS = 24 * 60 * 60  # Entries older than this are dropped
+
 AGENT_REGISTRY: Dict[str, Dict] = {}  # Stores all registered agents
-directives_log: List[Dict] = []  # Stores all task directives
+# Stores recent task directives as compact (agent_id, directive, payload, status) tuples
+directives_log = LogRingBuffer(capacity=LOG_CAPACITY, retention_seconds=LOG_RETENTION_SECONDS)
 
 # Configurable Token Stake Parameters
 BASE_STAKE = 10000
@@ -33,6 +42,10 @@ def current_time() -> str:
     """Return the current timestamp."""
     return datetime.utcnow().isoformat()
 
+def format_timestamp(timestamp: float) -> str:
+    """Format a stored epoch timestamp the same way as current_time()."""
+    return datetime.utcfromtimestamp(timestamp).isoformat()
+
 # ----------------------------
 # Sentinel Core Agent Class
 # ----------------------------
@@ -40,7 +53,7 @@ def current_time() -> str:
 class SentinelCoreAgent:
     def __init__(self):
         self.agent_count = 0
-        self.logs: List[str] = []
+        self.logs = LogRingBuffer(capacity=LOG_CAPACITY, retention_seconds=LOG_RETENTION_SECONDS)
         print("✅ Sentinel Core Agent initialized.")
     
     async def register_agent(self, agent_name: str, agent_type: str, stake: int, metadata: Optional[Dict] = None) -> Dict:
@@ -67,27 +80,59 @@ class SentinelCoreAgent:
     async def list_agents(self) -> List[Dict]:
         """List all registered agents."""
         return list(AGENT_REGISTRY.values())
+
+    def iter_agents(self, status: Optional[str] = None, agent_type: Optional[str] = None,
+                    skipped: bool = False) -> Iterator[Optional[Dict]]:
+        """
+        Yield registered agents one at a time, optionally filtered, for streaming exports.
+        The agents are a snapshot taken when the export starts (registry entries are
+        never modified in place). With `skipped`, None is yielded for every agent the filters pass over.
+        """
+        for agent in list(AGENT_REGISTRY.values()):
+            if ((status is not None and agent["status"] != status)
+                    or (agent_type is not None and agent["type"] != agent_type)):
+                if skipped:
+                    yield None
+                continue
+            yield agent
     
     async def send_directive(self, agent_id: str, directive: str, payload: Optional[Dict] = None) -> Dict:
         """Send a directive to a specific agent."""
         if agent_id not in AGENT_REGISTRY:
             return {"status": "error", "message": "Agent not found."}
         
-        directive_entry = {
-            "agent_id": agent_id,
-            "directive": directive,
-            "payload": payload or {},
-            "timestamp": current_time(),
-            "status": "in-progress"
-        }
-        directives_log.append(directive_entry)
+        directives_log.append((agent_id, directive, payload or {}, "in-progress"))
         self.logs.append(f"Directive sent to Agent {agent_id}: {directive}")
         print(f"📨 Directive sent to Agent {agent_id}: {directive}")
         return {"status": "success", "message": "Directive dispatched successfully."}
     
-    async def get_agent_logs(self) -> List[str]:
-        """Retrieve logs from Sentinel Core Agent."""
-        return self.logs
+    async def get_agent_logs(self, limit: Optional[int] = None, since: Optional[float] = None,
+                             until: Optional[float] = None) -> List[str]:
+        """
+        Retrieve logs from Sentinel Core Agent, oldest first.
+
+        :param limit: Return only the newest `limit` entries.
+        :param since: Only entries logged at or after this epoch timestamp.
+        :param until: Only entries logged before this epoch timestamp.
+        """
+        if since is None and until is None:
+            return self.logs.tail(self.logs.capacity if limit is None else limit)
+        return [entry for _, entry in self.logs.range(since, until, limit, newest=True)]
+
+    async def get_directive_log(self, limit: Optional[int] = None, since: Optional[float] = None,
+                                until: Optional[float] = None) -> List[Dict]:
+        """Retrieve recently sent directives, oldest first."""
+        records = directives_log.range(since, until, limit, newest=True)
+        return [
+            {
+                "agent_id": agent_id,
+                "directive": directive,
+                "payload": payload,
+                "timestamp": format_timestamp(timestamp),
+                "status": status
+            }
+            for timestamp, (agent_id, directive, payload, status) in records
+        ]
 
 # ----------------------------
 # Test the Sentinel Core Agent
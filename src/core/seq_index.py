@@ -0,0 +1,90 @@
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List
+
+# ----------------------------
+# Index Configuration
+# ----------------------------
+BUCKET_SIZE = 1000  # Buckets are split in two once they hold twice this many entries
+
+
+class SeqIndex:
+    """
+    A sorted set of directive sequence numbers.
+
+    Entries are kept in a list of small sorted buckets, with each bucket's largest
+    entry in `maxes`. Adding or removing an entry shifts at most one bucket rather
+    than the whole index, so moving a directive between statuses stays cheap at
+    millions of directives, while iteration is still in sequence order.
+    """
+    __slots__ = ("buckets", "maxes", "size")
+
+    def __init__(self):
+        self.buckets: List[List[int]] = []
+        self.maxes: List[int] = []
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[int]:
+        for bucket in self.buckets:
+            yield from bucket
+
+    def __contains__(self, seq: int) -> bool:
+        i = bisect_left(self.maxes, seq)
+        if i == len(self.maxes):
+            return False
+        bucket = self.buckets[i]
+        return bucket[bisect_left(bucket, seq)] == seq
+
+    def add(self, seq: int):
+        if not self.buckets:
+            self.buckets.append([seq])
+            self.maxes.append(seq)
+            self.size = 1
+            return
+        i = bisect_left(self.maxes, seq)
+        if i == len(self.maxes):
+            # Largest so far (e.g. a new directive): append to the last bucket
+            i -= 1
+            bucket = self.buckets[i]
+            bucket.append(seq)
+            self.maxes[i] = seq
+        else:
+            bucket = self.buckets[i]
+            position = bisect_left(bucket, seq)
+            if bucket[position] == seq:
+                return
+            bucket.insert(position, seq)
+        self.size += 1
+        if len(bucket) > 2 * BUCKET_SIZE:
+            self.buckets[i:i + 1] = [bucket[:BUCKET_SIZE], bucket[BUCKET_SIZE:]]
+            self.maxes[i:i + 1] = [bucket[BUCKET_SIZE - 1], bucket[-1]]
+
+    def discard(self, seq: int):
+        i = bisect_left(self.maxes, seq)
+        if i == len(self.maxes):
+            return
+        bucket = self.buckets[i]
+        position = bisect_left(bucket, seq)
+        if bucket[position] != seq:
+            return
+        del bucket[position]
+        self.size -= 1
+        if not bucket:
+            del self.buckets[i]
+            del self.maxes[i]
+        elif position == len(bucket):
+            self.maxes[i] = bucket[-1]
+
+    def after(self, seq: int) -> Iterator[int]:
+        """
+        Entries greater than `seq`, in order. The index must not change while this is consumed.
+        """
+        i = bisect_right(self.maxes, seq)
+        if i == len(self.buckets):
+            return
+        bucket = self.buckets[i]
+        yield from bucket[bisect_right(bucket, seq):]
+        for bucket in self.buckets[i + 1:]:
+            yield from bucket
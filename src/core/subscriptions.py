@@ -0,0 +1,81 @@
+from typing import Dict, Iterable, Set
+
+# ----------------------------
+# Topic Naming
+# ----------------------------
+ALL_TOPICS = "*"
+TOPIC_KINDS = ("agent", "status", "level")
+
+
+def agent_topic(agent_id: str) -> str:
+    return f"agent:{agent_id}"
+
+
+def status_topic(status: str) -> str:
+    return f"status:{status}"
+
+
+def level_topic(level: str) -> str:
+    return f"level:{level}"
+
+
+def validate_topic(topic: str) -> str:
+    """
+    Check that a client-supplied topic is either '*' or '<kind>:<value>' with a known kind.
+    """
+    if topic == ALL_TOPICS:
+        return topic
+    kind, _, value = topic.partition(":")
+    if kind not in TOPIC_KINDS or not value:
+        raise ValueError(f"❌ Invalid topic '{topic}'. Expected '*' or one of {[k + ':<value>' for k in TOPIC_KINDS]}")
+    return topic
+
+
+class SubscriptionIndex:
+    """
+    Topic-to-subscribers index, so a publish only touches interested connections.
+    """
+    def __init__(self):
+        self.subscribers: Dict[str, Set[str]] = {}  # topic -> connection keys
+        self.topics: Dict[str, Set[str]] = {}       # connection key -> topics
+
+    def subscribe(self, key: str, topics: Iterable[str]):
+        own = self.topics.setdefault(key, set())
+        for topic in topics:
+            own.add(topic)
+            self.subscribers.setdefault(topic, set()).add(key)
+
+    def unsubscribe(self, key: str, topics: Iterable[str] = None):
+        """
+        Remove some topics from a connection, or all of them when `topics` is None.
+        """
+        own = self.topics.get(key)
+        if own is None:
+            return
+        for topic in list(own) if topics is None else topics:
+            own.discard(topic)
+            keys = self.subscribers.get(topic)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.subscribers[topic]
+        if not own:
+            del self.topics[key]
+
+    def topics_for(self, key: str) -> Set[str]:
+        return self.topics.get(key, set())
+
+    def match(self, topics: Iterable[str]) -> Set[str]:
+        """
+        Return the keys subscribed to any of `topics`, plus wildcard subscribers.
+        """
+        keys = set(self.subscribers.get(ALL_TOPICS, ()))
+        for topic in topics:
+            subscribed = self.subscribers.get(topic)
+            if subscribed:
+                keys |= subscribed
+        return keys
+
+    def clear(self):
+        self.subscribers.clear()
+        self.topics.clear()
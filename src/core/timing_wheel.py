@@ -0,0 +1,94 @@
+import math
+from typing import Dict, Hashable, List, Set, Tuple
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel for large numbers of timers.
+
+    Level 0 has `slots` buckets of one tick each; every level above covers `slots`
+    times the span of the one below. A timer is placed on the lowest level whose
+    span reaches its deadline and is cascaded down as the wheel turns, so
+    scheduling, cancelling and each tick cost O(1) regardless of how many timers
+    are outstanding. Deadlines are rounded up to the next tick.
+    """
+    def __init__(self, tick: float = 0.1, slots: int = 256, levels: int = 4, start: float = 0.0):
+        if tick <= 0 or slots < 2 or levels < 1:
+            raise ValueError("❌ Timing wheel needs tick > 0, slots >= 2 and levels >= 1.")
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.start = start
+        self.current = 0  # Ticks processed so far
+        self._wheels: List[List[Set[Hashable]]] = [[set() for _ in range(slots)] for _ in range(levels)]
+        self._timers: Dict[Hashable, Tuple[int, int, int]] = {}  # key -> (due tick, level, slot)
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def schedule(self, key: Hashable, deadline: float):
+        """
+        Fire `key` once `deadline` has passed, replacing any timer already set for it.
+        """
+        self.cancel(key)
+        due = max(math.ceil((deadline - self.start) / self.tick), self.current + 1)
+        self._place(key, due)
+
+    def cancel(self, key: Hashable) -> bool:
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        _, level, slot = timer
+        self._wheels[level][slot].discard(key)
+        return True
+
+    def advance(self, now: float) -> List[Hashable]:
+        """
+        Turn the wheel up to `now` and return the keys whose deadlines have passed.
+        """
+        target = math.floor((now - self.start) / self.tick)
+        expired: List[Hashable] = []
+        while self.current < target:
+            self.current += 1
+            self._cascade()
+            bucket = self._wheels[0][self.current % self.slots]
+            if bucket:
+                for key in bucket:
+                    del self._timers[key]
+                expired.extend(bucket)
+                bucket.clear()
+        return expired
+
+    def _place(self, key: Hashable, due: int):
+        delta = due - self.current
+        span = self.slots
+        level = 0
+        while delta >= span and level < self.levels - 1:
+            span *= self.slots
+            level += 1
+        if delta >= span:
+            # Beyond the top level's reach: park in its furthest slot and re-place on cascade
+            slot = (self.current // (span // self.slots) + self.slots - 1) % self.slots
+        else:
+            slot = (due // (span // self.slots)) % self.slots
+        self._wheels[level][slot].add(key)
+        self._timers[key] = (due, level, slot)
+
+    def _cascade(self):
+        # Whenever a lower level wraps, redistribute the next bucket of the level above
+        span = 1
+        for level in range(1, self.levels):
+            span *= self.slots
+            if self.current % span:
+                break
+            bucket = self._wheels[level][(self.current // span) % self.slots]
+            if not bucket:
+                continue
+            keys = list(bucket)
+            bucket.clear()
+            for key in keys:
+                due = self._timers[key][0]
+                self._place(key, due)
@@ -1,29 +1,180 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import Depends, FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import APIRouter
 import asyncio
-from typing import List
+import os
+from typing import Dict, List, Optional
 from prometheus_fastapi_instrumentator import Instrumentator
-from core.agent_manager import AgentManager
-from core.directive_engine import DirectiveEngine
-from core.logger import active_connections, broadcast_log
+from core.agent_manager import AgentManager, parse_stake
+from core.fleet_registry import FleetRegistry
+from core.heartbeat import HeartbeatMonitor
+from core.logging_config import flush_logging, get_logger
+from core.worker_router import WorkerRouter, WorkerRPCError
+from core.auth import require_token, require_websocket_token
+from core.routes import router as auth_router
+from core.broadcast_hub import BroadcastHub, ClientChannel
+from core.codecs import JSON_WIRE, WireFormat, negotiate
+from core.connection_registry import AGENT, DASHBOARD, LOG_VIEWER, ConnectionRegistry
+from core.directive_engine import DirectiveEngine, DEFAULT_PAGE_SIZE, DEFAULT_STATS_WINDOW
+from core.directive_deadlines import DirectiveDeadlines, TERMINAL_STATUSES
+from core.directive_queue import DirectiveScheduler, QueueFullError, directive_priority
+from core.directive_store import WALDirectiveStore, open_worker_store
+from core.exports import ndjson_response
+from core.frames import Frame, encode_frame
+from core.metrics import (AGENT_MESSAGES_RECEIVED, DASHBOARD_MESSAGES_RECEIVED, LOG_VIEWER_MESSAGES_RECEIVED,
+                          register_connection_metrics)
+from core.logger import (LOG_BATCH_MAX, LOG_BATCH_WINDOW, LOG_EPOCH, broadcast_log, cursor_message,
+                         log_hub, replay_frames)
+from core.subscriptions import agent_topic, validate_topic
 from pydantic import BaseModel
-from core.broadcast_utils import active_connections
-import uuid
-from core.broadcast_utils import broadcast_directive_update
+from core.broadcast_utils import agent_hub, broadcast_directive_update, directive_hub
 
 
 
 class DirectiveRequest(BaseModel):
     task: str
 
+
+class BulkDirectiveItem(BaseModel):
+    agent_id: str
+    directive: dict
+
+
+class BulkDirectiveRequest(BaseModel):
+    """
+    Either a list of per-agent directives in `items`, or one `directive` for every agent in `agent_ids`.
+    """
+    items: List[BulkDirectiveItem] = []
+    directive: Optional[dict] = None
+    agent_ids: List[str] = []
+
+
+MAX_BULK_DIRECTIVES = 10000
+
+# Directory for the directive write-ahead log; directives stay in memory only when unset.
+# With several workers each one keeps its own log in a `worker-<n>` subdirectory.
+DIRECTIVE_STORE_DIR = os.environ.get("SENTINEL_DIRECTIVE_STORE_DIR")
+
+# Shared directory for worker sockets when running several uvicorn workers; single-process when unset
+WORKER_DIR = os.environ.get("SENTINEL_WORKER_DIR")
+
+log = get_logger("websocket_server")
+
 app = FastAPI(title="Sentinel WebSocket Server", version="0.1.0")
-agent_manager = AgentManager()
-directive_engine = DirectiveEngine()
+fleet_registry = FleetRegistry()  # Stake/type/status columns of registered agents
+agent_manager = AgentManager(fleet=fleet_registry)
+if not DIRECTIVE_STORE_DIR:
+    directive_store = None
+elif WORKER_DIR:
+    directive_store = open_worker_store(DIRECTIVE_STORE_DIR)
+else:
+    directive_store = WALDirectiveStore(DIRECTIVE_STORE_DIR)
+directive_engine = DirectiveEngine(store=directive_store)
 router = APIRouter()
+
+# Every live socket by id and role; each role broadcasts through its own hub
+connections = ConnectionRegistry({AGENT: agent_hub, DASHBOARD: directive_hub, LOG_VIEWER: log_hub})
+register_connection_metrics(connections)
+
+
+def resend_directive(agent_id: str, frame: Frame) -> bool:
+    channel = connections.get(agent_id, AGENT)
+    return channel is not None and channel.enqueue(frame)
+
+
+def expire_directive(directive_id: str, reason: str):
+    log.warning("directive_expired", f"⌛ Directive '{directive_id}' expired: {reason}", directive_id=directive_id, reason=reason)
+    directive_scheduler.release(directive_id)
+    directive_engine.update_directive_status(directive_id, "expired")
+
+
+def drop_agent_queue(agent_id: str, reason: str):
+    """
+    Forget a gone agent's directive queue. Directives that were still waiting are
+    expired; dispatched ones are settled by their ack/completion deadlines.
+    """
+    for directive_id in directive_scheduler.drop_agent(agent_id):
+        expire_directive(directive_id, reason)
+
+
+def send_queued_directive(agent_id: str, directive_id: str, frame: Frame) -> bool:
+    channel = connections.get(agent_id, AGENT)
+    if channel is None:
+        return False
+    # A frame dropped by a full connection queue is redelivered by the ack deadline
+    channel.enqueue(frame)
+    directive_deadlines.track(directive_id, agent_id, frame)
+    directive_engine.mark_dispatched(directive_id)
+    return True
+
+
+# Ack/completion deadlines for dispatched directives, driven by one scheduler task
+directive_deadlines = DirectiveDeadlines(
+    resend=resend_directive,
+    expire=expire_directive,
+    ack_timeout=float(os.environ.get("SENTINEL_DIRECTIVE_ACK_TIMEOUT", 10.0)),
+    completion_timeout=float(os.environ.get("SENTINEL_DIRECTIVE_COMPLETION_TIMEOUT", 300.0)),
+)
+
+# Per-agent priority queues with an in-flight limit
+directive_scheduler = DirectiveScheduler(
+    send=send_queued_directive,
+    max_in_flight=int(os.environ.get("SENTINEL_MAX_IN_FLIGHT", 32)),
+    max_queued=int(os.environ.get("SENTINEL_MAX_QUEUED_DIRECTIVES", 1000)),
+)
+
+def ping_agent(agent_id: str):
+    channel = connections.get(agent_id, AGENT)
+    if channel is not None:
+        channel.enqueue({"action": "ping"})
+
+
+def mark_agent_stale(agent_id: str):
+    """
+    Take an agent that stopped answering heartbeats out of routing and mark it stale.
+    """
+    log.warning("agent_stale", f"💤 Agent '{agent_id}' missed its heartbeat; marking stale.", agent_id=agent_id)
+    if agent_id in agent_manager.agents:
+        agent_manager.update_agent_status(agent_id, "stale")
+    drop_agent_queue(agent_id, "agent stale")
+    channel = connections.get(agent_id, AGENT)
+    if channel is not None:
+        connections.evict(agent_id, "heartbeat timeout")
+    asyncio.create_task(broadcast_log(f"💤 Agent '{agent_id}' is stale (no heartbeat).", level="warning"))
+
+
+# Liveness of connected agents: silent agents are pinged, then marked stale
+heartbeat_monitor = HeartbeatMonitor(
+    ping=ping_agent,
+    on_stale=mark_agent_stale,
+    timeout=float(os.environ.get("SENTINEL_HEARTBEAT_TIMEOUT", 30.0)),
+    ping_grace=float(os.environ.get("SENTINEL_HEARTBEAT_PING_GRACE", 10.0)),
+)
+
+# Cross-worker routing: agent ownership, forwarded directives and relayed broadcasts
+worker_router = WorkerRouter(WORKER_DIR, hubs={"agents": agent_hub, "directives": directive_hub, "logs": log_hub}) if WORKER_DIR else None
+
+
+async def forward_to_owner(agent_id: str, method: str, params: dict) -> Optional[dict]:
+    """
+    Run an API call on the worker holding the agent's socket.
+
+    :return: The owner's response, or None if no other worker holds the agent.
+    """
+    owner = worker_router.owner(agent_id) if worker_router is not None else None
+    if owner is None:
+        return None
+    try:
+        return await worker_router.call(owner, method, params)
+    except WorkerRPCError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
 # Enable Prometheus Instrumentation
 Instrumentator().instrument(app).expose(app)
 
+# Token issuance and wallet auth; also registers the signature verifier's /metrics collector
+app.include_router(auth_router)
+
 # Enable CORS for frontend connection
 app.add_middleware(
     CORSMiddleware,
@@ -33,122 +184,482 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Store connected clients
-connected_clients: List[WebSocket] = []
 
-# Store active WebSocket connections
-active_connections = {}
+async def handle_subscription(hub: BroadcastHub, key: str, data: dict) -> bool:
+    """
+    Apply a client's subscribe/unsubscribe request.
+
+    Clients send {"action": "subscribe", "topics": ["agent:<id>", "status:<status>", "level:<level>"]}.
+    Until the first subscribe a client receives every topic.
+
+    :return: False if `data` is not a subscription request.
+    """
+    action = data.get("action")
+    if action not in ("subscribe", "unsubscribe"):
+        return False
+
+    channel = hub.get(key)
+    if channel is None:
+        return True
+    try:
+        topics = [validate_topic(str(topic)) for topic in data.get("topics", [])]
+    except ValueError as e:
+        channel.enqueue({"status": "error", "message": str(e)})
+        return True
+
+    if action == "subscribe":
+        current = hub.subscribe(key, topics)
+    else:
+        current = hub.unsubscribe(key, topics)
+    channel.enqueue({"status": "success", "action": action, "topics": sorted(current)})
+    return True
+
 
+def replay_logs(channel: ClientChannel, since: Optional[int], epoch: Optional[str] = None):
+    """
+    Queue a log cursor and, when resuming, every buffered entry from `since` on.
+    Runs without yielding to the loop, so replayed entries land ahead of live ones.
 
-@app.websocket("/ws/logs")
-async def websocket_logs_endpoint(websocket: WebSocket):
+    :param epoch: The epoch `since` was issued under; offsets from another epoch
+                  (a restarted server, another worker) are ignored.
     """
-    WebSocket endpoint for log streaming.
+    if epoch is not None and epoch != LOG_EPOCH:
+        since = None
+    channel.enqueue(cursor_message(since))
+    if since is not None:
+        for frame in replay_frames(since, log_hub.subscriptions.topics_for(channel.key)):
+            channel.enqueue(frame)
+
+
+@app.websocket("/ws/logs", dependencies=[Depends(require_websocket_token)])
+async def websocket_logs_endpoint(websocket: WebSocket, since: Optional[int] = None,
+                                  epoch: Optional[str] = None):
+    """
+    WebSocket endpoint for log streaming. Clients may subscribe to 'level:<level>' topics.
+
+    Every entry carries an `offset`. A reconnecting client passes `?since=<last offset + 1>&epoch=<epoch>`
+    (or sends {"action": "replay", "since": N, "epoch": E}) to receive what it missed from the shared
+    log buffer; the first message is a `log_cursor` with the current epoch, reporting any entries
+    already overwritten.
+    Entries arrive batched as {"action": "batch", "messages": [...]}.
     """
     await websocket.accept()
-    print("✅ Dashboard connected to Logs WebSocket.")
+    channel = connections.register(LOG_VIEWER, websocket)
+    viewer_id = channel.key
+    channel.configure_batching(LOG_BATCH_WINDOW, LOG_BATCH_MAX)
+    replay_logs(channel, since, epoch)
+    log.info("log_viewer_connected", "✅ Dashboard connected to Logs WebSocket.", client=viewer_id)
 
     try:
         while True:
-            # Send simulated log messages every 10 seconds
-            await websocket.send_json({"type": "log", "message": f"📝 Log Entry {uuid.uuid4()}: Simulated log message."})
-            await asyncio.sleep(10)  # Changed from 1 second to 10 seconds
+            data = await websocket.receive_json()
+            LOG_VIEWER_MESSAGES_RECEIVED.inc()
+            if data.get("action") == "replay":
+                try:
+                    replay_logs(channel, int(data.get("since", 0)), data.get("epoch"))
+                except (TypeError, ValueError):
+                    channel.enqueue({"status": "error", "message": "❌ Invalid replay offset."})
+            elif not await handle_subscription(log_hub, viewer_id, data):
+                channel.enqueue({"status": "error", "message": "❌ Unsupported action."})
     except WebSocketDisconnect:
-        print("🔌 Dashboard disconnected from Logs WebSocket.")
+        log.info("log_viewer_disconnected", "🔌 Dashboard disconnected from Logs WebSocket.", client=viewer_id)
+    finally:
+        # Runs on malformed messages and other errors too, so no dead channel is left behind
+        connections.unregister(viewer_id, websocket)
 
 
 
 MINIMUM_STAKE = 10000
-agent_stakes = {}  # Example storage for agent stakes
+
+
+async def receive_message(websocket: WebSocket, wire: WireFormat):
+    """
+    Next message from a socket: text frames are JSON, binary frames use the
+    connection's negotiated codec.
+
+    :raises ValueError: If the message can't be decoded.
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+    text = message.get("text")
+    return wire.decode(text if text is not None else message.get("bytes") or b"")
+
 
 @app.websocket("/ws/agent/{agent_id}")
-async def websocket_agent_endpoint(websocket: WebSocket, agent_id: str):
+async def websocket_agent_endpoint(websocket: WebSocket, agent_id: str,
+                                   token_agent_id: Optional[str] = Depends(require_websocket_token)):
     agent_id = agent_id.strip()
+    if token_agent_id is not None and token_agent_id != agent_id:
+        await websocket.close(code=1008, reason="Token does not belong to this agent")
+        return
     await websocket.accept()
-    active_connections[agent_id] = websocket
-    print(f"📡 Agent '{agent_id}' connected via WebSocket.")
+    # Agents only receive updates about their own directives
+    try:
+        connections.register(AGENT, websocket, agent_id, topics=(agent_topic(agent_id),))
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    heartbeat_monitor.track(agent_id)
+    if worker_router is not None:
+        worker_router.claim(agent_id)
+    log.info("agent_connected", f"📡 Agent '{agent_id}' connected via WebSocket.", agent_id=agent_id)
     await broadcast_log(f"📡 Agent '{agent_id}' connected.")
 
+    wire = JSON_WIRE  # Until the agent negotiates another encoding at register
     try:
         while True:
-            data = await websocket.receive_json()
+            try:
+                data = await receive_message(websocket, wire)
+            except ValueError as e:
+                await websocket.send_json({"status": "error", "message": str(e)})
+                continue
+            AGENT_MESSAGES_RECEIVED.inc()
+            if not isinstance(data, dict):
+                await websocket.send_json({"status": "error", "message": "❌ Messages must be objects."})
+                continue
             action = data.get("action")
+            heartbeat_monitor.touch(agent_id)  # Any message proves the agent is alive
+
+            if action in ("heartbeat", "pong"):
+                pass  # Already recorded above
 
-            if action == "register":
+            elif action == "register":
                 metadata = data.get("metadata", {})
-                stake = metadata.get("stake", 0)
+                if not isinstance(metadata, dict):
+                    await websocket.send_json({"status": "error", "message": "❌ Agent metadata must be an object."})
+                    continue
+                try:
+                    stake = parse_stake(metadata.get("stake", 0))
+                except ValueError as e:
+                    await websocket.send_json({"status": "error", "message": str(e)})
+                    continue
 
                 if stake < MINIMUM_STAKE:
                     await websocket.send_json({"status": "error", "message": f"❌ Insufficient token stake! Minimum required: {MINIMUM_STAKE}"})
-                    print(f"❌ Insufficient token stake for '{agent_id}'. Provided: {stake}")
+                    log.warning("agent_stake_rejected", f"❌ Insufficient token stake for '{agent_id}'. Provided: {stake}",
+                                agent_id=agent_id, stake=stake)
                     continue
 
-                agent_stakes[agent_id] = stake
-                print(f"✅ Agent '{agent_id}' registered with stake: {stake}")
-                await websocket.send_json({"status": "success", "message": f"✅ Agent '{agent_id}' registered successfully with stake {stake}."})
+                try:
+                    agent_manager.upsert_agent(dict(
+                        {key: value for key, value in metadata.items() if key != "stake"},
+                        agent_id=agent_id, token_stake=stake
+                    ))
+                except ValueError as e:
+                    await websocket.send_json({"status": "error", "message": str(e)})
+                    continue
+                reply = {"status": "success", "message": f"✅ Agent '{agent_id}' registered successfully with stake {stake}."}
+
+                # Optional opt-in: {"batching": {"window_ms": 5, "max_messages": 50}}
+                batching = data.get("batching")
+                channel = connections.get(agent_id, AGENT)
+                if isinstance(batching, dict) and channel is not None:
+                    try:
+                        channel.configure_batching(float(batching.get("window_ms", 0)) / 1000,
+                                                   int(batching.get("max_messages", 1)))
+                    except (TypeError, ValueError):
+                        await websocket.send_json({"status": "error", "message": "❌ Invalid batching options."})
+                        continue
+                    reply["batching"] = {"window_ms": channel.batch_window * 1000, "max_messages": channel.batch_max}
+
+                # Optional opt-in: {"encoding": {"codecs": ["msgpack", "cbor"], "compress_min_bytes": 4096}}
+                try:
+                    negotiated = negotiate(data.get("encoding"))
+                except ValueError as e:
+                    await websocket.send_json({"status": "error", "message": str(e)})
+                    continue
+                if "encoding" in data:
+                    reply["encoding"] = negotiated.describe()
+                # The reply itself is JSON text; the agent switches once it has read it
+                await websocket.send_json(reply)
+                wire = negotiated
+                if channel is not None:
+                    channel.wire = wire
             
             
             elif action == "directive_response":
                 directive_id = data.get("directive_id")
                 directive_status = data.get("status")
                 if directive_id and directive_status:
-                    print(f"✅ Directive '{directive_id}' status updated to '{directive_status}'")
+                    log.info("directive_update_received", "✅ Directive status reported.",
+                             directive_id=directive_id, agent_id=agent_id, status=directive_status)
+                    directive = directive_engine.directives.get(directive_id)
+                    if directive is None or directive.agent_id != agent_id:
+                        await websocket.send_json({"status": "error", "message": f"❌ Unknown directive '{directive_id}'."})
+                        continue
+                    # Validates the transition, records it in the directive's history and
+                    # broadcasts the stored directive
+                    if not directive_engine.update_directive_status(directive_id, directive_status):
+                        await websocket.send_json({"status": "error", "directive_id": directive_id,
+                                                   "message": f"❌ Directive '{directive_id}' cannot move from "
+                                                              f"'{directive.status_name}' to '{directive_status}'."})
+                        continue
                     await broadcast_log(f"✅ Directive '{directive_id}' updated to '{directive_status}'")
-                    
-                    # Ensure broadcast directive_update to frontend
-                    await broadcast_directive_update({
-                        "id": directive_id,
-                        "agent_id": agent_id,
-                        "task": "optimize_cpu",  # Use the correct task from the directive
-                        "status": directive_status
-                    })
+
+                    directive_deadlines.on_status(directive_id, directive_status)
+                    if directive_status in TERMINAL_STATUSES:
+                        directive_scheduler.release(directive_id)
                 else:
                     await websocket.send_json({"status": "error", "message": "❌ Invalid directive response."})
 
 
     except WebSocketDisconnect:
-        print(f"🔌 Agent '{agent_id}' disconnected.")
-        active_connections.pop(agent_id, None)
-        agent_stakes.pop(agent_id, None)
-        await broadcast_log(f"🔌 Agent '{agent_id}' disconnected.")
+        log.info("agent_disconnected", f"🔌 Agent '{agent_id}' disconnected.", agent_id=agent_id)
+    finally:
+        # Runs on unexpected errors too, so a failed handler never leaves a dead channel behind
+        connections.unregister(agent_id, websocket)
+        if agent_id not in agent_hub:  # Not replaced by a reconnect
+            drop_agent_queue(agent_id, "agent disconnected")
+            heartbeat_monitor.forget(agent_id)
+            if worker_router is not None:
+                worker_router.release(agent_id)
+            agent = agent_manager.agents.get(agent_id)
+            if agent is not None and agent.status_name == "active":
+                agent_manager.update_agent_status(agent_id, "inactive")
+        await broadcast_log(f"🔌 Agent '{agent_id}' disconnected.", level="warning")
+
+
 
 
 
+async def dispatch_directive(agent_id: str, directive_id: str, directive: dict) -> dict:
+    """
+    Hand a created directive to the agent's priority queue. It goes on the wire
+    immediately if the agent has a free in-flight slot, otherwise when one frees up.
+    """
+    if agent_id not in agent_hub:
+        return {"agent_id": agent_id, "status": "error", "message": f"❌ Agent '{agent_id}' is not connected."}
+    frame = encode_frame({
+        "action": "directive",
+        "directive_id": directive_id,
+        "directive": directive
+    })
+    try:
+        sent = directive_scheduler.submit(agent_id, directive_id, frame, directive_priority(directive))
+    except QueueFullError as e:
+        return {"agent_id": agent_id, "status": "error", "message": str(e), "backpressure": True}
+    return {"agent_id": agent_id, "status": "success", "directive_id": directive_id, "queued": not sent}
 
 
-@app.post("/api/send_directive/{agent_id}")
+@app.post("/api/send_directive/{agent_id}", dependencies=[Depends(require_token)])
 async def send_directive(agent_id: str, directive: dict):
     """
     API Endpoint to send a directive to a specific agent via WebSocket.
     """
     agent_id = agent_id.strip()
-    
-    print(f"DEBUG: Active Connections: {list(active_connections.keys())}")
-    print(f"DEBUG: Sending directive to Agent '{agent_id}'")
-    
-    if agent_id not in active_connections:
-        print(f"❌ DEBUG: Agent '{agent_id}' not found in active connections.")
+    log.debug("directive_send", "Sending directive.", agent_id=agent_id, connections=len(agent_hub))
+
+    if agent_id not in agent_hub:
+        # The agent may be connected to another worker process
+        forwarded = await forward_to_owner(agent_id, "send_directive", {"agent_id": agent_id, "directive": directive})
+        if forwarded is not None:
+            return forwarded
+        log.debug("agent_not_connected", "❌ Agent not found in active connections.", agent_id=agent_id)
         return {"status": "error", "message": f"❌ Agent '{agent_id}' is not connected."}
 
+    # Push back before creating anything if the agent's queue is saturated
+    if not directive_scheduler.can_accept(agent_id):
+        raise HTTPException(status_code=429, detail=f"❌ Directive queue for Agent '{agent_id}' is full. Retry later.")
+
     # Create a directive
     directive_id = directive_engine.create_directive(agent_id, directive)
     
-    # Send the directive via WebSocket
-    await active_connections[agent_id].send_json({
-        "action": "directive",
-        "directive_id": directive_id,
-        "directive": directive
-    })
-    
-    print(f"📨 DEBUG: Directive '{directive_id}' sent to Agent '{agent_id}'")
-    
+    # Queue the directive on the agent's outbound channel
+    result = await dispatch_directive(agent_id, directive_id, directive)
+    if result["status"] != "success":
+        return {"status": "error", "message": result["message"]}
+    if result["queued"]:
+        return {"status": "success", "message": f"⏳ Directive '{directive_id}' queued for Agent '{agent_id}'."}
+
+    log.info("directive_sent", "📨 Directive sent.", directive_id=directive_id, agent_id=agent_id)
+
     # Broadcast the directive to all connected clients
     await broadcast_log(f"📨 Directive '{directive_id}' sent to Agent '{agent_id}' with task '{directive.get('task')}'")
     
     return {"status": "success", "message": f"📨 Directive '{directive_id}' sent to Agent '{agent_id}'."}
 
 
-@app.get("/test_directive_broadcast")
+async def forward_bulk(owner: str, targets: List[tuple]) -> List[dict]:
+    """
+    Send part of a bulk request to the worker that holds those agents.
+    """
+    items = [{"agent_id": agent_id, "directive": directive} for agent_id, directive in targets]
+    try:
+        response = await worker_router.call(owner, "send_directives", {"items": items})
+        return response["results"]
+    except WorkerRPCError as e:
+        return [{"agent_id": agent_id, "status": "error", "message": e.detail} for agent_id, _ in targets]
+
+
+@app.post("/api/send_directives", dependencies=[Depends(require_token)])
+async def send_directives(request: BulkDirectiveRequest):
+    """
+    API Endpoint to send directives to many agents in one request.
+    Directives are created in one pass and dispatched concurrently; the response
+    carries one result per target, in request order.
+    """
+    targets = [(item.agent_id.strip(), item.directive) for item in request.items]
+    if request.directive is not None:
+        targets.extend((agent_id.strip(), request.directive) for agent_id in request.agent_ids)
+    elif request.agent_ids:
+        raise HTTPException(status_code=400, detail="❌ 'agent_ids' requires a 'directive'.")
+    if not targets:
+        raise HTTPException(status_code=400, detail="❌ No directives to send.")
+    if len(targets) > MAX_BULK_DIRECTIVES:
+        raise HTTPException(status_code=400, detail=f"❌ At most {MAX_BULK_DIRECTIVES} directives per request.")
+
+    # Only create directives for agents that can receive them, matching send_directive
+    results: List[Optional[dict]] = [None] * len(targets)
+    accepted: List[int] = []
+    reserved: Dict[str, int] = {}
+    remote: Dict[str, List[int]] = {}  # Owning worker -> target indexes
+    for index, (agent_id, directive) in enumerate(targets):
+        owner = worker_router.owner(agent_id) if worker_router is not None else None
+        if agent_id not in agent_hub and owner is not None:
+            remote.setdefault(owner, []).append(index)
+        elif agent_id not in agent_hub:
+            results[index] = {"agent_id": agent_id, "status": "error", "message": f"❌ Agent '{agent_id}' is not connected."}
+        elif not directive_scheduler.can_accept(agent_id, reserved.get(agent_id, 0) + 1):
+            results[index] = {"agent_id": agent_id, "status": "error", "backpressure": True,
+                              "message": f"❌ Directive queue for Agent '{agent_id}' is full. Retry later."}
+        else:
+            reserved[agent_id] = reserved.get(agent_id, 0) + 1
+            accepted.append(index)
+
+    directive_ids = directive_engine.create_directives(targets[index] for index in accepted)
+    dispatches = [
+        (index, dispatch_directive(targets[index][0], directive_id, targets[index][1]))
+        for index, directive_id in zip(accepted, directive_ids)
+    ]
+    forwards = [
+        (indexes, forward_bulk(owner, [targets[index] for index in indexes]))
+        for owner, indexes in remote.items()
+    ]
+    dispatched = await asyncio.gather(*(dispatch for _, dispatch in dispatches))
+    for (index, _), result in zip(dispatches, dispatched):
+        results[index] = result
+    for indexes, forwarded in zip((indexes for indexes, _ in forwards),
+                                  await asyncio.gather(*(forward for _, forward in forwards))):
+        for index, result in zip(indexes, forwarded):
+            results[index] = result
+
+    sent = sum(1 for result in results if result["status"] == "success")
+    await broadcast_log(f"📨 Bulk dispatch: {sent}/{len(results)} directives sent.")
+    return {
+        "status": "success" if sent == len(results) else "partial" if sent else "error",
+        "sent": sent,
+        "failed": len(results) - sent,
+        "results": results
+    }
+
+
+async def serve_forwarded_directive(params: dict) -> dict:
+    """
+    Handle a send_directive forwarded by another worker. Served only for agents
+    connected here, so stale ownership can't bounce a request between workers.
+    """
+    agent_id = params["agent_id"]
+    if agent_id not in agent_hub:
+        return {"status": "error", "message": f"❌ Agent '{agent_id}' is not connected."}
+    try:
+        return await send_directive(agent_id, params["directive"])
+    except HTTPException as e:
+        raise WorkerRPCError(e.status_code, e.detail)
+
+
+async def serve_forwarded_directives(params: dict) -> dict:
+    """
+    Handle the part of a bulk request forwarded by another worker.
+    """
+    items = params["items"]
+    results = [{"agent_id": item["agent_id"], "status": "error",
+                "message": f"❌ Agent '{item['agent_id']}' is not connected."} for item in items]
+    local = [index for index, item in enumerate(items) if item["agent_id"] in agent_hub]
+    if local:
+        response = await send_directives(BulkDirectiveRequest(items=[BulkDirectiveItem(**items[index]) for index in local]))
+        for index, result in zip(local, response["results"]):
+            results[index] = result
+    return {"results": results}
+
+
+if worker_router is not None:
+    worker_router.handle("send_directive", serve_forwarded_directive)
+    worker_router.handle("send_directives", serve_forwarded_directives)
+
+
+@app.get("/api/directives", dependencies=[Depends(require_token)])
+async def list_directives(agent_id: Optional[str] = None, status: Optional[str] = None,
+                          cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE):
+    """
+    List directives filtered by agent and/or status with cursor pagination.
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page.
+    """
+    try:
+        return directive_engine.query_directives(agent_id=agent_id, status=status, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/connections", dependencies=[Depends(require_token)])
+async def connection_counts():
+    """
+    Live connections on this worker, by role.
+    """
+    return connections.counts()
+
+
+@app.get("/api/directives/stats", dependencies=[Depends(require_token)])
+async def directive_stage_stats(agent_id: Optional[str] = None, task: Optional[str] = None,
+                                limit: int = DEFAULT_STATS_WINDOW):
+    """
+    Stage latency distributions (queued, ack, run, total) for recent directives,
+    optionally for one agent and/or task. Slow agents show up in 'ack' and 'run'.
+    """
+    return directive_engine.stage_stats(agent_id=agent_id, task=task, limit=limit)
+
+
+@app.get("/api/directives/{directive_id}/timeline", dependencies=[Depends(require_token)])
+async def directive_timeline(directive_id: str):
+    """
+    A directive's status history and the time it spent in each stage.
+    """
+    timeline = directive_engine.directive_timeline(directive_id)
+    if timeline is None:
+        raise HTTPException(status_code=404, detail=f"❌ Directive '{directive_id}' not found.")
+    return timeline
+
+
+@app.get("/api/fleet/stats", dependencies=[Depends(require_token)])
+async def fleet_stats():
+    """
+    Fleet summary: agent count, total stake, counts by status and type, and stake percentiles.
+    """
+    return fleet_registry.stats()
+
+
+@app.get("/api/agents/export", dependencies=[Depends(require_token)])
+async def export_agents(status: Optional[str] = None, type: Optional[str] = None,
+                        min_stake: Optional[float] = None):
+    """
+    Stream registered agents as newline-delimited JSON, one agent per line.
+    """
+    rows = agent_manager.export_agents(status=status, agent_type=type, min_stake=min_stake, skipped=True)
+    return ndjson_response(rows, "agents.ndjson")
+
+
+@app.get("/api/directives/export", dependencies=[Depends(require_token)])
+async def export_directives(agent_id: Optional[str] = None, status: Optional[str] = None,
+                            task: Optional[str] = None):
+    """
+    Stream directives as newline-delimited JSON, oldest first, one directive per line.
+    """
+    rows = directive_engine.export_directives(agent_id=agent_id, status=status, task=task, skipped=True)
+    return ndjson_response(rows, "directives.ndjson")
+
+
+
+@app.get("/test_directive_broadcast", dependencies=[Depends(require_token)])
 async def test_directive_broadcast():
     directive = {
         "id": "test-uuid",
@@ -156,76 +667,59 @@ async def test_directive_broadcast():
         "task": "test_task1",
         "status": "completed"
     }
-    print(f"📡 Broadcasting Directive Update: {directive}")
     await broadcast_directive_update(directive)
     return {"status": "success", "message": "✅ Test directive broadcast sent."}
 
 
 
-@app.websocket("/ws/directives")
+@app.websocket("/ws/directives", dependencies=[Depends(require_websocket_token)])
 async def websocket_directives(websocket: WebSocket):
+    """
+    Directive updates for dashboards. Every dashboard gets its own connection id,
+    so any number of them can watch at once.
+    """
     await websocket.accept()
-    agent_id = "agent-dashboard"
-    active_connections[agent_id] = websocket
-    print(f"📡 Directive WebSocket connected: {agent_id}")
+    channel = connections.register(DASHBOARD, websocket)
+    dashboard_id = channel.key
+    channel.enqueue({"type": "info", "message": f"📡 Connected as '{dashboard_id}'.", "connection_id": dashboard_id})
+    log.info("dashboard_connected", f"📡 Directive WebSocket connected: {dashboard_id}", client=dashboard_id)
     
     try:
         while True:
             data = await websocket.receive_json()
-            print(f"📝 Directive WebSocket Data: {data}")
+            DASHBOARD_MESSAGES_RECEIVED.inc()
+            log.debug("dashboard_message", "📝 Directive WebSocket Data.", client=dashboard_id, data=data)
+            await handle_subscription(directive_hub, dashboard_id, data)
     except WebSocketDisconnect:
-        print(f"🔌 Directive WebSocket disconnected: {agent_id}")
-        active_connections.pop(agent_id, None)
-
-
-async def broadcast_directive_update(directive):
-    """
-    Broadcast directive updates to all connected clients.
-    """
-    print(f"📡 Broadcasting Directive Update: {directive['id']}, Status: {directive['status']}")
-    disconnected_clients = []
-    for agent_id, connection in active_connections.items():
-        try:
-            await connection.send_json({
-                "type": "directive_update",
-                "directive": directive
-            })
-        except Exception as e:
-            print(f"❌ Failed to send directive to {agent_id}: {e}")
-            disconnected_clients.append(agent_id)
-
-
-# Function to broadcast logs to all connected clients
-async def broadcast_log(message: str):
-    for client in connected_clients:
-        try:
-            await client.send_text(message)
-        except Exception as e:
-            print(f"❌ Failed to send log: {e}")
-            connected_clients.remove(client)
-
-# Example: Simulating log messages every few seconds
-async def generate_logs():
-    counter = 1
-    while True:
-        log_message = f"📝 Log Entry {counter}: Simulated log message."
-        await broadcast_log(log_message)
-        print(log_message)  # Print to the server console
-        counter += 1
-        await asyncio.sleep(15)  # Broadcast every 5 seconds
-
-# Start the log generation
+        log.info("dashboard_disconnected", f"🔌 Directive WebSocket disconnected: {dashboard_id}", client=dashboard_id)
+    finally:
+        # Runs on malformed messages and other errors too, so no dead channel is left behind
+        connections.unregister(dashboard_id, websocket)
+
+
 @app.on_event("startup")
 async def startup_event():
-    asyncio.create_task(generate_logs())
+    asyncio.create_task(directive_deadlines.run())
+    asyncio.create_task(heartbeat_monitor.run())
+    if worker_router is not None:
+        await worker_router.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Flush outstanding directive log records before the process exits
+    directive_engine.store.close()
+    if worker_router is not None:
+        await worker_router.stop()
+    flush_logging()
 
 
 @app.get("/tests")
 def test_route():
     return {"message": "✅ API is working!"}
 
-@app.get("/cleanup_connections")
+@app.post("/cleanup_connections", dependencies=[Depends(require_token)])
 async def cleanup_connections():
-    active_connections.clear()
-    print("🧹 Cleared all active agent connections.")
+    connections.clear(AGENT)
+    log.info("connections_cleared", "🧹 Cleared all active agent connections.")
     return {"status": "success", "message": "🧹 Cleared all active agent connections."}
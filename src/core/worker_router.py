@@ -0,0 +1,306 @@
+import asyncio
+import itertools
+import json
+import os
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set
+
+from core.broadcast_hub import BroadcastHub
+from core.frames import Frame, dumps
+from core.logging_config import get_logger
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - depends on the environment
+    loads = json.loads
+
+# ----------------------------
+# Routing Configuration
+# ----------------------------
+DEFAULT_RPC_TIMEOUT = 5.0       # Seconds to wait for the owning worker to answer
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+# Unsent bytes buffered for one peer. Above RELAY_BUFFER_LIMIT relayed broadcasts are
+# dropped, like the hub's slow-consumer policy; above PEER_BUFFER_LIMIT the peer is
+# treated as stalled and disconnected.
+RELAY_BUFFER_LIMIT = 4 * 1024 * 1024
+PEER_BUFFER_LIMIT = 32 * 1024 * 1024
+SOCKET_PREFIX = "worker-"
+SOCKET_SUFFIX = ".sock"
+
+log = get_logger("worker_router")
+
+
+class WorkerRPCError(Exception):
+    """
+    Raised on the forwarding worker when the owning worker's handler failed.
+    """
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class WorkerRouter:
+    """
+    Routes directives and broadcasts between uvicorn worker processes on one host.
+
+    Every worker listens on a Unix domain socket in a shared directory and keeps one
+    connection to each peer. Workers announce the agents whose sockets they hold, so
+    each keeps a full agent -> worker ownership map. An API request for an agent held
+    by another worker is forwarded to that worker as an RPC and handled there, next to
+    the agent's socket and directive state. Messages published on an attached hub are
+    relayed to peers and published to their local clients as well.
+
+    Wire format: one JSON object per line.
+        {"op": "hello", "worker": id, "agents": [...]}   first message on every connection
+        {"op": "own" | "disown", "agents": [...]}
+        {"op": "call", "id": n, "method": name, "params": {...}}
+        {"op": "reply", "id": n, "result": {...}} or {"op": "reply", "id": n, "error": {...}}
+        {"op": "publish", "hub": name, "topics": [...] or null, "message": {...}}
+    """
+    def __init__(self, directory: str, hubs: Optional[Dict[str, BroadcastHub]] = None,
+                 worker_id: Optional[str] = None, rpc_timeout: float = DEFAULT_RPC_TIMEOUT):
+        self.directory = directory
+        self.worker_id = worker_id or str(os.getpid())
+        self.path = os.path.join(directory, f"{SOCKET_PREFIX}{self.worker_id}{SOCKET_SUFFIX}")
+        self.hubs = hubs or {}
+        self.rpc_timeout = rpc_timeout
+        self.handlers: Dict[str, Callable[[dict], Awaitable[dict]]] = {}
+        self.local: Set[str] = set()             # Agents whose sockets this worker holds
+        self.owners: Dict[str, str] = {}         # agent_id -> peer worker_id
+        self.peers: Dict[str, asyncio.StreamWriter] = {}
+        self._calls: Dict[int, asyncio.Future] = {}
+        self._call_ids = itertools.count()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.relay_dropped = 0  # Broadcasts not relayed because a peer was too far behind
+
+    def handle(self, method: str, handler: Callable[[dict], Awaitable[dict]]):
+        """
+        Serve `method` for peers. The handler receives the call's params and returns a
+        JSON-serializable result; raise WorkerRPCError to return an error status.
+        """
+        self.handlers[method] = handler
+
+    async def start(self):
+        """
+        Listen for peers, connect to the workers already running and start relaying hubs.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._accept, path=self.path, limit=MAX_MESSAGE_SIZE)
+        for name in sorted(os.listdir(self.directory)):
+            if not (name.startswith(SOCKET_PREFIX) and name.endswith(SOCKET_SUFFIX)):
+                continue
+            peer_id = name[len(SOCKET_PREFIX):-len(SOCKET_SUFFIX)]
+            if peer_id != self.worker_id:
+                await self._connect(peer_id, os.path.join(self.directory, name))
+        for name, hub in self.hubs.items():
+            hub.relay = lambda frame, topics, name=name: self._relay(name, frame, topics)
+        log.info("worker_started", f"🔀 Worker '{self.worker_id}' routing with {len(self.peers)} peer(s).",
+                 worker=self.worker_id, peers=len(self.peers))
+
+    async def stop(self):
+        for hub in self.hubs.values():
+            hub.relay = None
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for writer in list(self.peers.values()):
+            writer.close()
+        self.peers.clear()
+        self.owners.clear()
+        for task in list(self._tasks):
+            task.cancel()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    # ----------------------------
+    # Ownership
+    # ----------------------------
+    def claim(self, agent_id: str):
+        """
+        Announce that this worker now holds the agent's socket.
+        """
+        self.local.add(agent_id)
+        self.owners.pop(agent_id, None)
+        self._broadcast({"op": "own", "agents": [agent_id]})
+
+    def release(self, agent_id: str):
+        if agent_id in self.local:
+            self.local.discard(agent_id)
+            self._broadcast({"op": "disown", "agents": [agent_id]})
+
+    def owner(self, agent_id: str) -> Optional[str]:
+        """
+        The peer worker holding the agent's socket, or None if it is local or unknown.
+        """
+        return self.owners.get(agent_id)
+
+    # ----------------------------
+    # RPC
+    # ----------------------------
+    async def call(self, worker_id: str, method: str, params: dict) -> dict:
+        """
+        Run `method` on a peer worker and return its result.
+
+        :raises WorkerRPCError: If the peer is gone, times out or its handler failed.
+        """
+        writer = self.peers.get(worker_id)
+        if writer is None:
+            raise WorkerRPCError(503, f"❌ Worker '{worker_id}' is not reachable.")
+        call_id = next(self._call_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._calls[call_id] = future
+        try:
+            self._send(worker_id, writer, {"op": "call", "id": call_id, "method": method, "params": params})
+            return await asyncio.wait_for(future, self.rpc_timeout)
+        except asyncio.TimeoutError:
+            raise WorkerRPCError(504, f"❌ Worker '{worker_id}' did not answer '{method}' in time.")
+        finally:
+            self._calls.pop(call_id, None)
+
+    async def _serve_call(self, worker_id: str, writer: asyncio.StreamWriter, message: dict):
+        reply = {"op": "reply", "id": message["id"]}
+        handler = self.handlers.get(message.get("method"))
+        try:
+            if handler is None:
+                raise WorkerRPCError(404, f"❌ Unknown worker method '{message.get('method')}'.")
+            reply["result"] = await handler(message.get("params") or {})
+        except WorkerRPCError as e:
+            reply["error"] = {"status_code": e.status_code, "detail": e.detail}
+        except Exception as e:
+            log.error("worker_call_failed", f"❌ Worker call '{message.get('method')}' failed: {e}",
+                      method=message.get("method"))
+            reply["error"] = {"status_code": 500, "detail": str(e)}
+        self._send(worker_id, writer, reply)
+
+    # ----------------------------
+    # Broadcast relay
+    # ----------------------------
+    def _relay(self, hub: str, frame: Frame, topics: Optional[Iterable[str]]):
+        if not self.peers:
+            return
+        header = dumps({"op": "publish", "hub": hub, "topics": list(topics) if topics is not None else None})
+        # Splice the already-encoded frame in rather than encoding the message again
+        line = header[:-1] + b',"message":' + frame.data + b"}\n"
+        for worker_id, writer in list(self.peers.items()):
+            self._write(worker_id, writer, line, droppable=True)
+
+    # ----------------------------
+    # Connections
+    # ----------------------------
+    async def _connect(self, peer_id: str, path: str):
+        try:
+            reader, writer = await asyncio.open_unix_connection(path, limit=MAX_MESSAGE_SIZE)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Left behind by a worker that exited without cleaning up
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return
+        self._send(peer_id, writer, {"op": "hello", "worker": self.worker_id, "agents": sorted(self.local)})
+        self.peers[peer_id] = writer
+        self._spawn(self._read(reader, writer, peer_id))
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            await self._read(reader, writer, None)
+        finally:
+            self._tasks.discard(task)
+
+    async def _read(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, worker_id: Optional[str]):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = loads(line)
+                op = message.get("op")
+                if op == "hello":
+                    worker_id = message["worker"]
+                    self.peers[worker_id] = writer
+                    self._own(worker_id, message.get("agents", ()))
+                    self._send(worker_id, writer, {"op": "own", "agents": sorted(self.local)})
+                    log.info("worker_joined", f"🔀 Worker '{worker_id}' joined.", worker=worker_id)
+                elif worker_id is None:
+                    continue  # Nothing is accepted before a hello
+                elif op == "own":
+                    self._own(worker_id, message.get("agents", ()))
+                elif op == "disown":
+                    for agent_id in message.get("agents", ()):
+                        if self.owners.get(agent_id) == worker_id:
+                            del self.owners[agent_id]
+                elif op == "call":
+                    self._spawn(self._serve_call(worker_id, writer, message))
+                elif op == "reply":
+                    future = self._calls.get(message.get("id"))
+                    if future is not None and not future.done():
+                        error = message.get("error")
+                        if error is not None:
+                            future.set_exception(WorkerRPCError(error["status_code"], error["detail"]))
+                        else:
+                            future.set_result(message.get("result"))
+                elif op == "publish":
+                    hub = self.hubs.get(message.get("hub"))
+                    if hub is not None and hub.ingest is not None:
+                        hub.ingest(message["message"], message.get("topics"))
+                    elif hub is not None:
+                        hub.publish(message["message"], message.get("topics"), relay=False)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            log.warning("worker_connection_failed", f"⚠️ Worker connection '{worker_id}' failed: {e}", worker=worker_id)
+        finally:
+            if worker_id is not None and self.peers.get(worker_id) is writer:
+                self._drop_peer(worker_id)
+            writer.close()
+
+    def _own(self, worker_id: str, agents: Iterable[str]):
+        for agent_id in agents:
+            if agent_id not in self.local:
+                self.owners[agent_id] = worker_id
+
+    def _drop_peer(self, worker_id: str):
+        del self.peers[worker_id]
+        for agent_id in [a for a, owner in self.owners.items() if owner == worker_id]:
+            del self.owners[agent_id]
+        log.info("worker_left", f"🔌 Worker '{worker_id}' left.", worker=worker_id)
+
+    def _broadcast(self, message: dict):
+        line = dumps(message) + b"\n"
+        for worker_id, writer in list(self.peers.items()):
+            self._write(worker_id, writer, line)
+
+    def _send(self, worker_id: str, writer: asyncio.StreamWriter, message: dict):
+        self._write(worker_id, writer, dumps(message) + b"\n")
+
+    def _write(self, worker_id: str, writer: asyncio.StreamWriter, line: bytes, droppable: bool = False):
+        """
+        Buffer a line for a peer without waiting for it to be sent. A peer that stops
+        reading can't grow the buffer without bound: relayed broadcasts (`droppable`)
+        are dropped past RELAY_BUFFER_LIMIT, and past PEER_BUFFER_LIMIT the connection
+        is closed, which drops the peer once its read loop ends.
+        """
+        if writer.is_closing():
+            return
+        buffered = writer.transport.get_write_buffer_size()
+        if droppable and buffered >= RELAY_BUFFER_LIMIT:
+            self.relay_dropped += 1
+            return
+        if buffered >= PEER_BUFFER_LIMIT:
+            log.error("worker_peer_stalled", f"❌ Worker '{worker_id}' stopped reading ({buffered} bytes unsent); disconnecting.",
+                      worker=worker_id, buffered=buffered)
+            writer.close()
+            return
+        try:
+            writer.write(line)
+        except (ConnectionError, RuntimeError) as e:
+            log.warning("worker_write_failed", f"⚠️ Failed to write to Worker '{worker_id}': {e}", worker=worker_id)
+
+    def _spawn(self, coroutine: Awaitable):
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -58,9 +58,42 @@ def test_agent_status_update():
     assert agent['status'] == 'inactive'
     print("✅ Agent Status Update Test Passed")
 
+def test_malformed_metadata_rejected():
+    manager = AgentManager()
+    for metadata in ({'agent_id': 'a', 'token_stake': 'lots'}, {'agent_id': 'a', 'token_stake': True},
+                     {'agent_id': 'a', 'token_stake': 12000, 'type': ['sub-agent']},
+                     {'agent_id': 'a', 'token_stake': 12000, 'capabilities': [1, 2]}, ['not', 'a', 'dict']):
+        try:
+            manager.upsert_agent(metadata)
+            assert False, f"{metadata} should be rejected"
+        except ValueError:
+            pass
+    assert manager.agents == {}
+    manager.upsert_agent({'agent_id': 'a', 'token_stake': '12000'})
+    assert manager.get_agent('a')['token_stake'] == 12000
+    print("✅ Malformed Metadata Test Passed")
+
+def test_agent_socket_rejects_bad_register_and_cleans_up():
+    from fastapi.testclient import TestClient
+    from core.websocket_server import agent_hub, app
+
+    with TestClient(app).websocket_connect("/ws/agent/agent-bad-metadata") as websocket:
+        websocket.send_json({"action": "register", "metadata": {"stake": "abc"}})
+        assert websocket.receive_json()["status"] == "error"
+        websocket.send_json({"action": "register", "metadata": {"stake": 20000, "type": ["compute"]}})
+        assert websocket.receive_json()["status"] == "error"
+        websocket.send_json({"action": "register", "metadata": {"stake": 20000}, "encoding": {"codecs": [{}]}})
+        assert websocket.receive_json()["status"] == "error"
+        websocket.send_json({"action": "register", "metadata": {"stake": 20000, "type": "compute"}})
+        assert websocket.receive_json()["status"] == "success"
+    assert "agent-bad-metadata" not in agent_hub
+    print("✅ Agent Register Validation Test Passed")
+
 if __name__ == "__main__":
     test_agent_registration()
     test_agent_duplicate_registration()
     test_agent_retrieval()
     test_agent_status_update()
+    test_malformed_metadata_rejected()
+    test_agent_socket_rejects_bad_register_and_cleans_up()
     print("🎯 All Tests Passed Successfully!")
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.broadcast_hub import BroadcastHub, DROP_NEWEST, DROP_OLDEST, DISCONNECT, REPLACED_CLOSE_CODE
+from core.subscriptions import agent_topic, status_topic, validate_topic
+
+
+async def drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class FakeWebSocket:
+    def __init__(self, stall: bool = False):
+        self.sent = []
+        self.stall = stall
+        self.closed = False
+        self.close_code = None
+
+    async def send_text(self, text):
+        if self.stall:
+            await asyncio.sleep(3600)
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed = True
+        self.close_code = code
+
+
+def test_broadcast_reaches_all_clients():
+    async def scenario():
+        hub = BroadcastHub()
+        sockets = [FakeWebSocket() for _ in range(3)]
+        for i, ws in enumerate(sockets):
+            hub.register(f"client-{i}", ws)
+        assert hub.publish({"type": "directive_update"}) == 3
+        await drain()
+        assert all(ws.sent == [{"type": "directive_update"}] for ws in sockets)
+        hub.clear()
+
+    asyncio.run(scenario())
+    print("✅ Broadcast Fan-Out Test Passed")
+
+
+def test_slow_client_does_not_block_others():
+    async def scenario():
+        hub = BroadcastHub(max_queue=2, policy=DROP_OLDEST)
+        slow, fast = FakeWebSocket(stall=True), FakeWebSocket()
+        hub.register("slow", slow)
+        hub.register("fast", fast)
+        for i in range(5):
+            hub.publish({"seq": i})
+            await drain()
+        assert [m["seq"] for m in fast.sent] == [0, 1, 2, 3, 4]
+        # The slow writer holds seq 0; only the newest two remain queued
+        assert [json.loads(f.text)["seq"] for f in hub.get("slow").queue._queue] == [3, 4]
+        hub.clear()
+
+    asyncio.run(scenario())
+    print("✅ Slow Consumer Isolation Test Passed")
+
+
+def test_drop_newest_policy():
+    async def scenario():
+        hub = BroadcastHub(max_queue=1, policy=DROP_NEWEST)
+        hub.register("slow", FakeWebSocket(stall=True))
+        hub.publish({"seq": 0})
+        await drain()
+        hub.publish({"seq": 1})
+        assert hub.publish({"seq": 2}) == 0
+        assert hub.get("slow").dropped == 1
+        hub.clear()
+
+    asyncio.run(scenario())
+    print("✅ Drop Newest Policy Test Passed")
+
+
+def test_disconnect_policy_evicts_slow_client():
+    async def scenario():
+        hub = BroadcastHub(max_queue=1, policy=DISCONNECT)
+        slow = FakeWebSocket(stall=True)
+        hub.register("slow", slow)
+        hub.publish({"seq": 0})
+        await drain()
+        hub.publish({"seq": 1})
+        hub.publish({"seq": 2})
+        await drain()
+        assert "slow" not in hub
+        assert slow.closed
+
+    asyncio.run(scenario())
+    print("✅ Disconnect Policy Test Passed")
+
+
+def test_publish_encodes_once():
+    async def scenario():
+        hub = BroadcastHub()
+        for i in range(3):
+            hub.register(f"client-{i}", FakeWebSocket())
+        hub.publish({"type": "directive_update"})
+        frames = [channel.queue._queue[0] for channel in hub.channels.values()]
+        assert all(frame is frames[0] for frame in frames)
+        hub.clear()
+
+    asyncio.run(scenario())
+    print("✅ Serialize-Once Test Passed")
+
+
+def test_topic_publish_only_reaches_subscribers():
+    async def scenario():
+        hub = BroadcastHub()
+        agent_1, agent_2, dashboard = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        hub.register("agent-1", agent_1, topics=(agent_topic("agent-1"),))
+        hub.register("agent-2", agent_2, topics=(agent_topic("agent-2"),))
+        hub.register("dashboard", dashboard)
+        assert hub.publish({"seq": 0}, topics=(agent_topic("agent-1"), status_topic("completed"))) == 2
+        await drain()
+        assert agent_1.sent == [{"seq": 0}] and agent_2.sent == []
+        assert dashboard.sent == [{"seq": 0}]
+
+        # The first explicit subscription replaces the dashboard's implicit wildcard
+        assert hub.subscribe("dashboard", [status_topic("failed")]) == {status_topic("failed")}
+        hub.publish({"seq": 1}, topics=(agent_topic("agent-2"), status_topic("completed")))
+        hub.publish({"seq": 2}, topics=(agent_topic("agent-2"), status_topic("failed")))
+        await drain()
+        assert dashboard.sent == [{"seq": 0}, {"seq": 2}]
+        assert agent_2.sent == [{"seq": 1}, {"seq": 2}]
+
+        hub.unregister("agent-2")
+        assert agent_topic("agent-2") not in hub.subscriptions.subscribers
+        hub.clear()
+
+    asyncio.run(scenario())
+    print("✅ Topic Subscription Test Passed")
+
+
+def test_unsubscribe_ends_implicit_wildcard():
+    async def scenario():
+        hub = BroadcastHub()
+        dashboard = FakeWebSocket()
+        hub.register("dashboard", dashboard)
+        assert hub.unsubscribe("dashboard", [status_topic("failed")]) == set()
+        assert hub.publish({"seq": 0}, topics=(status_topic("completed"),)) == 0
+        await drain()
+        assert dashboard.sent == []
+        hub.clear()
+
+    asyncio.run(scenario())
+    print("✅ Unsubscribe Wildcard Test Passed")
+
+
+def test_invalid_topic_rejected():
+    assert validate_topic("level:error") == "level:error"
+    for topic in ("bogus:1", "agent:", "level"):
+        try:
+            validate_topic(topic)
+            assert False, f"{topic} should be rejected"
+        except ValueError:
+            pass
+    print("✅ Topic Validation Test Passed")
+
+
+def test_batching_coalesces_burst():
+    async def scenario():
+        hub = BroadcastHub()
+        agent = FakeWebSocket()
+        channel = hub.register("agent-1", agent, topics=(agent_topic("agent-1"),))
+        channel.configure_batching(window=0.01, max_messages=3)
+        for i in range(4):
+            channel.enqueue({"seq": i})
+        await asyncio.sleep(0.05)
+        assert agent.sent == [
+            {"action": "batch", "messages": [{"seq": 0}, {"seq": 1}, {"seq": 2}]},
+            {"seq": 3}
+        ]
+        hub.clear()
+
+    asyncio.run(scenario())
+    print("✅ Micro-Batching Test Passed")
+
+
+def test_stale_unregister_keeps_newer_connection():
+    async def scenario():
+        hub = BroadcastHub()
+        old, new = FakeWebSocket(), FakeWebSocket()
+        hub.register("agent-1", old)
+        hub.register("agent-1", new)
+        hub.unregister("agent-1", old)
+        assert hub.get("agent-1").websocket is new
+        hub.clear()
+
+    asyncio.run(scenario())
+    print("✅ Stale Unregister Test Passed")
+
+
+def test_replaced_connection_is_closed():
+    async def scenario():
+        hub = BroadcastHub()
+        old, new = FakeWebSocket(), FakeWebSocket()
+        hub.register("agent-1", old)
+        hub.register("agent-1", new)
+        await asyncio.sleep(0)
+        assert old.closed and old.close_code == REPLACED_CLOSE_CODE
+        assert not new.closed
+
+        # Re-registering the same socket leaves it open
+        hub.register("agent-1", new)
+        await asyncio.sleep(0)
+        assert not new.closed
+        hub.clear()
+
+    asyncio.run(scenario())
+    print("✅ Replaced Connection Close Test Passed")
+
+
+if __name__ == "__main__":
+    test_broadcast_reaches_all_clients()
+    test_slow_client_does_not_block_others()
+    test_drop_newest_policy()
+    test_disconnect_policy_evicts_slow_client()
+    test_publish_encodes_once()
+    test_topic_publish_only_reaches_subscribers()
+    test_unsubscribe_ends_implicit_wildcard()
+    test_invalid_topic_rejected()
+    test_batching_coalesces_burst()
+    test_stale_unregister_keeps_newer_connection()
+    test_replaced_connection_is_closed()
+    print("🎯 All Tests Passed Successfully!")
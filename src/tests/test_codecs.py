@@ -0,0 +1,102 @@
+import sys
+import os
+import zlib
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.codecs import CODECS, FLAG_RAW, FLAG_ZLIB, JSON_WIRE, MIN_COMPRESS_BYTES, Codec, WireFormat, negotiate
+from core.frames import encode_batch, encode_frame
+
+
+def test_negotiation_defaults_to_json():
+    assert negotiate(None) is JSON_WIRE
+    assert negotiate({"codecs": ["does-not-exist"]}) is JSON_WIRE
+    wire = negotiate({"codecs": ["does-not-exist", "json"], "compress_min_bytes": 1})
+    assert wire.describe() == {"codec": "json", "compress_min_bytes": MIN_COMPRESS_BYTES}
+    assert wire.binary
+    for bad in ({"compress_min_bytes": "lots"}, {"codecs": [{}]}, {"codecs": [[1]]}, {"codecs": 5}, ["msgpack"]):
+        try:
+            negotiate(bad)
+            assert False, "Malformed options must be rejected"
+        except ValueError:
+            pass
+    print("✅ Codec Negotiation Test Passed")
+
+
+def test_compression_flags_and_round_trip():
+    wire = negotiate({"compress_min_bytes": MIN_COMPRESS_BYTES})
+    small = {"action": "ping"}
+    large = {"action": "directive", "directive": {"payload": "x" * 4096}}
+
+    packed_small, packed_large = wire.encode(small), wire.encode(large)
+    assert packed_small[0] == FLAG_RAW and packed_large[0] == FLAG_ZLIB
+    assert len(packed_large) < 4096
+    assert wire.decode(packed_small) == small and wire.decode(packed_large) == large
+    assert wire.decode('{"action": "pong"}') == {"action": "pong"}  # Text frames are always JSON
+
+    for bad in (b"", bytes((7,)) + b"{}", bytes((FLAG_ZLIB,)) + b"not zlib"):
+        try:
+            wire.decode(bad)
+            assert False, "Invalid frames must be rejected"
+        except ValueError:
+            pass
+    print("✅ Compression Round Trip Test Passed")
+
+
+def test_frame_encodings_are_cached_per_format():
+    frame = encode_frame({"type": "directive_update", "directive": {"id": "d1", "status": "completed"}})
+    assert JSON_WIRE.encode_frame(frame) == frame.text
+    wire = negotiate({"compress_min_bytes": MIN_COMPRESS_BYTES})
+    first = wire.encode_frame(frame)
+    assert wire.encode_frame(frame) is first
+    assert zlib.decompress(first[1:]) == frame.data if first[0] == FLAG_ZLIB else first[1:] == frame.data
+    print("✅ Frame Encoding Cache Test Passed")
+
+
+def test_binary_frames_encode_the_source_message():
+    encoded = []
+
+    def encode(message):
+        encoded.append(message)
+        return repr(message).encode("utf-8")
+
+    wire = WireFormat(Codec("recording", True, encode, None))
+    message = {"action": "directive", "directive_id": "d1", "directive": {"task": "optimize_cpu"}}
+    frame = encode_frame(message)
+    wire.encode_frame(frame)
+    assert encoded[0] is message  # No JSON round trip
+
+    batch = encode_batch([frame, encode_frame({"action": "ping"})])
+    wire.encode_frame(batch)
+    assert encoded[1] == {"action": "batch", "messages": [message, {"action": "ping"}]}
+    print("✅ Binary Frame Source Test Passed")
+
+
+def check_binary_codec(name):
+    wire = negotiate({"codecs": [name, "json"], "compress_min_bytes": MIN_COMPRESS_BYTES})
+    assert wire.codec.name == name and wire.binary
+    message = {"action": "directive", "directive_id": "d1", "directive": {"task": "optimize_cpu", "args": [1, 2.5]}}
+    assert wire.decode(wire.encode(message)) == message
+    assert wire.decode(wire.encode_frame(encode_frame(message))) == message
+    batch = encode_batch([encode_frame(message), encode_frame({"action": "ping"})])
+    assert wire.decode(wire.encode_frame(batch)) == {"action": "batch", "messages": [message, {"action": "ping"}]}
+
+
+def test_msgpack_wire():
+    check_binary_codec("msgpack")
+    print("✅ Msgpack Codec Test Passed")
+
+
+def test_cbor_wire():
+    check_binary_codec("cbor")
+    print("✅ CBOR Codec Test Passed")
+
+
+if __name__ == "__main__":
+    test_negotiation_defaults_to_json()
+    test_compression_flags_and_round_trip()
+    test_frame_encodings_are_cached_per_format()
+    test_binary_frames_encode_the_source_message()
+    test_msgpack_wire()
+    test_cbor_wire()
+    print("🎯 All Tests Passed Successfully!")
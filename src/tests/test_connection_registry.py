@@ -0,0 +1,93 @@
+import asyncio
+import json
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.broadcast_hub import BroadcastHub
+from core.connection_registry import AGENT, DASHBOARD, LOG_VIEWER, ConnectionRegistry
+from core.subscriptions import agent_topic
+
+
+async def drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        pass
+
+
+def build_registry():
+    return ConnectionRegistry({AGENT: BroadcastHub(), DASHBOARD: BroadcastHub(), LOG_VIEWER: BroadcastHub()})
+
+
+def test_dashboards_get_unique_ids():
+    async def scenario():
+        registry = build_registry()
+        first, second = FakeWebSocket(), FakeWebSocket()
+        ids = {registry.register(DASHBOARD, first).key, registry.register(DASHBOARD, second).key}
+        assert len(ids) == 2 and registry.count(DASHBOARD) == 2
+        assert registry.publish(DASHBOARD, {"type": "directive_update"}) == 2
+        await drain()
+        assert first.sent == second.sent == [{"type": "directive_update"}]
+        registry.clear()
+
+    asyncio.run(scenario())
+    print("✅ Multiple Dashboards Test Passed")
+
+
+def test_broadcasts_stay_within_role():
+    async def scenario():
+        registry = build_registry()
+        agent, dashboard = FakeWebSocket(), FakeWebSocket()
+        registry.register(AGENT, agent, "agent-001", topics=(agent_topic("agent-001"),))
+        dashboard_id = registry.register(DASHBOARD, dashboard).key
+        registry.publish(DASHBOARD, {"type": "directive_update"})
+        await drain()
+        assert agent.sent == [] and dashboard.sent == [{"type": "directive_update"}]
+
+        assert registry.get("agent-001", AGENT) is not None
+        assert registry.get("agent-001", DASHBOARD) is None
+        assert registry.role_of(dashboard_id) == DASHBOARD
+        assert list(registry.ids(AGENT)) == ["agent-001"]
+        assert registry.counts() == {AGENT: 1, DASHBOARD: 1, LOG_VIEWER: 0}
+        registry.clear()
+
+    asyncio.run(scenario())
+    print("✅ Role-Scoped Broadcast Test Passed")
+
+
+def test_reconnect_and_id_conflicts():
+    async def scenario():
+        registry = build_registry()
+        old, new = FakeWebSocket(), FakeWebSocket()
+        registry.register(AGENT, old, "agent-001")
+        registry.register(AGENT, new, "agent-001")
+        registry.unregister("agent-001", old)  # Stale disconnect keeps the reconnect
+        assert registry.get("agent-001").websocket is new
+        try:
+            registry.register(DASHBOARD, FakeWebSocket(), "agent-001")
+            assert False, "An agent's id must not be taken over by another role"
+        except ValueError:
+            pass
+        registry.unregister("agent-001", new)
+        assert "agent-001" not in registry and registry.roles == {}
+
+    asyncio.run(scenario())
+    print("✅ Reconnect Test Passed")
+
+
+if __name__ == "__main__":
+    test_dashboards_get_unique_ids()
+    test_broadcasts_stay_within_role()
+    test_reconnect_and_id_conflicts()
+    print("🎯 All Tests Passed Successfully!")
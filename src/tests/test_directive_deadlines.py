@@ -0,0 +1,113 @@
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.directive_deadlines import DirectiveDeadlines
+from core.frames import encode_frame
+from core.timing_wheel import TimingWheel
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_timing_wheel_fires_in_order():
+    wheel = TimingWheel(tick=1.0, slots=4, levels=2)
+    wheel.schedule("soon", 2.0)
+    wheel.schedule("later", 9.0)
+    wheel.schedule("far", 40.0)  # Beyond both levels; parked and cascaded down
+    wheel.schedule("cancelled", 3.0)
+    assert wheel.cancel("cancelled")
+
+    assert wheel.advance(1.5) == []
+    assert wheel.advance(2.0) == ["soon"]
+    assert wheel.advance(8.9) == []
+    assert wheel.advance(9.0) == ["later"]
+    assert wheel.advance(39.0) == []
+    assert wheel.advance(45.0) == ["far"]
+    assert len(wheel) == 0
+    print("✅ Timing Wheel Test Passed")
+
+
+def test_unacknowledged_directive_is_retried_then_expired():
+    clock = FakeClock()
+    resent, expired = [], []
+    deadlines = DirectiveDeadlines(
+        resend=lambda agent_id, frame: resent.append(agent_id) or True,
+        expire=lambda directive_id, reason: expired.append((directive_id, reason)),
+        ack_timeout=5.0, max_retries=2, tick=0.5, clock=clock
+    )
+    deadlines.track("d-1", "agent-1", encode_frame({"action": "directive"}))
+
+    for _ in range(3):
+        clock.now += 5.0
+        deadlines.tick()
+    assert resent == ["agent-1", "agent-1"]
+    assert expired == [("d-1", "ack timeout")]
+    assert len(deadlines) == 0
+    print("✅ Ack Retry/Expiry Test Passed")
+
+
+def test_acknowledged_directive_waits_for_completion():
+    clock = FakeClock()
+    expired = []
+    deadlines = DirectiveDeadlines(
+        resend=lambda agent_id, frame: True,
+        expire=lambda directive_id, reason: expired.append((directive_id, reason)),
+        ack_timeout=5.0, completion_timeout=60.0, tick=0.5, clock=clock
+    )
+    deadlines.track("d-1", "agent-1", encode_frame({"action": "directive"}))
+    deadlines.track("d-2", "agent-1", encode_frame({"action": "directive"}))
+    deadlines.on_status("d-1", "acknowledged")
+    deadlines.on_status("d-2", "acknowledged")
+    deadlines.on_status("d-2", "completed")
+    deadlines.track("d-3", "agent-1", encode_frame({"action": "directive"}))
+    deadlines.on_status("d-3", "expired")  # Reported by the agent: final, no deadline left
+    assert "d-3" not in deadlines.pending
+
+    clock.now = 30.0
+    deadlines.tick()
+    assert expired == []
+    clock.now = 61.0
+    deadlines.tick()
+    assert expired == [("d-1", "completion timeout")]
+    print("✅ Completion Deadline Test Passed")
+
+
+def test_agent_reported_expiry_frees_the_slot():
+    import time
+    from fastapi.testclient import TestClient
+    from core.websocket_server import app, directive_deadlines, directive_scheduler
+
+    client = TestClient(app)
+    with client.websocket_connect("/ws/agent/agent-expiring") as websocket:
+        websocket.send_json({"action": "register", "metadata": {"stake": 20000, "type": "compute"}})
+        assert websocket.receive_json()["status"] == "success"
+        assert client.post("/api/send_directive/agent-expiring", json={"task": "scan"}).json()["status"] == "success"
+        message = websocket.receive_json()
+        while message.get("action") != "directive":
+            message = websocket.receive_json()
+        directive_id = message["directive_id"]
+        assert directive_id in directive_scheduler.in_flight
+
+        websocket.send_json({"action": "directive_response", "directive_id": directive_id, "status": "expired"})
+        for _ in range(100):
+            if directive_id not in directive_scheduler.in_flight:
+                break
+            time.sleep(0.01)
+        assert directive_id not in directive_scheduler.in_flight
+        assert directive_id not in directive_deadlines.pending
+    print("✅ Agent-Reported Expiry Test Passed")
+
+
+if __name__ == "__main__":
+    test_timing_wheel_fires_in_order()
+    test_unacknowledged_directive_is_retried_then_expired()
+    test_acknowledged_directive_waits_for_completion()
+    test_agent_reported_expiry_frees_the_slot()
+    print("🎯 All Tests Passed Successfully!")
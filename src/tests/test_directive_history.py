@@ -0,0 +1,164 @@
+import asyncio
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.directive_engine import DirectiveEngine
+from core.directive_history import DirectiveHistory, can_transition
+from core.records import DirectiveStatus
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_transition_table():
+    assert can_transition(DirectiveStatus.PENDING, DirectiveStatus.SENT)
+    assert can_transition(DirectiveStatus.SENT, DirectiveStatus.ACKNOWLEDGED)
+    assert can_transition(DirectiveStatus.PENDING, DirectiveStatus.COMPLETED)
+    assert can_transition(DirectiveStatus.COMPLETED, DirectiveStatus.PENDING)
+    assert can_transition(DirectiveStatus.IN_PROGRESS, DirectiveStatus.IN_PROGRESS)
+    assert not can_transition(DirectiveStatus.COMPLETED, DirectiveStatus.IN_PROGRESS)
+    assert not can_transition(DirectiveStatus.IN_PROGRESS, DirectiveStatus.ACKNOWLEDGED)
+    assert not can_transition(DirectiveStatus.ACKNOWLEDGED, DirectiveStatus.SENT)
+    print("✅ Transition Table Test Passed")
+
+
+def test_history_records_valid_transitions_only():
+    history = DirectiveHistory(clock=FakeClock())
+    history.start(0)
+    assert history.transition(0, DirectiveStatus.ACKNOWLEDGED)
+    assert history.transition(0, DirectiveStatus.ACKNOWLEDGED)  # Repeat: accepted, not recorded
+    assert history.transition(0, DirectiveStatus.COMPLETED)
+    assert not history.transition(0, DirectiveStatus.IN_PROGRESS)
+    assert history.current(0) == DirectiveStatus.COMPLETED
+    assert [code for code, _ in history.events(0)] == [DirectiveStatus.PENDING, DirectiveStatus.ACKNOWLEDGED,
+                                                       DirectiveStatus.COMPLETED]
+    print("✅ History Transitions Test Passed")
+
+
+def test_history_chains_interleaved_directives():
+    history = DirectiveHistory(clock=FakeClock())
+    history.start(0)
+    history.start(1)
+    history.transition(1, DirectiveStatus.SENT)
+    history.transition(0, DirectiveStatus.FAILED)
+    history.transition(1, DirectiveStatus.COMPLETED)
+    assert [code for code, _ in history.events(0)] == [DirectiveStatus.PENDING, DirectiveStatus.FAILED]
+    assert [code for code, _ in history.events(1)] == [DirectiveStatus.PENDING, DirectiveStatus.SENT,
+                                                       DirectiveStatus.COMPLETED]
+    assert len(history) == 5
+    try:
+        history.start(5)
+        assert False, "out-of-order seq accepted"
+    except ValueError:
+        pass
+    print("✅ History Chains Test Passed")
+
+
+def test_history_stages():
+    clock = FakeClock()
+    history = DirectiveHistory(clock=clock)
+    history.start(0)
+    clock.now += 2
+    history.transition(0, DirectiveStatus.SENT)
+    clock.now += 1
+    history.transition(0, DirectiveStatus.ACKNOWLEDGED)
+    clock.now += 0.5
+    history.transition(0, DirectiveStatus.IN_PROGRESS)
+    clock.now += 4
+    history.transition(0, DirectiveStatus.COMPLETED)
+    assert history.stages(0) == {"queued": 2.0, "ack": 1.0, "run": 4.5, "total": 7.5}
+
+    clock.now += 3
+    spent = history.time_in_status(0)
+    assert spent["pending"] == 2.0 and spent["sent"] == 1.0 and spent["completed"] == 3.0
+
+    # A requeue starts a new attempt
+    history.transition(0, DirectiveStatus.PENDING)
+    assert history.stages(0) == {"queued": None, "ack": None, "run": None, "total": None}
+    print("✅ History Stages Test Passed")
+
+
+def test_stage_distribution():
+    clock = FakeClock()
+    history = DirectiveHistory(clock=clock)
+    for seq in range(4):
+        history.start(seq)
+    clock.now += 1
+    for seq in range(3):
+        history.transition(seq, DirectiveStatus.SENT)
+    clock.now += 1
+    history.transition(0, DirectiveStatus.COMPLETED)
+
+    distribution = history.stage_distribution(range(4))
+    assert distribution["queued"]["count"] == 3
+    assert distribution["queued"]["p50"] == 1.0
+    assert distribution["total"] == {"count": 1, "p50": 2.0, "p90": 2.0, "p99": 2.0, "max": 2.0}
+    # Completing without an acknowledgement counts as acknowledged on completion
+    assert distribution["run"]["count"] == 1 and distribution["run"]["max"] == 0.0
+    assert history.stage_distribution([3])["queued"] == {"count": 0}
+    print("✅ Stage Distribution Test Passed")
+
+
+def test_engine_rejects_invalid_transitions():
+    async def scenario():
+        engine = DirectiveEngine()
+        directive_id = engine.create_directive("agent-001", {"task": "optimize_cpu"})
+        assert engine.update_directive_status(directive_id, "completed")
+        assert not engine.update_directive_status(directive_id, "in-progress")
+        assert not engine.update_directive_status(directive_id, "sent")
+        assert not engine.update_directive_status(directive_id, "unknown-status")
+        assert not engine.update_directive_status("missing", "completed")
+        assert engine.get_directive(directive_id)["status"] == "completed"
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    print("✅ Engine Transition Validation Test Passed")
+
+
+def test_engine_timeline_and_stats():
+    async def scenario():
+        engine = DirectiveEngine()
+        first = engine.create_directive("agent-001", {"task": "optimize_cpu"})
+        second = engine.create_directive("agent-002", {"task": "scan_ports"})
+        engine.mark_dispatched(first)
+        engine.mark_dispatched(first)  # Only the first send is recorded
+        engine.update_directive_status(first, "acknowledged")
+        engine.update_directive_status(first, "completed")
+        await asyncio.sleep(0)
+
+        timeline = engine.directive_timeline(first)
+        assert timeline["status"] == "completed"
+        assert [event["status"] for event in timeline["events"]] == ["pending", "sent", "acknowledged", "completed"]
+        assert timeline["events"][0]["at"] == 0.0
+        assert timeline["stages"]["total"] >= 0.0
+        assert set(timeline["time_in_status"]) == {"pending", "sent", "acknowledged", "completed"}
+        assert engine.directive_timeline("missing") is None
+
+        stats = engine.stage_stats()
+        assert stats["directives"] == 2
+        assert stats["stages"]["queued"]["count"] == 1
+        assert stats["stages"]["total"]["count"] == 1
+        assert engine.stage_stats(task="scan_ports")["stages"]["total"] == {"count": 0}
+        assert engine.stage_stats(agent_id="agent-001", task="scan_ports")["directives"] == 0
+        assert engine.stage_stats(agent_id="agent-002")["directives"] == 1
+        assert engine.get_directive(second)["status"] == "pending"
+
+    asyncio.run(scenario())
+    print("✅ Engine Timeline And Stats Test Passed")
+
+
+if __name__ == "__main__":
+    test_transition_table()
+    test_history_records_valid_transitions_only()
+    test_history_chains_interleaved_directives()
+    test_history_stages()
+    test_stage_distribution()
+    test_engine_rejects_invalid_transitions()
+    test_engine_timeline_and_stats()
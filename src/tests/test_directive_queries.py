@@ -0,0 +1,79 @@
+import asyncio
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.directive_engine import DirectiveEngine
+
+
+def build_engine():
+    engine = DirectiveEngine()
+    ids = []
+    for i in range(10):
+        ids.append(engine.create_directive(f"agent-{i % 2}", {"task": f"task-{i}"}))
+    return engine, ids
+
+
+def collect(engine, **filters):
+    items, cursor = [], None
+    while True:
+        page = engine.query_directives(cursor=cursor, limit=3, **filters)
+        items.extend(d["id"] for d in page["directives"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+def test_paginate_all_directives():
+    engine, ids = build_engine()
+    assert collect(engine) == ids
+    print("✅ Directive Pagination Test Passed")
+
+
+def test_filter_by_agent_and_status():
+    async def scenario():
+        engine, ids = build_engine()
+        for directive_id in ids[:4]:
+            engine.update_directive_status(directive_id, "completed")
+        await asyncio.sleep(0)
+
+        assert collect(engine, agent_id="agent-0") == ids[0::2]
+        assert collect(engine, status="completed") == ids[:4]
+        assert collect(engine, status="pending") == ids[4:]
+        assert collect(engine, agent_id="agent-1", status="completed") == [ids[1], ids[3]]
+        assert collect(engine, agent_id="agent-9") == []
+
+        # Status index stays sorted when a directive moves back
+        engine.update_directive_status(ids[0], "pending")
+        await asyncio.sleep(0)
+        assert collect(engine, status="pending") == [ids[0]] + ids[4:]
+
+    asyncio.run(scenario())
+    print("✅ Directive Index Filter Test Passed")
+
+
+def test_bulk_create_indexes_every_directive():
+    engine = DirectiveEngine()
+    ids = engine.create_directives([("agent-1", {"task": "scan"}), ("agent-2", {}), ("agent-1", {"task": "scan"})])
+    assert len(ids) == 3 and len(set(ids)) == 3
+    assert collect(engine, agent_id="agent-1") == [ids[0], ids[2]]
+    assert engine.get_directive(ids[1])["task"] == "No task specified"
+    print("✅ Bulk Directive Creation Test Passed")
+
+
+def test_invalid_cursor():
+    engine, _ = build_engine()
+    try:
+        engine.query_directives(cursor="not-a-cursor")
+        assert False, "Invalid cursor should raise"
+    except ValueError as e:
+        print(f"✅ Caught expected error: {e}")
+
+
+if __name__ == "__main__":
+    test_paginate_all_directives()
+    test_filter_by_agent_and_status()
+    test_bulk_create_indexes_every_directive()
+    test_invalid_cursor()
+    print("🎯 All Tests Passed Successfully!")
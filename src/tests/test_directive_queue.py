@@ -0,0 +1,93 @@
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.directive_queue import DirectiveScheduler, QueueFullError, directive_priority
+from core.frames import encode_frame
+
+
+def make_scheduler(**options):
+    sent = []
+    scheduler = DirectiveScheduler(send=lambda agent_id, directive_id, frame: sent.append(directive_id) or True, **options)
+    return scheduler, sent
+
+
+def test_in_flight_limit_and_release():
+    scheduler, sent = make_scheduler(max_in_flight=2)
+    results = [scheduler.submit("agent-1", f"d-{i}", encode_frame({})) for i in range(4)]
+    assert results == [True, True, False, False]
+    assert sent == ["d-0", "d-1"]
+    scheduler.release("d-0")
+    assert sent == ["d-0", "d-1", "d-2"]
+    print("✅ In-Flight Limit Test Passed")
+
+
+def test_high_priority_overtakes_backlog():
+    scheduler, sent = make_scheduler(max_in_flight=1)
+    scheduler.submit("agent-1", "busy", encode_frame({}))
+    for i in range(6):
+        scheduler.submit("agent-1", f"low-{i}", encode_frame({}), "low")
+    for i in range(6):
+        scheduler.submit("agent-1", f"high-{i}", encode_frame({}), "high")
+
+    previous = "busy"
+    for _ in range(10):
+        scheduler.release(previous)
+        previous = sent[-1]
+    order = sent[1:]
+    # Weighted 4:1 under contention: highs dominate but lows are not starved
+    assert order[:5].count("low-0") == 1 and sum(1 for d in order[:5] if d.startswith("high")) == 4
+    assert [d for d in order if d.startswith("high")] == [f"high-{i}" for i in range(6)]
+    print("✅ Weighted Priority Test Passed")
+
+
+def test_backpressure_when_queue_full():
+    scheduler, _ = make_scheduler(max_in_flight=1, max_queued=2)
+    scheduler.submit("agent-1", "d-0", encode_frame({}))
+    scheduler.submit("agent-1", "d-1", encode_frame({}))
+    scheduler.submit("agent-1", "d-2", encode_frame({}))
+    assert not scheduler.can_accept("agent-1")
+    try:
+        scheduler.submit("agent-1", "d-3", encode_frame({}))
+        assert False, "Queue should be full"
+    except QueueFullError as e:
+        print(f"✅ Caught expected error: {e}")
+    assert scheduler.drop_agent("agent-1") == ["d-1", "d-2"]
+
+
+def test_failed_send_keeps_directive_waiting():
+    connected = {"value": True}
+    sent = []
+
+    def send(agent_id, directive_id, frame):
+        if not connected["value"]:
+            return False
+        sent.append(directive_id)
+        return True
+
+    scheduler = DirectiveScheduler(send=send, max_in_flight=1)
+    scheduler.submit("agent-1", "d-0", encode_frame({}))
+    scheduler.submit("agent-1", "d-1", encode_frame({}))
+    connected["value"] = False
+    scheduler.release("d-0")
+    assert sent == ["d-0"]
+    assert scheduler.queues["agent-1"].queued == 1
+    assert scheduler.drop_agent("agent-1") == ["d-1"]
+    print("✅ Failed Send Requeue Test Passed")
+
+
+def test_priority_parsing():
+    assert directive_priority({"task": "x", "payload": {"priority": "high"}}) == "high"
+    assert directive_priority({"priority": "low"}) == "low"
+    assert directive_priority({"priority": "urgent"}) == "normal"
+    print("✅ Priority Parsing Test Passed")
+
+
+if __name__ == "__main__":
+    test_in_flight_limit_and_release()
+    test_high_priority_overtakes_backlog()
+    test_backpressure_when_queue_full()
+    test_failed_send_keeps_directive_waiting()
+    test_priority_parsing()
+    print("🎯 All Tests Passed Successfully!")
@@ -0,0 +1,103 @@
+import os
+import sys
+import tempfile
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.directive_engine import DirectiveEngine
+from core.directive_store import StoreLockedError, WALDirectiveStore, open_worker_store
+
+
+def test_recovery_replays_log():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = DirectiveEngine(store=WALDirectiveStore(directory))
+        first = engine.create_directive("agent-1", {"task": "optimize_cpu"})
+        second = engine.create_directive("agent-2", {"task": "optimize_gpu"})
+        engine.directives[first].set_status("completed", 1234.5)
+        engine.store.record_status(first, "completed", 1234.5)
+        engine.store.close()
+
+        recovered = DirectiveEngine(store=WALDirectiveStore(directory))
+        assert list(recovered.directives) == [first, second]
+        assert recovered.get_directive(first)["status"] == "completed"
+        assert recovered.directives[first].updated_at == 1234.5
+        assert recovered.query_directives(agent_id="agent-2")["directives"][0]["id"] == second
+        recovered.store.close()
+    print("✅ WAL Recovery Test Passed")
+
+
+def test_snapshot_compacts_segments():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = DirectiveEngine(store=WALDirectiveStore(directory, snapshot_every=50))
+        ids = [engine.create_directive(f"agent-{i % 3}", {"task": "scan"}) for i in range(120)]
+        engine.directives[ids[0]].set_status("failed", 99.0)
+        engine.store.record_status(ids[0], "failed", 99.0)
+        engine.store.snapshot()
+        engine.store.close()
+
+        files = os.listdir(directory)
+        snapshots = [int(f[9:17]) for f in files if f.startswith("snapshot-")]
+        segments = [int(f[4:12]) for f in files if f.startswith("wal-")]
+        assert len(snapshots) == 1
+        assert all(segment >= snapshots[0] for segment in segments)
+
+        recovered = DirectiveEngine(store=WALDirectiveStore(directory))
+        assert list(recovered.directives) == ids
+        assert recovered.get_directive(ids[0])["status"] == "failed"
+        assert recovered.directives[ids[0]].updated_at == 99.0
+        recovered.store.close()
+    print("✅ Snapshot Compaction Test Passed")
+
+
+def test_torn_tail_is_ignored():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = DirectiveEngine(store=WALDirectiveStore(directory))
+        directive_id = engine.create_directive("agent-1", {"task": "optimize_cpu"})
+        engine.store.close()
+
+        segment = sorted(f for f in os.listdir(directory) if f.startswith("wal-"))[-1]
+        with open(os.path.join(directory, segment), "ab") as f:
+            f.write(b'{"op": "c", "d": {"id": "tor')
+
+        recovered = DirectiveEngine(store=WALDirectiveStore(directory))
+        assert list(recovered.directives) == [directive_id]
+        recovered.store.close()
+    print("✅ Torn Tail Recovery Test Passed")
+
+
+def test_two_stores_never_share_a_directory():
+    with tempfile.TemporaryDirectory() as directory:
+        first = WALDirectiveStore(directory)
+        try:
+            WALDirectiveStore(directory)
+            assert False, "a second store opened a locked directory"
+        except StoreLockedError:
+            pass
+
+        # Workers sharing a root each get their own log, so one worker's snapshot
+        # never deletes segments another worker appended to
+        engines = [DirectiveEngine(store=open_worker_store(directory, snapshot_every=20)) for _ in range(2)]
+        assert engines[0].store.directory != engines[1].store.directory
+        ids = [[engine.create_directive(f"agent-{n}", {"task": "scan"}) for _ in range(50)]
+               for n, engine in enumerate(engines)]
+        for engine in engines:
+            engine.store.snapshot()
+            engine.store.close()
+        first.close()
+
+        recovered = [DirectiveEngine(store=open_worker_store(directory)) for _ in range(2)]
+        assert [list(engine.directives) for engine in recovered] == ids
+        for engine in recovered:
+            engine.store.close()
+
+        # A closed store releases its directory
+        WALDirectiveStore(directory).close()
+    print("✅ Store Directory Lock Test Passed")
+
+
+if __name__ == "__main__":
+    test_recovery_replays_log()
+    test_snapshot_compacts_segments()
+    test_torn_tail_is_ignored()
+    test_two_stores_never_share_a_directory()
+    print("🎯 All Tests Passed Successfully!")
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from core import sentinel_core_agent
+from core.agent_manager import AgentManager
+from core.directive_engine import DirectiveEngine
+from core.exports import NDJSON_MEDIA_TYPE, ndjson_chunks, ndjson_response
+from core.sentinel_core_agent import SentinelCoreAgent
+
+
+def collect(rows, **kwargs):
+    async def scenario():
+        return [chunk async for chunk in ndjson_chunks(rows, **kwargs)]
+
+    return asyncio.run(scenario())
+
+
+def parse(chunks):
+    return [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+
+def register(manager, agent_id, stake=12000, agent_type="sub-agent"):
+    manager.register_agent({"agent_id": agent_id, "name": agent_id, "type": agent_type, "token_stake": stake})
+
+
+def test_ndjson_chunks():
+    rows = [{"id": i, "name": "agent"} for i in range(500)]
+    chunks = collect(iter(rows), chunk_bytes=1024, first_chunk_bytes=64)
+    assert parse(chunks) == rows
+    assert len(chunks[0]) < 128
+    assert all(len(chunk) < 1024 + 64 for chunk in chunks)
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    assert collect(iter([])) == []
+    print("✅ NDJSON Chunks Test Passed")
+
+
+def test_ndjson_chunks_yield_while_scanning():
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        # A selective filter: 5000 rows passed over before the only match
+        rows = iter([None] * 5000 + [{"id": 1}])
+        chunks = [chunk async for chunk in ndjson_chunks(rows, scan_rows=1000)]
+        task.cancel()
+        return chunks, ticks
+
+    chunks, ticks = asyncio.run(scenario())
+    assert parse(chunks) == [{"id": 1}]
+    assert ticks >= 5
+    print("✅ NDJSON Scan Yield Test Passed")
+
+
+def test_export_agents_filters_and_snapshot():
+    manager = AgentManager()
+    for i in range(5):
+        register(manager, f"agent-{i}", stake=10000 + i * 1000, agent_type="sub-agent" if i % 2 else "core")
+    manager.update_agent_status("agent-3", "stale")
+
+    assert [agent["agent_id"] for agent in manager.export_agents()] == [f"agent-{i}" for i in range(5)]
+    assert [agent["agent_id"] for agent in manager.export_agents(status="stale")] == ["agent-3"]
+    assert [agent["agent_id"] for agent in manager.export_agents(agent_type="core", min_stake=11000)] == \
+        ["agent-2", "agent-4"]
+    assert list(manager.export_agents(status="unknown-status")) == []
+
+    # The export is a snapshot: later registrations, removals and status changes do not show up
+    export = manager.export_agents()
+    first = next(export)
+    register(manager, "agent-late")
+    manager.remove_agent("agent-4")
+    manager.update_agent_status("agent-1", "stale")
+    rest = list(export)
+    assert [first["agent_id"]] + [agent["agent_id"] for agent in rest] == [f"agent-{i}" for i in range(5)]
+    assert [agent["status"] for agent in rest] == ["active", "active", "stale", "active"]
+
+    export = manager.export_agents(status="active")
+    assert next(export)["agent_id"] == "agent-0"
+    manager.update_agent_status("agent-2", "stale")
+    manager.update_agent_status("agent-late", "active")
+    assert [agent["agent_id"] for agent in export] == ["agent-2", "agent-late"]
+    print("✅ Agent Export Test Passed")
+
+
+def test_export_directives_filters_and_snapshot():
+    async def scenario():
+        engine = DirectiveEngine()
+        ids = [engine.create_directive(f"agent-{i % 2}", {"task": "scan" if i < 3 else "optimize_cpu"})
+               for i in range(6)]
+        engine.update_directive_status(ids[1], "completed")
+        await asyncio.sleep(0)
+
+        assert [d["id"] for d in engine.export_directives()] == ids
+        assert [d["id"] for d in engine.export_directives(agent_id="agent-1")] == [ids[1], ids[3], ids[5]]
+        assert [d["id"] for d in engine.export_directives(task="scan")] == ids[:3]
+        assert [d["id"] for d in engine.export_directives(agent_id="agent-0", task="optimize_cpu")] == [ids[4]]
+        assert [d["id"] for d in engine.export_directives(status="completed")] == [ids[1]]
+        assert list(engine.export_directives(status="unknown-status")) == []
+        assert list(engine.export_directives(agent_id="missing")) == []
+
+        export = engine.export_directives(agent_id="agent-1")
+        assert next(export)["id"] == ids[1]
+        engine.create_directive("agent-1", {"task": "scan"})
+        assert [d["id"] for d in export] == [ids[3], ids[5]]
+
+    asyncio.run(scenario())
+    print("✅ Directive Export Test Passed")
+
+
+def test_export_directives_by_status_index():
+    async def scenario():
+        engine = DirectiveEngine()
+        ids = [engine.create_directive(f"agent-{i % 2}", {"task": "scan"}) for i in range(9)]
+        for directive_id in ids[1:8]:
+            engine.update_directive_status(directive_id, "completed")
+        await asyncio.sleep(0)
+
+        assert [d["id"] for d in engine.export_directives(status="completed")] == ids[1:8]
+        assert [d["id"] for d in engine.export_directives(agent_id="agent-0", status="completed")] == \
+            [ids[2], ids[4], ids[6]]
+
+        # The export is a snapshot: status changes and new directives after it starts do not show up
+        export = engine.export_directives(status="completed")
+        assert [next(export)["id"] for _ in range(2)] == ids[1:3]
+        engine.update_directive_status(ids[4], "pending")
+        engine.update_directive_status(ids[5], "failed")
+        late = engine.create_directive("agent-0", {"task": "scan"})
+        engine.update_directive_status(late, "completed")
+        rows = list(export)
+        assert [d["id"] for d in rows] == ids[3:8]
+        assert {d["status"] for d in rows} == {"completed"}
+
+        export = engine.export_directives(agent_id="agent-0")
+        assert next(export)["id"] == ids[0]
+        engine.update_directive_status(ids[0], "completed")
+        engine.update_directive_status(ids[8], "completed")
+        assert [d["status"] for d in export] == ["completed", "pending", "completed", "pending", "completed"]
+
+        # With skipped=True, passed-over directives show up as None
+        assert list(engine.export_directives(agent_id="agent-1", status="pending", skipped=True)) == [None]
+        rows = engine.export_directives(agent_id="agent-0", task="scan", status="completed", skipped=True)
+        assert [row and row["id"] for row in rows] == [ids[0], ids[2], None, ids[6], ids[8], late]
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    print("✅ Directive Status Export Test Passed")
+
+
+def test_sentinel_iter_agents():
+    async def scenario():
+        sentinel_core_agent.AGENT_REGISTRY.clear()
+        sentinel = SentinelCoreAgent()
+        await sentinel.register_agent("Alpha", "compute", 20000)
+        await sentinel.register_agent("Beta", "storage", 20000)
+        assert [agent["name"] for agent in sentinel.iter_agents()] == ["Alpha", "Beta"]
+        assert [agent["name"] for agent in sentinel.iter_agents(agent_type="storage")] == ["Beta"]
+        assert list(sentinel.iter_agents(status="inactive")) == []
+        sentinel_core_agent.AGENT_REGISTRY.clear()
+
+    asyncio.run(scenario())
+    print("✅ Sentinel Agent Iteration Test Passed")
+
+
+def test_ndjson_response_streams():
+    manager = AgentManager()
+    for i in range(2000):
+        register(manager, f"agent-{i}")
+    app = FastAPI()
+
+    @app.get("/export")
+    async def export():
+        return ndjson_response(manager.export_agents(), "agents.ndjson")
+
+    with TestClient(app) as client:
+        response = client.get("/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == NDJSON_MEDIA_TYPE
+    assert "agents.ndjson" in response.headers["content-disposition"]
+    agents = [json.loads(line) for line in response.text.splitlines()]
+    assert len(agents) == 2000 and agents[-1]["agent_id"] == "agent-1999"
+    print("✅ NDJSON Response Test Passed")
+
+
+if __name__ == "__main__":
+    test_ndjson_chunks()
+    test_ndjson_chunks_yield_while_scanning()
+    test_export_agents_filters_and_snapshot()
+    test_export_directives_filters_and_snapshot()
+    test_export_directives_by_status_index()
+    test_sentinel_iter_agents()
+    test_ndjson_response_streams()
@@ -0,0 +1,67 @@
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.agent_manager import AgentManager
+from core import fleet_registry
+from core.fleet_registry import FleetRegistry
+
+
+def test_fleet_aggregates():
+    fleet = FleetRegistry(capacity=2)  # Forces the columns to grow
+    fleet.upsert("agent-1", 10000, "sub-agent")
+    fleet.upsert("agent-2", 20000, "sub-agent")
+    fleet.upsert("agent-3", 30000, "monitor")
+    fleet.update_status("agent-2", "inactive")
+
+    stats = fleet.stats()
+    assert stats["agents"] == 3
+    assert stats["total_stake"] == 60000
+    assert stats["by_status"] == {"active": 2, "inactive": 1}
+    assert stats["by_type"] == {"sub-agent": 2, "monitor": 1}
+    assert stats["stake_percentiles"]["p50"] == 20000
+    print("✅ Fleet Aggregates Test Passed")
+
+
+def test_removed_rows_are_reused():
+    fleet = FleetRegistry()
+    fleet.upsert("agent-1", 10000)
+    row = fleet.upsert("agent-2", 20000)
+    assert fleet.remove("agent-2")
+    assert not fleet.remove("agent-2")
+    assert fleet.upsert("agent-3", 5000, "monitor") == row
+    assert fleet.get("agent-3")["type"] == "monitor"
+    assert fleet.total_stake() == 15000
+    assert fleet.count_by_type() == {"unknown": 1, "monitor": 1}
+    print("✅ Fleet Free-List Test Passed")
+
+
+def test_agent_manager_mirrors_into_fleet():
+    fleet = FleetRegistry()
+    manager = AgentManager(fleet=fleet)
+    manager.register_agent({'agent_id': 'agent-456', 'type': 'sub-agent', 'token_stake': 12000})
+    manager.update_agent_status('agent-456', 'inactive')
+    assert fleet.get('agent-456')["status"] == 'inactive'
+    manager.remove_agent('agent-456')
+    assert len(fleet) == 0
+    print("✅ Agent Manager Fleet Mirror Test Passed")
+
+
+def test_type_codes_are_capped():
+    fleet = FleetRegistry()
+    for i in range(fleet_registry.MAX_TYPES + 50):
+        fleet.upsert(f"agent-{i}", 10000, f"type-{i}")
+    assert len(fleet.types) == fleet_registry.MAX_TYPES
+    assert fleet.get(f"agent-{fleet_registry.MAX_TYPES + 10}")["type"] == fleet_registry.OTHER
+    assert fleet.get("agent-0")["type"] == "type-0"
+    assert sum(fleet.count_by_type().values()) == fleet_registry.MAX_TYPES + 50
+    print("✅ Fleet Type Cap Test Passed")
+
+
+if __name__ == "__main__":
+    test_fleet_aggregates()
+    test_removed_rows_are_reused()
+    test_agent_manager_mirrors_into_fleet()
+    test_type_codes_are_capped()
+    print("🎯 All Tests Passed Successfully!")
@@ -0,0 +1,87 @@
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.agent_manager import AgentManager
+from core.heartbeat import HeartbeatMonitor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def build_monitor(clock):
+    pinged, stale = [], []
+    monitor = HeartbeatMonitor(ping=pinged.append, on_stale=stale.append,
+                               timeout=30.0, ping_grace=10.0, tick=1.0, clock=clock)
+    return monitor, pinged, stale
+
+
+def test_silent_agent_is_pinged_then_stale():
+    clock = FakeClock()
+    monitor, pinged, stale = build_monitor(clock)
+    monitor.track("agent-1")
+
+    clock.now = 31.0
+    monitor.tick()
+    assert pinged == ["agent-1"] and stale == []
+    clock.now = 42.0
+    monitor.tick()
+    assert stale == ["agent-1"]
+    assert "agent-1" not in monitor
+    print("✅ Heartbeat Expiry Test Passed")
+
+
+def test_heartbeats_keep_agent_alive():
+    clock = FakeClock()
+    monitor, pinged, stale = build_monitor(clock)
+    monitor.track("agent-1")
+    monitor.track("agent-2")
+
+    for second in range(1, 120):
+        clock.now = float(second)
+        if second % 20 == 0:
+            monitor.touch("agent-1")
+        monitor.tick()
+    assert "agent-1" not in stale
+    assert stale == ["agent-2"]
+    print("✅ Heartbeat Keepalive Test Passed")
+
+
+def test_pong_after_ping_recovers_agent():
+    clock = FakeClock()
+    monitor, pinged, stale = build_monitor(clock)
+    monitor.track("agent-1")
+    clock.now = 31.0
+    monitor.tick()
+    clock.now = 35.0
+    monitor.touch("agent-1")  # Answered the ping
+    clock.now = 45.0
+    monitor.tick()
+    assert stale == []
+    assert "agent-1" in monitor
+    print("✅ Heartbeat Pong Test Passed")
+
+
+def test_agent_manager_upsert_refreshes_stale_agent():
+    manager = AgentManager()
+    manager.upsert_agent({'agent_id': 'agent-1', 'token_stake': 12000})
+    manager.update_agent_status('agent-1', 'stale')
+    manager.upsert_agent({'agent_id': 'agent-1', 'token_stake': 15000})
+    agent = manager.get_agent('agent-1')
+    assert agent['status'] == 'active'
+    assert agent['token_stake'] == 15000
+    print("✅ Agent Re-registration Test Passed")
+
+
+if __name__ == "__main__":
+    test_silent_agent_is_pinged_then_stale()
+    test_heartbeats_keep_agent_alive()
+    test_pong_after_ping_recovers_agent()
+    test_agent_manager_upsert_refreshes_stale_agent()
+    print("🎯 All Tests Passed Successfully!")
@@ -0,0 +1,86 @@
+import asyncio
+import sys
+import os
+import time
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core import sentinel_core_agent
+from core.log_buffer import LogRingBuffer
+from core.sentinel_core_agent import SentinelCoreAgent
+
+
+def test_wraps_at_capacity():
+    logs = LogRingBuffer(capacity=3)
+    for i in range(5):
+        logs.append(f"entry-{i}", timestamp=100.0 + i)
+    assert len(logs) == 3
+    assert list(logs) == ["entry-2", "entry-3", "entry-4"]
+    assert logs.tail(2) == ["entry-3", "entry-4"]
+    assert logs.first_offset == 2 and logs.next_offset == 5
+    print("✅ Ring Buffer Wrap Test Passed")
+
+
+def test_time_range_query():
+    logs = LogRingBuffer(capacity=4)
+    for i in range(6):
+        logs.append(i, timestamp=10.0 * i)
+    # Offsets 0 and 1 were overwritten; the range starts at the oldest readable entry
+    assert [entry for _, entry in logs.range(0.0, 40.0)] == [2, 3]
+    assert [entry for _, entry in logs.range(25.0)] == [3, 4, 5]
+    assert [entry for _, entry in logs.range(end_time=30.0)] == [2]
+    assert logs.range(100.0) == []
+    assert [entry for _, entry in logs.range(0.0, limit=2)] == [2, 3]
+    assert [entry for _, entry in logs.range(0.0, limit=2, newest=True)] == [4, 5]
+    assert logs.range(0.0, limit=0, newest=True) == [] and logs.range(limit=-1) == []
+    print("✅ Time Range Query Test Passed")
+
+
+def test_since_offset():
+    logs = LogRingBuffer(capacity=4)
+    for i in range(6):
+        logs.append(i, timestamp=float(i))
+    assert [offset for offset, _, _ in logs.since(0)] == [2, 3, 4, 5]
+    assert [entry for _, _, entry in logs.since(4, limit=1)] == [4]
+    assert logs.since(6) == []
+    print("✅ Offset Query Test Passed")
+
+
+def test_retention_expires_old_entries():
+    logs = LogRingBuffer(capacity=10, retention_seconds=60)
+    now = time.time()
+    logs.append("old", timestamp=now - 120)
+    logs.append("fresh", timestamp=now)
+    assert list(logs) == ["fresh"]
+    assert len(logs) == 1
+    print("✅ Retention Test Passed")
+
+
+def test_sentinel_log_limits():
+    async def scenario():
+        sentinel = SentinelCoreAgent()
+        start = time.time() - 10
+        sentinel_core_agent.directives_log.clear()
+        for i in range(5):
+            sentinel.logs.append(f"entry-{i}", timestamp=start + i)
+            sentinel_core_agent.directives_log.append((f"agent-{i}", "scan", {}, "in-progress"), timestamp=start + i)
+        assert await sentinel.get_agent_logs(limit=2) == ["entry-3", "entry-4"]
+        assert await sentinel.get_agent_logs(limit=2, since=start + 1, until=start + 4) == ["entry-2", "entry-3"]
+        # limit=0 means no entries on both paths
+        assert await sentinel.get_agent_logs(limit=0) == []
+        assert await sentinel.get_agent_logs(limit=0, since=start) == []
+        records = await sentinel.get_directive_log(limit=1, since=start)
+        assert [record["agent_id"] for record in records] == ["agent-4"]
+        sentinel_core_agent.directives_log.clear()
+
+    asyncio.run(scenario())
+    print("✅ Sentinel Log Limit Test Passed")
+
+
+if __name__ == "__main__":
+    test_wraps_at_capacity()
+    test_time_range_query()
+    test_since_offset()
+    test_retention_expires_old_entries()
+    test_sentinel_log_limits()
+    print("🎯 All Tests Passed Successfully!")
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core import logger
+from core.log_buffer import LogRingBuffer
+from core.logger import LOG_EPOCH, broadcast_log, cursor_message, ingest_relayed_log, log_hub, replay_frames
+
+
+def flatten(message):
+    if message.get("action") == "batch":
+        return [entry for nested in message["messages"] for entry in flatten(nested)]
+    return [message]
+
+
+def replayed(since, topics=None):
+    return [entry for frame in replay_frames(since, topics) for entry in flatten(json.loads(frame.text))]
+
+
+def test_replay_from_offset_with_level_filter():
+    logger.log_buffer = LogRingBuffer(capacity=100)
+
+    async def publish():
+        for i in range(6):
+            await broadcast_log(f"entry {i}", level="error" if i % 3 == 0 else "info")
+
+    asyncio.run(publish())
+    assert [entry["offset"] for entry in replayed(2)] == [2, 3, 4, 5]
+    assert [entry["message"] for entry in replayed(0, {"level:error"})] == ["entry 0", "entry 3"]
+    assert [entry["offset"] for entry in replayed(0, {"*"})] == list(range(6))
+    print("✅ Log Replay Test Passed")
+
+
+def test_cursor_reports_overwritten_entries():
+    logger.log_buffer = LogRingBuffer(capacity=4)
+
+    async def publish():
+        for i in range(10):
+            await broadcast_log(f"entry {i}")
+
+    asyncio.run(publish())
+    assert cursor_message(since=3) == {"type": "log_cursor", "epoch": LOG_EPOCH, "first_offset": 6,
+                                       "next_offset": 10, "missed": 3}
+    assert [entry["offset"] for entry in replayed(3)] == [6, 7, 8, 9]
+    print("✅ Log Cursor Test Passed")
+
+
+def test_relayed_entries_get_local_offsets():
+    logger.log_buffer = LogRingBuffer(capacity=100)
+
+    async def publish():
+        await broadcast_log("local 0")
+        # Another worker's entry, with that worker's offset, as the worker router hands it over
+        log_hub.ingest({"type": "log", "offset": 40, "ts": 5.0, "level": "error", "message": "peer"}, ["level:error"])
+        await broadcast_log("local 1")
+
+    assert log_hub.ingest is ingest_relayed_log
+    asyncio.run(publish())
+    entries = replayed(0)
+    assert [(entry["offset"], entry["message"]) for entry in entries] == [(0, "local 0"), (1, "peer"), (2, "local 1")]
+    assert entries[1]["ts"] == 5.0 and entries[1]["level"] == "error"
+    assert [entry["message"] for entry in replayed(0, {"level:error"})] == ["peer"]
+    print("✅ Relayed Log Offsets Test Passed")
+
+
+class RecordingChannel:
+    key = "viewer"
+
+    def __init__(self):
+        self.sent = []
+
+    def enqueue(self, frame):
+        self.sent.append(frame)
+
+
+def test_replay_ignores_offsets_from_another_epoch():
+    from core.websocket_server import replay_logs
+
+    logger.log_buffer = LogRingBuffer(capacity=100)
+
+    async def publish():
+        for i in range(3):
+            await broadcast_log(f"entry {i}")
+
+    asyncio.run(publish())
+    log_hub.subscriptions.subscribe(RecordingChannel.key, ["*"])
+    channel = RecordingChannel()
+    replay_logs(channel, 1, LOG_EPOCH)
+    assert channel.sent[0]["epoch"] == LOG_EPOCH
+    assert [entry["offset"] for entry in flatten(json.loads(channel.sent[1].text))] == [1, 2]
+
+    # Offsets issued by a restarted server mean nothing here: cursor only, no replay
+    channel = RecordingChannel()
+    replay_logs(channel, 1, "restarted")
+    assert len(channel.sent) == 1 and "missed" not in channel.sent[0]
+    log_hub.subscriptions.unsubscribe(RecordingChannel.key)
+    print("✅ Replay Epoch Test Passed")
+
+
+def test_viewer_sockets_cleaned_up_after_bad_message():
+    from fastapi.testclient import TestClient
+    from core.broadcast_utils import directive_hub
+    from core.websocket_server import app, connections
+
+    for path, hub in (("/ws/logs", log_hub), ("/ws/directives", directive_hub)):
+        hubs_before, registry_before = len(hub), len(connections)
+        try:
+            with TestClient(app).websocket_connect(path) as websocket:
+                websocket.receive_json()
+                assert len(hub) == hubs_before + 1
+                websocket.send_text("not json")
+                websocket.receive_json()
+        except ValueError:
+            pass  # The handler's error, re-raised by the test client
+        assert len(hub) == hubs_before and len(connections) == registry_before
+    print("✅ Viewer Socket Cleanup Test Passed")
+
+
+if __name__ == "__main__":
+    test_replay_from_offset_with_level_filter()
+    test_cursor_reports_overwritten_entries()
+    test_relayed_entries_get_local_offsets()
+    test_replay_ignores_offsets_from_another_epoch()
+    test_viewer_sockets_cleaned_up_after_bad_message()
+    print("🎯 All Tests Passed Successfully!")
@@ -0,0 +1,48 @@
+import io
+import json
+import logging
+import queue
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core import logging_config
+from core.logging_config import NonBlockingQueueHandler, configure_logging, flush_logging, get_logger
+
+
+def test_json_records_with_sampling():
+    stream = io.StringIO()
+    configure_logging(level="INFO", fmt="json", stream=stream)
+    logging_config.SAMPLING["test_hot_event"] = 10
+    log = get_logger("test")
+
+    for i in range(25):
+        log.info("test_hot_event", "hot", n=i)
+    log.info("test_event", "✅ Directive created.", directive_id="d-1")
+    log.debug("test_event", "not emitted at INFO")
+    flush_logging()
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    hot = [record for record in records if record["event"] == "test_hot_event"]
+    assert [record["n"] for record in hot] == [0, 10, 20]
+    assert all(record["sampled"] == 10 for record in hot)
+    assert records[-1]["directive_id"] == "d-1" and records[-1]["level"] == "info"
+    assert records[-1]["logger"] == "sentinel.test"
+    configure_logging()
+    print("✅ Structured Logging Test Passed")
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=2))
+    for i in range(5):
+        handler.emit(logging.LogRecord("sentinel.test", logging.INFO, __file__, 0, "msg", None, None))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+    print("✅ Non-Blocking Log Queue Test Passed")
+
+
+if __name__ == "__main__":
+    test_json_records_with_sampling()
+    test_full_queue_drops_instead_of_blocking()
+    print("🎯 All Tests Passed Successfully!")
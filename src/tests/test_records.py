@@ -0,0 +1,53 @@
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.records import AgentRecord, DirectiveRecord, DirectiveStatus
+
+
+def test_directive_record_round_trip():
+    directive = DirectiveRecord("d-1", "agent-1", "optimize_cpu")
+    assert directive.status == DirectiveStatus.PENDING
+    directive.set_status("in-progress")
+    assert directive.status == DirectiveStatus.IN_PROGRESS
+    assert directive.to_dict() == {"id": "d-1", "agent_id": "agent-1", "task": "optimize_cpu", "status": "in-progress"}
+
+    restored = DirectiveRecord.from_dict(directive.to_state())
+    assert restored.to_dict() == directive.to_dict()
+    assert restored.created_at == directive.created_at
+    print("✅ Directive Record Round Trip Test Passed")
+
+
+def test_unknown_status_is_interned():
+    first = DirectiveRecord("d-1", "agent-1", "scan")
+    second = DirectiveRecord("d-2", "agent-1", "scan")
+    first.set_status("paused")
+    second.set_status("paused")
+    assert first.status == second.status > max(DirectiveStatus)
+    assert second.to_dict()["status"] == "paused"
+    print("✅ Unknown Status Interning Test Passed")
+
+
+def test_agent_record_keeps_extra_metadata():
+    agent = AgentRecord.from_metadata("agent-1", {
+        'name': 'Test Agent',
+        'type': 'sub-agent',
+        'capabilities': ['monitor_cpu'],
+        'token_stake': 12000,
+        'region': 'eu-west'
+    })
+    agent.set_status("inactive")
+    agent_dict = agent.to_dict()
+    assert agent_dict['region'] == 'eu-west'
+    assert agent_dict['capabilities'] == ['monitor_cpu']
+    assert agent_dict['status'] == 'inactive'
+    assert agent_dict['agent_id'] == 'agent-1'
+    print("✅ Agent Record Test Passed")
+
+
+if __name__ == "__main__":
+    test_directive_record_round_trip()
+    test_unknown_status_is_interned()
+    test_agent_record_keeps_extra_metadata()
+    print("🎯 All Tests Passed Successfully!")
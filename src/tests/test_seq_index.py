@@ -0,0 +1,44 @@
+import random
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core import seq_index
+from core.seq_index import SeqIndex
+
+
+def test_matches_sorted_set():
+    original = seq_index.BUCKET_SIZE
+    seq_index.BUCKET_SIZE = 4  # Force splits and emptied buckets
+    try:
+        rng = random.Random(7)
+        index, expected = SeqIndex(), set()
+        for _ in range(2000):
+            seq = rng.randrange(200)
+            if rng.random() < 0.6:
+                index.add(seq)
+                expected.add(seq)
+            else:
+                index.discard(seq)
+                expected.discard(seq)
+            assert len(index) == len(expected)
+        assert list(index) == sorted(expected)
+        assert all((seq in index) == (seq in expected) for seq in range(-1, 201))
+        for after in (-1, 0, 57, 199, 500):
+            assert list(index.after(after)) == sorted(seq for seq in expected if seq > after)
+    finally:
+        seq_index.BUCKET_SIZE = original
+    print("✅ Sequence Index Test Passed")
+
+
+def test_empty_index():
+    index = SeqIndex()
+    index.discard(3)
+    assert len(index) == 0 and list(index) == [] and list(index.after(-1)) == [] and 3 not in index
+    print("✅ Empty Sequence Index Test Passed")
+
+
+if __name__ == "__main__":
+    test_matches_sorted_set()
+    test_empty_index()
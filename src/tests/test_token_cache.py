@@ -0,0 +1,51 @@
+import sys
+import os
+import time
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.token_utils import VerifiedTokenCache, create_token
+
+
+def test_cache_hits_after_first_verification():
+    cache = VerifiedTokenCache()
+    token = create_token("agent-001")
+    assert cache.verify(token) == "agent-001"
+    assert cache.verify(token) == "agent-001"
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_rate == 0.5
+    print("✅ Token Cache Hit Test Passed")
+
+
+def test_entries_evicted_at_expiry():
+    now = [time.time()]
+    cache = VerifiedTokenCache(clock=lambda: now[0])
+    token = create_token("agent-001")
+    cache.verify(token)
+    assert len(cache) == 1
+    now[0] += 2 * 60 * 60  # Past the token's exp
+    cache.verify(token)  # Must be decoded again rather than served from the cache
+    assert (cache.hits, cache.misses) == (0, 2)
+    print("✅ Token Cache Expiry Test Passed")
+
+
+def test_lru_bound_and_invalid_tokens():
+    cache = VerifiedTokenCache(maxsize=2)
+    tokens = [create_token(f"agent-{i}") for i in range(3)]
+    for token in tokens:
+        cache.verify(token)
+    assert len(cache) == 2
+    try:
+        cache.verify("not-a-token")
+        assert False, "Invalid token should raise"
+    except ValueError:
+        pass
+    assert len(cache) == 2
+    print("✅ Token Cache Bound Test Passed")
+
+
+if __name__ == "__main__":
+    test_cache_hits_after_first_verification()
+    test_entries_evicted_at_expiry()
+    test_lru_bound_and_invalid_tokens()
+    print("🎯 All Tests Passed Successfully!")
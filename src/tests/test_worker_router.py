@@ -0,0 +1,176 @@
+import asyncio
+import json
+import sys
+import os
+import tempfile
+
+# Add project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.broadcast_hub import BroadcastHub
+from core import worker_router
+from core.frames import encode_frame
+from core.worker_router import WorkerRouter, WorkerRPCError
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        pass
+
+
+async def settle():
+    for _ in range(20):
+        await asyncio.sleep(0.01)
+
+
+def test_ownership_and_forwarding():
+    async def scenario():
+        with tempfile.TemporaryDirectory() as directory:
+            first = WorkerRouter(directory, worker_id="w1")
+            second = WorkerRouter(directory, worker_id="w2")
+
+            async def send_directive(params):
+                if params["agent_id"] != "agent-1":
+                    raise WorkerRPCError(429, "queue full")
+                return {"status": "success", "served_by": "w2"}
+
+            second.handle("send_directive", send_directive)
+            await first.start()
+            await second.start()  # Connects to w1 and exchanges ownership
+            second.claim("agent-1")
+            await settle()
+
+            assert first.owner("agent-1") == "w2"
+            assert second.owner("agent-1") is None  # Local agents have no remote owner
+            assert await first.call("w2", "send_directive", {"agent_id": "agent-1"}) == {"status": "success", "served_by": "w2"}
+            try:
+                await first.call("w2", "send_directive", {"agent_id": "agent-2"})
+                assert False, "Remote error should propagate"
+            except WorkerRPCError as e:
+                assert e.status_code == 429
+
+            second.release("agent-1")
+            await settle()
+            assert first.owner("agent-1") is None
+
+            await second.stop()
+            await settle()
+            assert "w2" not in first.peers
+            await first.stop()
+
+    asyncio.run(scenario())
+    print("✅ Worker Ownership/RPC Test Passed")
+
+
+def test_broadcasts_are_relayed_once():
+    async def scenario():
+        with tempfile.TemporaryDirectory() as directory:
+            hubs = [BroadcastHub(), BroadcastHub()]
+            routers = [WorkerRouter(directory, hubs={"directives": hub}, worker_id=f"w{i}") for i, hub in enumerate(hubs)]
+            for router in routers:
+                await router.start()
+            await settle()
+            sockets = [FakeWebSocket(), FakeWebSocket()]
+            hubs[0].register("dashboard-0", sockets[0])
+            hubs[1].register("dashboard-1", sockets[1], topics=("agent:agent-1",))
+
+            hubs[0].publish({"type": "directive_update", "n": 1}, topics=("agent:agent-1",))
+            hubs[0].publish({"type": "directive_update", "n": 2}, topics=("agent:agent-2",))
+            await settle()
+
+            assert [m["n"] for m in sockets[0].sent] == [1, 2]
+            assert [m["n"] for m in sockets[1].sent] == [1]  # Topic filter applies on the peer too
+            for router in routers:
+                await router.stop()
+            for hub in hubs:
+                hub.clear()
+
+    asyncio.run(scenario())
+    print("✅ Worker Broadcast Relay Test Passed")
+
+
+def test_relayed_messages_use_ingest_hook():
+    async def scenario():
+        with tempfile.TemporaryDirectory() as directory:
+            hubs = [BroadcastHub(), BroadcastHub()]
+            ingested = []
+            hubs[1].ingest = lambda message, topics: ingested.append((message, topics))
+            routers = [WorkerRouter(directory, hubs={"logs": hub}, worker_id=f"w{i}") for i, hub in enumerate(hubs)]
+            for router in routers:
+                await router.start()
+            await settle()
+            socket = FakeWebSocket()
+            hubs[1].register("dashboard-1", socket)
+
+            hubs[0].publish({"type": "log", "offset": 7}, topics=("level:info",))
+            await settle()
+
+            assert ingested == [({"type": "log", "offset": 7}, ["level:info"])]
+            assert socket.sent == []  # Left to the hook to publish
+            for router in routers:
+                await router.stop()
+            for hub in hubs:
+                hub.clear()
+
+    asyncio.run(scenario())
+    print("✅ Worker Relay Ingest Test Passed")
+
+
+class FakeTransport:
+    def __init__(self):
+        self.buffered = 0
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+
+class FakeWriter:
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.lines = []
+        self.closed = False
+
+    def write(self, line):
+        self.lines.append(line)
+
+    def is_closing(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+def test_stalled_peer_is_bounded():
+    router = WorkerRouter(tempfile.gettempdir(), worker_id="w0")
+    writer = router.peers["w1"] = FakeWriter()
+    frame = encode_frame({"n": 1})
+
+    router._relay("directives", frame, None)
+    assert len(writer.lines) == 1
+
+    # Behind: broadcasts are dropped, control messages still go out
+    writer.transport.buffered = worker_router.RELAY_BUFFER_LIMIT
+    router._relay("directives", frame, None)
+    router.claim("agent-1")
+    assert len(writer.lines) == 2 and router.relay_dropped == 1
+
+    # Stalled: the connection is closed and nothing more is buffered
+    writer.transport.buffered = worker_router.PEER_BUFFER_LIMIT
+    router.claim("agent-2")
+    assert writer.closed and len(writer.lines) == 2
+    router.claim("agent-3")
+    assert len(writer.lines) == 2
+    print("✅ Stalled Peer Bound Test Passed")
+
+
+if __name__ == "__main__":
+    test_ownership_and_forwarding()
+    test_broadcasts_are_relayed_once()
+    test_relayed_messages_use_ingest_hook()
+    test_stalled_peer_is_bounded()
+    print("🎯 All Tests Passed Successfully!")
@@ -1,13 +1,24 @@
 # utils/blockchain_auth.py
 
-from solders.pubkey import Pubkey
-from solders.signature import Signature
+from core.logging_config import get_logger
+
+# Optional Solana bindings; without them every wallet signature is rejected
+try:
+    from solders.pubkey import Pubkey
+    from solders.signature import Signature
+except ImportError:  # pragma: no cover - depends on the environment
+    Pubkey = Signature = None
+
+log = get_logger("blockchain_auth")
 
 
 def verify_solana_signature(challenge: str, signature: str, wallet_address: str) -> bool:
     """
     Verify a signed message against a Solana wallet address.
     """
+    if Signature is None:
+        log.error("solana_unavailable", "❌ Solana signature verification needs the 'solders' package.")
+        return False
     try:
         signature = Signature.from_string(signature)
         wallet_pubkey = Pubkey.from_string(wallet_address)
@@ -15,5 +26,7 @@ def verify_solana_signature(challenge: str, signature: str, wallet_address: str)
 
         return signature.verify(wallet_pubkey, message)
     except Exception as e:
-        print(f"❌ Solana Signature Verification Failed: {e}")
+        # Bad signatures are routine under load; keep them out of the default log level
+        log.debug("solana_signature_invalid", f"❌ Solana Signature Verification Failed: {e}",
+                  wallet_address=wallet_address)
         return False
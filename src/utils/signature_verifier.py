@@ -0,0 +1,121 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Deque, List, Optional, Tuple
+
+# Configuration
+DEFAULT_BATCH_WINDOW = 0.002  # Seconds to gather concurrent requests into one batch
+DEFAULT_MAX_BATCH = 256       # Flush early once this many requests are waiting
+LATENCY_SAMPLES = 2048        # Recent request latencies kept for percentiles
+
+SignatureArgs = Tuple[str, str, str]  # (challenge, signature, wallet_address)
+
+
+def _verify_chunk(verify: Callable[..., bool], items: List[SignatureArgs]) -> List[bool]:
+    # Module-level so it can be pickled into a process pool
+    return [bool(verify(*args)) for args in items]
+
+
+class BatchSignatureVerifier:
+    """
+    Runs signature verification on a worker pool instead of the event loop.
+
+    Requests arriving within `batch_window` of each other are collected and split
+    into one chunk per worker, so a burst of logins costs a handful of executor
+    round trips rather than one per request and is verified in parallel.
+    """
+    def __init__(self, verify: Callable[[str, str, str], bool], workers: Optional[int] = None,
+                 use_processes: bool = False, batch_window: float = DEFAULT_BATCH_WINDOW,
+                 max_batch: int = DEFAULT_MAX_BATCH):
+        """
+        :param verify: Blocking verifier called with (challenge, signature, wallet_address).
+        :param use_processes: Use a process pool; `verify` must then be picklable.
+        """
+        self.verify_fn = verify
+        self.workers = workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.executor: Optional[Executor] = None
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.verified = 0
+        self.rejected = 0
+        self.batches = 0
+        self._pending: List[Tuple[SignatureArgs, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    async def verify(self, challenge: str, signature: str, wallet_address: str) -> bool:
+        """
+        Verify a signature without blocking the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        started = time.perf_counter()
+        self._pending.append(((challenge, signature, wallet_address), future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        valid = await future
+        self.latencies.append(time.perf_counter() - started)
+        if valid:
+            self.verified += 1
+        else:
+            self.rejected += 1
+        return valid
+
+    def percentile(self, q: float) -> float:
+        """
+        Latency in seconds at percentile `q` (0-100) over recent requests.
+        """
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def _get_executor(self) -> Executor:
+        if self.executor is None:
+            pool = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self.executor = pool(max_workers=self.workers)
+        return self.executor
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        loop = asyncio.get_running_loop()
+        size = math.ceil(len(batch) / self.workers)
+        for start in range(0, len(batch), size):
+            chunk = batch[start:start + size]
+            task = loop.run_in_executor(self._get_executor(), _verify_chunk, self.verify_fn,
+                                        [args for args, _ in chunk])
+            task.add_done_callback(partial(self._resolve, chunk))
+
+    @staticmethod
+    def _resolve(chunk: List[Tuple[SignatureArgs, asyncio.Future]], task: asyncio.Future):
+        cancelled = task.cancelled()
+        error = None if cancelled else task.exception()
+        results = task.result() if not cancelled and error is None else [None] * len(chunk)
+        for (_, future), result in zip(chunk, results):
+            if future.done():
+                continue  # Caller gave up waiting
+            if cancelled:
+                future.cancel()
+            elif error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
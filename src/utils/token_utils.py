@@ -1,11 +1,21 @@
+import heapq
 import jwt
+import os
+import secrets
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional, Tuple
 
 # Configuration
-SECRET_KEY = "your_super_secret_key"
+MIN_SECRET_BYTES = 32
+# Signing key for agent tokens. Required (at least MIN_SECRET_BYTES long) when SENTINEL_REQUIRE_AUTH=1;
+# otherwise a random key is generated, so tokens only verify on the process that issued them.
+SECRET_KEY = os.environ.get("SENTINEL_JWT_SECRET") or secrets.token_hex(MIN_SECRET_BYTES)
+SECRET_CONFIGURED = len(os.environ.get("SENTINEL_JWT_SECRET", "").encode("utf-8")) >= MIN_SECRET_BYTES
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+TOKEN_CACHE_SIZE = 10000  # Verified tokens kept to skip repeated decodes
 
 
 def create_token(agent_id: str) -> str:
@@ -34,15 +44,96 @@ def verify_token(token: str) -> Optional[str]:
     Raises:
         ValueError: If the token is invalid or expired.
     """
+    return _decode_token(token).get("sub")  # Returns the agent_id
+
+
+def _decode_token(token: str) -> dict:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload.get("sub")  # Returns the agent_id
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise ValueError("❌ Token has expired")
     except jwt.InvalidTokenError:
         raise ValueError("❌ Invalid token")
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of tokens that already passed verification.
+
+    Entries are evicted at their `exp` (tracked in a min-heap, so expiry costs
+    O(log n) per token rather than a scan) or when the cache is full. Only
+    successful verifications are cached; invalid tokens are decoded every time.
+    """
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE, clock=time.time):
+        self.maxsize = maxsize
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()  # token -> (agent_id, exp)
+        self._expiry: List[Tuple[float, str]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def verify(self, token: str) -> Optional[str]:
+        """
+        Same contract as verify_token(), answered from the cache when possible.
+        """
+        self._evict_expired()
+        entry = self._entries.get(token)
+        if entry is not None:
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        payload = _decode_token(token)
+        agent_id, exp = payload.get("sub"), payload.get("exp")
+        if exp is not None:
+            self._entries[token] = (agent_id, float(exp))
+            heapq.heappush(self._expiry, (float(exp), token))
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            if len(self._expiry) > 2 * self.maxsize:
+                # Drop heap entries for tokens already evicted by LRU
+                self._expiry = [(e, t) for e, t in self._expiry if self._entries.get(t, (None, None))[1] == e]
+                heapq.heapify(self._expiry)
+        return agent_id
+
+    def invalidate(self, token: str):
+        self._entries.pop(token, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._expiry.clear()
+
+    def _evict_expired(self):
+        now = self.clock()
+        while self._expiry and self._expiry[0][0] <= now:
+            exp, token = heapq.heappop(self._expiry)
+            entry = self._entries.get(token)
+            if entry is not None and entry[1] == exp:
+                del self._entries[token]
+
+
+token_cache = VerifiedTokenCache()
+
+
+def verify_token_cached(token: str) -> Optional[str]:
+    """
+    Verify a JWT token, skipping the decode for tokens verified recently.
+
+    Raises:
+        ValueError: If the token is invalid or expired.
+    """
+    return token_cache.verify(token)
+
+
 # Example Usage (for debugging)
 if __name__ == "__main__":
     agent_id = "agent-001"
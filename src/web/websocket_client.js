@@ -11,33 +11,76 @@ const filterInput = document.getElementById("filter-logs");
 let isPaused = false;
 let filterText = "";
 
-// Initialize WebSocket for Logs
-const logSocket = new WebSocket("ws://127.0.0.1:8000/ws/logs");
-
-// WebSocket Event Listeners for Logs
-logSocket.onopen = () => {
-    console.log("✅ Connected to Logs WebSocket");
-    addLogEntry("✅ Connected to Logs WebSocket", "success");
-};
+// Log stream state: offsets let a reconnect resume exactly where we stopped.
+// Offsets only line up within one server epoch, which every log_cursor reports.
+const LOG_SOCKET_URL = "ws://127.0.0.1:8000/ws/logs";
+const LOG_RECONNECT_DELAY_MS = 2000;
+let lastLogOffset = null;
+let logEpoch = null;
+let requestedLogOffset = null;
+let logSocket = null;
+
+// Initialize WebSocket for Logs, replaying anything missed while disconnected
+function connectLogSocket() {
+    requestedLogOffset = lastLogOffset === null ? null : lastLogOffset + 1;
+    const url = requestedLogOffset === null
+        ? LOG_SOCKET_URL
+        : `${LOG_SOCKET_URL}?since=${requestedLogOffset}&epoch=${encodeURIComponent(logEpoch)}`;
+    logSocket = new WebSocket(url);
+
+    // WebSocket Event Listeners for Logs
+    logSocket.onopen = () => {
+        console.log("✅ Connected to Logs WebSocket");
+        addLogEntry("✅ Connected to Logs WebSocket", "success");
+    };
+
+    logSocket.onmessage = (event) => {
+        handleLogMessage(JSON.parse(event.data));
+    };
+
+    logSocket.onerror = (error) => {
+        console.error("❌ Logs WebSocket Error:", error);
+        addLogEntry(`❌ Logs WebSocket Error: ${error}`, "error");
+    };
+
+    logSocket.onclose = () => {
+        console.warn("🔌 Logs WebSocket Disconnected");
+        addLogEntry("🔌 Logs WebSocket Disconnected. Reconnecting...", "warning");
+        setTimeout(connectLogSocket, LOG_RECONNECT_DELAY_MS);
+    };
+}
 
-logSocket.onmessage = (event) => {
-    if (!isPaused) {
-        const data = JSON.parse(event.data);
-        if (data.type === "log") {
-            addLogEntry(data.message, "default");
+// Messages may arrive batched as {"action": "batch", "messages": [...]}, possibly nested
+function handleLogMessage(data) {
+    if (data.action === "batch") {
+        data.messages.forEach(handleLogMessage);
+    } else if (data.type === "log_cursor") {
+        // A restarted server or another worker numbers its entries afresh: start over
+        const restarted = data.epoch !== logEpoch
+            || (requestedLogOffset !== null && data.next_offset < requestedLogOffset);
+        if (restarted && lastLogOffset !== null) {
+            addLogEntry("⚠️ Log server changed; entries logged while disconnected may be missing.", "warning");
+        }
+        if (restarted) {
+            lastLogOffset = null;
+        }
+        logEpoch = data.epoch;
+        requestedLogOffset = null;
+        if (data.missed > 0) {
+            addLogEntry(`⚠️ ${data.missed} log entries were lost while disconnected.`, "warning");
+        }
+    } else if (data.type === "log") {
+        if (lastLogOffset !== null && data.offset <= lastLogOffset) {
+            return; // Already shown before the reconnect
+        }
+        lastLogOffset = data.offset;
+        if (!isPaused) {
+            addLogEntry(data.message, data.level === "info" ? "default" : data.level);
         }
     }
-};
-
-logSocket.onerror = (error) => {
-    console.error("❌ Logs WebSocket Error:", error);
-    addLogEntry(`❌ Logs WebSocket Error: ${error}`, "error");
-};
+}
 
-logSocket.onclose = () => {
-    console.warn("🔌 Logs WebSocket Disconnected");
-    addLogEntry("🔌 Logs WebSocket Disconnected", "warning");
-};
+connectLogSocket();
 
 // Utility Functions for Logs
 function addLogEntry(message, type = "default") {